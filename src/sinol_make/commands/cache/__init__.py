@@ -0,0 +1,103 @@
+import os
+import argparse
+import collections
+
+from sinol_make import util
+from sinol_make.commands.run import colorize_status
+from sinol_make.helpers import package_util, results_db, user_cache, cache
+from sinol_make.helpers.package_index import PackageIndex
+from sinol_make.interfaces.BaseCommand import BaseCommand
+from sinol_make.structs.cache_structs import CacheTest
+
+
+class Command(BaseCommand):
+    """
+    Class for `cache` command.
+    """
+
+    def get_name(self):
+        return "cache"
+
+    def configure_subparser(self, subparser: argparse.ArgumentParser):
+        parser = subparser.add_parser(
+            self.get_name(),
+            help='Inspect cached results',
+            description='Inspect results of solutions cached by the `run` command '
+                        'or clean the cache shared between packages.'
+        )
+        actions = parser.add_subparsers(title='action', dest='cache_action')
+        actions.required = True
+        query_parser = actions.add_parser(
+            'query',
+            help='Print cached results of solutions',
+            description='Prints cached results of solutions, optionally filtered by solutions, tests and statuses.'
+        )
+        query_parser.add_argument('-s', '--solutions', type=str, nargs='+',
+                                  help='solutions to show, for example prog/abc{b,s}*.{cpp,py}')
+        query_parser.add_argument('-t', '--tests', type=str, nargs='+',
+                                  help='tests to show, for example in/abc{0,1}*')
+        query_parser.add_argument('--status', type=str, nargs='+', choices=['OK', 'WA', 'TL', 'ML', 'RE'],
+                                  help='show only results with given statuses')
+        actions.add_parser(
+            'clean',
+            help='Remove the cache shared between packages',
+            description='Removes compiled executables and inwer verdicts cached in `~/.cache/sinol-make` '
+                        '(or `$XDG_CACHE_HOME/sinol-make`), which are shared between packages. '
+                        'Entries unused for 30 days are also removed automatically.'
+        )
+        return parser
+
+    def query(self, args: argparse.Namespace):
+        # Results are keyed by executables, so solutions with the same code share them.
+        solution_names = collections.defaultdict(list)
+        for solution in package_util.get_solutions(self.task_id, args.solutions):
+            key = cache.get_cache_file(solution, tests=[]).results_key
+            if key != "":
+                solution_names[key].append(solution)
+        solution_md5s = list(solution_names.keys()) if args.solutions is not None else None
+        tests = {md5sum: os.path.basename(test)
+                 for test, md5sum in util.get_files_md5(PackageIndex(self.task_id).get_tests(args.tests)).items()}
+        rows = results_db.query_results(solution_md5s, list(tests.keys()) if args.tests is not None else None,
+                                        args.status)
+        if len(rows) == 0:
+            print(util.warning("No cached results found."))
+            return
+
+        table = [["Solution", "Test", "Status", "Time", "Memory", "Points", "Limits", "Time tool"]]
+        statuses = []
+        for solution, solution_md5, test_md5, result in rows:
+            # Results of removed or changed solutions are shown with the name of the solution which saved them.
+            solution = ", ".join(solution_names.get(solution_md5, [solution]))
+            cache_test = CacheTest.from_dict(result)
+            execution_result = cache_test.result
+            # Results for tests which were changed or removed are kept, but can't be matched to a test file.
+            test_name = tests.get(test_md5, f"{test_md5[:8]} (changed)")
+            statuses.append(execution_result.Status)
+            table.append([
+                solution,
+                test_name,
+                str(execution_result.Status),
+                f"{execution_result.Time}ms" if execution_result.Time is not None else "",
+                f"{execution_result.Memory}KB" if execution_result.Memory is not None else "",
+                str(execution_result.Points),
+                f"{cache_test.time_limit}ms / {cache_test.memory_limit}KB",
+                cache_test.time_tool,
+            ])
+
+        widths = [max(len(row[i]) for row in table) for i in range(len(table[0]))]
+        print(util.bold("  ".join(cell.ljust(width) for cell, width in zip(table[0], widths)).rstrip()))
+        for row, status in zip(table[1:], statuses):
+            cells = [cell.ljust(width) for cell, width in zip(row, widths)]
+            cells[2] = colorize_status(status) + " " * (widths[2] - len(row[2]))
+            print("  ".join(cells).rstrip())
+
+    def run(self, args: argparse.Namespace):
+        if args.cache_action == 'clean':
+            # The cache shared between packages can be removed outside of a package.
+            user_cache.clean()
+            print(util.info("Removed the cache shared between packages."))
+            return
+        util.exit_if_not_package()
+        self.task_id = package_util.get_task_id()
+        if args.cache_action == 'query':
+            self.query(args)
@@ -8,6 +8,8 @@ from sinol_make import util, contest_types
 from sinol_make.commands.chkwer import chkwer_util
 from sinol_make.commands.outgen import outgen_util
 from sinol_make.helpers import package_util, parsers, compiler, compile, printer, paths
+from sinol_make.helpers.package_index import PackageIndex
+from sinol_make.helpers.progress import ProgressReporter
 from sinol_make.interfaces.BaseCommand import BaseCommand
 from sinol_make.structs.chkwer_structs import TestResult, ChkwerExecution, TableData, RunResult
 
@@ -74,17 +76,23 @@ class Command(BaseCommand):
 
         has_terminal, terminal_width, terminal_height = util.get_terminal_size()
         table_data = TableData(results, 0, self.task_id, self.contest_type.max_score_per_test())
+        table = chkwer_util.ResultsTable(table_data)
         if has_terminal:
             run_event = threading.Event()
             run_event.set()
-            thr = threading.Thread(target=printer.printer_thread, args=(run_event, chkwer_util.print_view, table_data))
+            thr = threading.Thread(target=printer.printer_thread, args=(run_event, table.render))
             thr.start()
+        else:
+            progress = ProgressReporter("tests", len(executions))
 
         keyboard_interrupt = False
         try:
             with mp.Pool(self.cpus) as pool:
                 for i, result in enumerate(pool.imap(self.run_test, executions)):
                     table_data.results[result.test_path].set_results(result.points, result.ok, result.comment)
+                    table.update(result.test_path)
+                    if not has_terminal:
+                        progress.update(not result.ok)
                     table_data.i = i
         except KeyboardInterrupt:
             keyboard_interrupt = True
@@ -93,7 +101,7 @@ class Command(BaseCommand):
             run_event.clear()
             thr.join()
 
-        print("\n".join(chkwer_util.print_view(terminal_width, terminal_height, table_data)[0]))
+        print("\n".join(table.render(terminal_width, terminal_height)[0]))
         if keyboard_interrupt:
             util.exit_with_error("Keyboard interrupt.")
         return results
@@ -108,7 +116,7 @@ class Command(BaseCommand):
             util.exit_with_error("chkwer can be run only for normal tasks.")
 
         self.cpus = args.cpus or util.default_cpu_count()
-        self.tests = package_util.get_tests(self.task_id, args.tests)
+        self.tests = PackageIndex(self.task_id).get_tests(args.tests)
 
         if len(self.tests) == 0:
             util.exit_with_error("No tests found.")
@@ -117,14 +125,18 @@ class Command(BaseCommand):
         util.change_stack_size_to_unlimited()
 
         additional_files = self.task_type.additional_files_to_compile()
-        if len(additional_files) == 0:
-            util.exit_with_error("Checker not found.")
-        if len(additional_files) != 1:
+        if len(additional_files) > 1:
             util.exit_with_error("More than one file to compile found. How is that possible?")
-        checker_info = additional_files[0]
+        if len(additional_files) == 1:
+            checker_info = additional_files[0]
+            self.checker_executable = self.compile(checker_info[0], checker_info[1], args, "checker",
+                                                   args.compile_mode)
+        elif self.task_type.comparator is not None:
+            # Outputs are checked by the comparator configured in config.yml.
+            self.checker_executable = None
+        else:
+            util.exit_with_error("Checker not found.")
         model_solution = outgen_util.get_correct_solution(self.task_id)
-        self.checker_executable = self.compile(checker_info[0], checker_info[1], args, "checker",
-                                               args.compile_mode)
         self.model_executable = self.compile(model_solution, package_util.get_executable(model_solution), args,
                                              "model solution", args.compile_mode)
         print()
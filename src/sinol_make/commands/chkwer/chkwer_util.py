@@ -1,72 +1,87 @@
-import sys
-from io import StringIO
-
 from sinol_make import util
 from sinol_make.commands.inwer.inwer_util import sort_tests
+from sinol_make.helpers import printer
 from sinol_make.structs.chkwer_structs import TableData
 
 
-def print_view(term_width, term_height, table_data: TableData):
+class ResultsTable:
     """
-    Prints current results of test verification.
+    Table with results of the checker, printed while tests are run and after all of them are run.
+    Rows of the table are rendered again only after their results change (see `update`).
     """
 
-    previous_stdout = sys.stdout
-    new_stdout = StringIO()
-    sys.stdout = new_stdout
-
-    results = table_data.results
-    column_lengths = [0, len('Points') + 1, 0]
-    tests = []
-    for result in results.values():
-        column_lengths[0] = max(column_lengths[0], len(result.test_name))
-        tests.append(result.test_path)
-    tests = sort_tests(tests, table_data.task_id)
-
-    # 6 is for " | " between columns, 3 for margin.
-    column_lengths[2] = max(10, term_width - column_lengths[0] - column_lengths[1] - 6 - 3)
-    margin = "  "
+    def __init__(self, table_data: TableData):
+        self.table_data = table_data
+        self.tests = sort_tests([result.test_path for result in table_data.results.values()], table_data.task_id)
+        self.column_lengths = [0, len('Points') + 1, 0]
+        for result in table_data.results.values():
+            self.column_lengths[0] = max(self.column_lengths[0], len(result.test_name))
+        # Lines of rows: {test_path: [line]}
+        self.rows = printer.CellCache(self._render_row)
+        self.term_width = None
+        self.lines = None
 
-    def print_line_separator():
-        res = "-" * (column_lengths[0] + 3) + "+" + "-" * (column_lengths[1] + 1) + "+"
-        res += "-" * (term_width - len(res) - 1)
-        print(res)
+    def update(self, test_path):
+        """
+        Marks the row of the test as dirty. Has to be called after the result of the test changes.
+        """
+        self.rows.mark_dirty(test_path)
 
-    print_line_separator()
-
-    print(margin + "Test".ljust(column_lengths[0]) + " | " + "Points" + " | " + "Comment")
-    print_line_separator()
-
-    last_group = None
-    for test_path in tests:
-        result = results[test_path]
-        if last_group is not None and last_group != result.test_group:
-            print_line_separator()
-        last_group = result.test_group
-        print(margin + result.test_name.ljust(column_lengths[0]) + " | ", end='')
+    def _render_row(self, test_path):
+        result = self.table_data.results[test_path]
+        column_lengths = self.column_lengths
+        margin = "  "
+        line = margin + result.test_name.ljust(column_lengths[0]) + " | "
 
         if result.run:
             if result.ok:
-                if result.points == table_data.max_score:
-                    print(util.info(str(result.points).ljust(column_lengths[1] - 1)), end='')
+                if result.points == self.table_data.max_score:
+                    line += util.info(str(result.points).ljust(column_lengths[1] - 1))
                 else:
-                    print(util.warning(str(result.points).ljust(column_lengths[1] - 1)), end='')
+                    line += util.warning(str(result.points).ljust(column_lengths[1] - 1))
             else:
-                print(util.error(str(result.points).ljust(column_lengths[1] - 1)), end='')
+                line += util.error(str(result.points).ljust(column_lengths[1] - 1))
         else:
-            print(util.warning("...".ljust(column_lengths[1] - 1)), end='')
-        print(" | ", end='')
+            line += util.warning("...".ljust(column_lengths[1] - 1))
+        line += " | "
 
-        output = []
         if result.run:
             if result.comment:
-                print(result.comment)
+                line += result.comment
             else:
-                print(util.color_gray("No comment"))
+                line += util.color_gray("No comment")
+        # Comments of the checker can contain line breaks.
+        return line.splitlines()
+
+    def _line_separator(self):
+        res = "-" * (self.column_lengths[0] + 3) + "+" + "-" * (self.column_lengths[1] + 1) + "+"
+        res += "-" * (self.term_width - len(res) - 1)
+        return res
 
-    print_line_separator()
-    print()
-    print()
+    def render(self, term_width, term_height):
+        """
+        Returns lines of the table, title and footer, as expected by `printer.printer`.
+        """
+        if self.term_width != term_width:
+            self.term_width = term_width
+            # 6 is for " | " between columns, 3 for margin.
+            self.column_lengths[2] = max(10, term_width - self.column_lengths[0] - self.column_lengths[1] - 6 - 3)
+            self.rows.clear()
+            self.lines = None
+        if self.lines is not None and not self.rows.has_dirty():
+            return self.lines, None, "Use arrows to move."
 
-    sys.stdout = previous_stdout
-    return new_stdout.getvalue().splitlines(), None, "Use arrows to move."
+        separator = self._line_separator()
+        lines = [separator,
+                 "  " + "Test".ljust(self.column_lengths[0]) + " | " + "Points" + " | " + "Comment",
+                 separator]
+        last_group = None
+        for test_path in self.tests:
+            group = self.table_data.results[test_path].test_group
+            if last_group is not None and last_group != group:
+                lines.append(separator)
+            last_group = group
+            lines.extend(self.rows.get(test_path))
+        lines += [separator, "", ""]
+        self.lines = lines
+        return lines, None, "Use arrows to move."
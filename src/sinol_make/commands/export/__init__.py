@@ -9,6 +9,7 @@ import argparse
 from sinol_make import util, contest_types
 from sinol_make.commands.ingen.ingen_util import get_ingen, compile_ingen, run_ingen, ingen_exists
 from sinol_make.helpers import package_util, parsers, paths
+from sinol_make.helpers.package_index import PackageIndex
 from sinol_make.interfaces.BaseCommand import BaseCommand
 from sinol_make.commands.outgen import Command as OutgenCommand, compile_correct_solution, get_correct_solution
 from sinol_make.commands.doc import Command as DocCommand
@@ -269,13 +270,17 @@ class Command(BaseCommand):
         self.task_id = package_util.get_task_id()
         self.export_name = self.task_id
         self.task_type_cls = package_util.get_task_type_cls()
-        package_util.validate_test_names(self.task_id)
+        PackageIndex(self.task_id).validate_test_names()
         try:
             self.contest = contest_types.get_contest_type()
         except UnknownContestType as e:
             util.exit_with_error(str(e))
 
         config = package_util.get_config()
+        if "sinol_comparator" in config and not package_util.any_files_matching_pattern(self.task_id,
+                                                                                        f"{self.task_id}chk.*"):
+            print(util.warning("`sinol_comparator` is used only by sinol-make. sio2 will compare outputs "
+                               "without it, add a checker if the comparator is needed."))
 
         export_package_path = paths.get_cache_path('export', self.task_id)
         if os.path.exists(export_package_path):
@@ -5,12 +5,15 @@ import threading
 import argparse
 import os
 import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
 from functools import cmp_to_key
 from typing import Dict, List
 
 from sinol_make import util, contest_types
 from sinol_make.structs.inwer_structs import TestResult, InwerExecution, VerificationResult, TableData
-from sinol_make.helpers import package_util, printer, paths, parsers
+from sinol_make.helpers import package_util, printer, paths, parsers, inwer_cache
+from sinol_make.helpers.package_index import PackageIndex
+from sinol_make.helpers.progress import ProgressReporter
 from sinol_make.interfaces.BaseCommand import BaseCommand
 from sinol_make.commands.inwer import inwer_util
 
@@ -65,6 +68,53 @@ class Command(BaseCommand):
             out.decode('utf-8')
         )
 
+    def verify_tests_batch(self, executions: List[InwerExecution]):
+        """
+        Verifies tests with long-lived inwer processes, one for each thread, and yields results in order.
+        Tests on which the inwer exited are verified again by `verify_test`.
+        """
+        local = threading.local()
+        lock = threading.Lock()
+        inwers: List[inwer_util.BatchInwer] = []
+
+        def verify(execution: InwerExecution) -> VerificationResult:
+            inwer = getattr(local, "inwer", None)
+            if inwer is None:
+                inwer = local.inwer = inwer_util.BatchInwer(self.inwer_executable)
+                with lock:
+                    inwers.append(inwer)
+            result = inwer.verify(execution)
+            if result is None:
+                # The output and exit code are taken from a separate process, then a new inwer is started.
+                inwer.close(kill=True)
+                local.inwer = None
+                result = self.verify_test(execution)
+            return result
+
+        executor = ThreadPoolExecutor(self.cpus)
+        interrupted = True
+        try:
+            yield from executor.map(verify, executions)
+            interrupted = False
+        finally:
+            executor.shutdown(wait=not interrupted, cancel_futures=interrupted)
+            with lock:
+                for inwer in inwers:
+                    inwer.close()
+
+    def verify_tests(self, executions: List[InwerExecution]):
+        """
+        Verifies tests and yields results in order. Inwers supporting the batch protocol
+        (see `inwer_util.BatchInwer`) verify many tests in one process, others are started for every test.
+        """
+        if len(executions) == 0:
+            return
+        if inwer_util.supports_batch(self.inwer_executable):
+            yield from self.verify_tests_batch(executions)
+        else:
+            with mp.Pool(self.cpus) as pool:
+                yield from pool.imap(self.verify_test, executions)
+
     def verify_and_print_table(self) -> Dict[str, TestResult]:
         """
         Verifies all tests and prints the results in a table.
@@ -72,29 +122,45 @@ class Command(BaseCommand):
         """
         results = {}
         sorted_tests = sorted(self.tests, key=lambda test: package_util.get_group(test, self.task_id))
+        # Only tests without a cached verdict of this inwer are verified.
+        keys = inwer_cache.get_keys(self.inwer_executable, self.compile_mode, self.fsanitize, sorted_tests)
         executions: List[InwerExecution] = []
         for test in sorted_tests:
             results[test] = TestResult(test, self.task_id)
-            executions.append(InwerExecution(test, results[test].test_name, self.inwer_executable))
+            verdict = inwer_cache.load_verdict(keys[test])
+            if verdict is not None:
+                results[test].set_results(*verdict)
+            else:
+                executions.append(InwerExecution(test, results[test].test_name, self.inwer_executable))
+        if len(executions) < len(sorted_tests):
+            print(f'Using cached verdicts for {len(sorted_tests) - len(executions)} tests.')
 
         has_terminal, terminal_width, terminal_height = util.get_terminal_size()
 
         table_data = TableData(results, 0, self.task_id)
+        table = inwer_util.ResultsTable(table_data)
         if has_terminal:
             run_event = threading.Event()
             run_event.set()
-            thr = threading.Thread(target=printer.printer_thread, args=(run_event, inwer_util.print_view, table_data))
+            thr = threading.Thread(target=printer.printer_thread, args=(run_event, table.render))
             thr.start()
+        else:
+            progress = ProgressReporter("tests", len(executions))
 
         keyboard_interrupt = False
         sanitizer_error = False
         try:
-            with mp.Pool(self.cpus) as pool:
-                for i, result in enumerate(pool.imap(self.verify_test, executions)):
-                    table_data.results[result.test_path].set_results(result.valid, result.output)
-                    table_data.i = i
-                    if util.has_sanitizer_error(result.output, 0 if result.valid else 1):
-                        sanitizer_error = True
+            for i, result in enumerate(self.verify_tests(executions)):
+                table_data.results[result.test_path].set_results(result.valid, result.output)
+                table.update(result.test_path)
+                if not has_terminal:
+                    progress.update(not result.valid)
+                table_data.i = i
+                if util.has_sanitizer_error(result.output, 0 if result.valid else 1):
+                    sanitizer_error = True
+                else:
+                    # Sanitizer errors can be caused by the system configuration, so they aren't cached.
+                    inwer_cache.save_verdict(keys[result.test_path], result.valid, result.output)
         except KeyboardInterrupt:
             keyboard_interrupt = True
 
@@ -102,7 +168,7 @@ class Command(BaseCommand):
             run_event.clear()
             thr.join()
 
-        print("\n".join(inwer_util.print_view(terminal_width, terminal_height, table_data)[0]))
+        print("\n".join(table.render(terminal_width, terminal_height)[0]))
 
         if sanitizer_error:
             print(util.warning('Warning: if inwer failed due to sanitizer errors, you can either run '
@@ -165,10 +231,11 @@ class Command(BaseCommand):
                 return -1
             return 1
 
-        groups = {}
-        for group in package_util.get_groups(self.tests, self.task_id):
-            groups[group] = sorted([test for test in tests if package_util.get_group(test, self.task_id) == group],
-                                   key=cmp_to_key(compare_id))
+        groups = {group: [] for group in package_util.get_groups(self.tests, self.task_id)}
+        for test in tests:
+            groups[package_util.get_group(test, self.task_id)].append(test)
+        for group_tests in groups.values():
+            group_tests.sort(key=cmp_to_key(compare_id))
         for group, group_tests in groups.items():
             last_id = None
             last_test = None
@@ -184,7 +251,8 @@ class Command(BaseCommand):
         args = util.init_package_command(args)
 
         self.task_id = package_util.get_task_id()
-        package_util.validate_test_names(self.task_id)
+        index = PackageIndex(self.task_id)
+        index.validate_test_names()
         self.inwer = inwer_util.get_inwer_path(self.task_id, args.inwer_path)
         if self.inwer is None:
             if args.inwer_path is None:
@@ -195,7 +263,7 @@ class Command(BaseCommand):
         print(f'Verifying with inwer {util.bold(relative_path)}')
 
         self.cpus = args.cpus or util.default_cpu_count()
-        self.tests = package_util.get_tests(self.task_id, args.tests)
+        self.tests = index.get_tests(args.tests)
         self.contest_type = contest_types.get_contest_type()
 
         if len(self.tests) == 0:
@@ -204,6 +272,8 @@ class Command(BaseCommand):
             print('Verifying tests: ' + util.bold(', '.join(self.tests)))
 
         util.change_stack_size_to_unlimited()
+        self.compile_mode = args.compile_mode
+        self.fsanitize = args.fsanitize
         self.inwer_executable = inwer_util.compile_inwer(self.inwer, args, args.compile_mode, args.fsanitize)
         results: Dict[str, TestResult] = self.verify_and_print_table()
         print('')
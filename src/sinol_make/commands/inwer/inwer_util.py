@@ -1,16 +1,17 @@
 import glob
 import os
-import sys
-from io import StringIO
+import subprocess
+import time
 from typing import Union
 
 import argparse
 
 from sinol_make import util
 from sinol_make.commands.inwer import TestResult, TableData
-from sinol_make.helpers import compile, package_util
+from sinol_make.helpers import compile, package_util, printer, batch_checker, inwer_cache
 from sinol_make.helpers import compiler
 from sinol_make.interfaces.Errors import CompilationError
+from sinol_make.structs.inwer_structs import InwerExecution, VerificationResult
 
 
 def get_inwer_path(task_id: str, path=None) -> Union[str, None]:
@@ -46,85 +47,187 @@ def compile_inwer(inwer_path: str, args: argparse.Namespace, compilation_flags='
     return inwer_exe
 
 
+BATCH_HANDSHAKE = "BATCH"
+
+
+def supports_batch(inwer_exe_path: str) -> bool:
+    """
+    Checks if inwer supports the batch protocol (see `BatchInwer`). The inwer is started with
+    `--batch` argument and empty stdin, so an inwer which doesn't support it exits right away.
+    The result is cached by md5sum of the inwer executable.
+    """
+    supported = inwer_cache.load_batch_support(inwer_exe_path)
+    if supported is not None:
+        return supported
+    try:
+        process = subprocess.run([inwer_exe_path, "--batch"], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                 stderr=subprocess.DEVNULL, timeout=10)
+        supported = process.stdout.decode('utf-8', errors='replace').split('\n')[0].strip() == BATCH_HANDSHAKE
+    except subprocess.TimeoutExpired:
+        supported = False
+    inwer_cache.save_batch_support(inwer_exe_path, supported)
+    return supported
+
+
+class BatchInwer:
+    """
+    Long-lived inwer process using the batch protocol. The inwer is started with `--batch` argument
+    and first writes a line with `BATCH` to stdout. Then it reads requests from stdin, each being two lines
+    with the name of the test and the path to it. For each request it writes a line with the exit code
+    it would have returned for this test and the number of lines of its output, then the output itself,
+    and flushes stdout. The inwer exits when stdin is closed.
+    """
+
+    # Maximum time (in seconds) the inwer can take to reply to a request or to exit after stdin is closed.
+    TIMEOUT = 60
+
+    def __init__(self, inwer_exe_path: str):
+        self.process = subprocess.Popen([inwer_exe_path, "--batch"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+        self.reader = batch_checker.LineReader(self.process.stdout)
+        if self.reader.read_lines(1, time.monotonic() + self.TIMEOUT) != [BATCH_HANDSHAKE]:
+            self.close(kill=True)
+
+    def verify(self, execution: InwerExecution) -> Union[VerificationResult, None]:
+        """
+        Verifies a test and returns the result of inwer on this test or None if the inwer exited,
+        didn't reply in `TIMEOUT` seconds or its reply is invalid. The inwer shouldn't be used after None is returned.
+        """
+        if self.process.stdin.closed or self.reader.has_pending_output():
+            return None
+        request = os.path.basename(execution.test_path) + "\n" + os.path.abspath(execution.test_path) + "\n"
+        try:
+            self.process.stdin.write(request.encode('utf-8'))
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            return None
+        deadline = time.monotonic() + self.TIMEOUT
+        header = self.reader.read_lines(1, deadline)
+        try:
+            exit_code, line_count = map(int, header[0].split())
+        except (TypeError, ValueError):
+            return None
+        lines = self.reader.read_lines(line_count, deadline) if line_count > 0 else []
+        if lines is None or self.reader.buffer:
+            return None
+        return VerificationResult(execution.test_path, exit_code == 0, "".join(line + "\n" for line in lines))
+
+    def close(self, kill=False):
+        """
+        Closes stdin of the inwer and waits for it to exit. If `kill` is True or the inwer doesn't exit
+        in `TIMEOUT` seconds, it is killed.
+        """
+        if kill:
+            self.process.kill()
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.process.stdout.close()
+        try:
+            self.process.wait(self.TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
 def sort_tests(tests, task_id):
     # First sort by group, then by test name.
     tests.sort(key=lambda test: [package_util.get_group(test, task_id), test])
     return tests
 
 
-def print_view(term_width, term_height, table_data: TableData):
+class ResultsTable:
     """
-    Prints current results of test verification.
+    Table with results of test verification, printed while tests are verified and after all of them are verified.
+    Rows of the table are rendered again only after their results change (see `update`).
     """
 
-    previous_stdout = sys.stdout
-    new_stdout = StringIO()
-    sys.stdout = new_stdout
-
-    results = table_data.results
-    column_lengths = [0, len('Group') + 1, len('Status') + 1, 0]
-    tests = []
-    for result in results.values():
-        column_lengths[0] = max(column_lengths[0], len(result.test_name))
-        column_lengths[1] = max(column_lengths[1], len(result.test_group))
-        tests.append(result.test_path)
-    tests = sort_tests(tests, table_data.task_id)
-
-    column_lengths[3] = max(10, term_width - column_lengths[0] - column_lengths[1] - column_lengths[
-        2] - 9 - 3)  # 9 is for " | " between columns, 3 for margin.
-    margin = "  "
-
-    def print_line_separator():
-        res = "-" * (column_lengths[0] + 3) + "+" + "-" * (column_lengths[1] + 1) + "+" + "-" * (
-                    column_lengths[2] + 1) + "+"
-        res += "-" * (term_width - len(res) - 1)
-        print(res)
-
-    print_line_separator()
-
-    print(margin + "Test".ljust(column_lengths[0]) + " | " + "Group".ljust(column_lengths[1] - 1) + " | " + "Status" +
-          " | " + "Output")
-    print_line_separator()
-
-    last_group = None
-    for test_path in tests:
-        result = results[test_path]
-        if last_group is not None and last_group != result.test_group:
-            print_line_separator()
-        last_group = result.test_group
-        print(margin + result.test_name.ljust(column_lengths[0]) + " | ", end='')
-        print(result.test_group.ljust(column_lengths[1] - 1) + " | ", end='')
+    def __init__(self, table_data: TableData):
+        self.table_data = table_data
+        self.tests = sort_tests([result.test_path for result in table_data.results.values()], table_data.task_id)
+        self.column_lengths = [0, len('Group') + 1, len('Status') + 1, 0]
+        for result in table_data.results.values():
+            self.column_lengths[0] = max(self.column_lengths[0], len(result.test_name))
+            self.column_lengths[1] = max(self.column_lengths[1], len(result.test_group))
+        # Lines of rows: {test_path: [line]}
+        self.rows = printer.CellCache(self._render_row)
+        self.term_width = None
+        self.lines = None
+
+    def update(self, test_path):
+        """
+        Marks the row of the test as dirty. Has to be called after the result of the test changes.
+        """
+        self.rows.mark_dirty(test_path)
+
+    def _render_row(self, test_path):
+        result = self.table_data.results[test_path]
+        column_lengths = self.column_lengths
+        margin = "  "
+        line = margin + result.test_name.ljust(column_lengths[0]) + " | "
+        line += result.test_group.ljust(column_lengths[1] - 1) + " | "
 
         if result.verified:
             if result.valid:
-                print(util.info("OK".ljust(column_lengths[2] - 1)), end='')
+                line += util.info("OK".ljust(column_lengths[2] - 1))
             else:
-                print(util.error("ERROR".ljust(column_lengths[2] - 1)), end='')
+                line += util.error("ERROR".ljust(column_lengths[2] - 1))
         else:
-            print(util.warning("...".ljust(column_lengths[2] - 1)), end='')
-        print(" | ", end='')
+            line += util.warning("...".ljust(column_lengths[2] - 1))
+        line += " | "
 
         output = []
         if result.verified:
             split_output = result.output.split('\n')
-            for line in split_output:
-                output += [line[i:i + column_lengths[3]] for i in range(0, len(line), column_lengths[3])]
+            for output_line in split_output:
+                output += [output_line[i:i + column_lengths[3]] for i in range(0, len(output_line), column_lengths[3])]
         else:
             output.append("")
 
+        lines = []
         if output == []:
-            print(util.color_gray("No output"))
+            lines.append(line + util.color_gray("No output"))
         else:
-            print(output[0].ljust(column_lengths[3]))
-            output.pop(0)
-
-            for line in output:
-                print(" " * (column_lengths[0] + 2) + " | " + " " * (column_lengths[1] - 1) + " | " +
-                      " " * (column_lengths[2] - 1) + " | " + line.ljust(column_lengths[3]))
-
-    print_line_separator()
-    print()
-    print()
-
-    sys.stdout = previous_stdout
-    return new_stdout.getvalue().splitlines(), None, "Use arrows to move."
+            lines.append(line + output[0].ljust(column_lengths[3]))
+            for output_line in output[1:]:
+                lines.append(" " * (column_lengths[0] + 2) + " | " + " " * (column_lengths[1] - 1) + " | " +
+                             " " * (column_lengths[2] - 1) + " | " + output_line.ljust(column_lengths[3]))
+        # Output of inwer can contain other line breaks.
+        return "\n".join(lines).splitlines()
+
+    def _line_separator(self):
+        res = "-" * (self.column_lengths[0] + 3) + "+" + "-" * (self.column_lengths[1] + 1) + "+" + "-" * (
+                self.column_lengths[2] + 1) + "+"
+        res += "-" * (self.term_width - len(res) - 1)
+        return res
+
+    def render(self, term_width, term_height):
+        """
+        Returns lines of the table, title and footer, as expected by `printer.printer`.
+        """
+        if self.term_width != term_width:
+            self.term_width = term_width
+            column_lengths = self.column_lengths
+            # 9 is for " | " between columns, 3 for margin.
+            column_lengths[3] = max(10, term_width - column_lengths[0] - column_lengths[1] - column_lengths[2] - 9 - 3)
+            self.rows.clear()
+            self.lines = None
+        if self.lines is not None and not self.rows.has_dirty():
+            return self.lines, None, "Use arrows to move."
+
+        separator = self._line_separator()
+        lines = [separator,
+                 "  " + "Test".ljust(self.column_lengths[0]) + " | " + "Group".ljust(self.column_lengths[1] - 1) +
+                 " | " + "Status" + " | " + "Output",
+                 separator]
+        last_group = None
+        for test_path in self.tests:
+            group = self.table_data.results[test_path].test_group
+            if last_group is not None and last_group != group:
+                lines.append(separator)
+            last_group = group
+            lines.extend(self.rows.get(test_path))
+        lines += [separator, "", ""]
+        self.lines = lines
+        return lines, None, "Use arrows to move."
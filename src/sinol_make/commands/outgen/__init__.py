@@ -8,7 +8,8 @@ import multiprocessing as mp
 from sinol_make import util
 from sinol_make.commands.outgen.outgen_util import get_correct_solution, compile_correct_solution, generate_output
 from sinol_make.structs.gen_structs import OutputGenerationArguments
-from sinol_make.helpers import parsers, package_util, cache, paths
+from sinol_make.helpers import parsers, package_util, cache
+from sinol_make.helpers.package_index import PackageIndex
 from sinol_make.interfaces.BaseCommand import BaseCommand
 
 
@@ -76,11 +77,12 @@ class Command(BaseCommand):
         md5_sums = {}
         outputs_to_generate = []
         from_inputs = []
+        tests_md5_sums = util.get_files_md5(tests)
         for file in tests:
             basename = os.path.basename(file)
             output_basename = os.path.splitext(os.path.basename(basename))[0] + '.out'
             output_path = os.path.join(os.getcwd(), 'out', output_basename)
-            md5_sums[basename] = util.get_file_md5(file)
+            md5_sums[basename] = tests_md5_sums[file]
 
             if old_md5_sums is None or old_md5_sums.get(basename, '') != md5_sums[basename]:
                 outputs_to_generate.append(output_path)
@@ -96,13 +98,7 @@ class Command(BaseCommand):
         """
         Cleans cache for the given input files.
         """
-        md5_sums = [util.get_file_md5(file) for file in inputs]
-        for solution in glob.glob(paths.get_cache_path("md5sums", "*")):
-            sol_cache = cache.get_cache_file(solution)
-            for input in md5_sums:
-                if input in sol_cache.tests:
-                    del sol_cache.tests[input]
-            sol_cache.save(solution)
+        cache.remove_tests_results(list(util.get_files_md5(inputs).values()))
 
     def run(self, args: argparse.Namespace):
         args = util.init_package_command(args)
@@ -112,7 +108,7 @@ class Command(BaseCommand):
         self.task_type = package_util.get_task_type_cls()
         if not self.task_type.run_outgen():
             util.exit_with_error('Output generation is not supported for this task type.')
-        package_util.validate_test_names(self.task_id)
+        PackageIndex(self.task_id).validate_test_names()
         util.change_stack_size_to_unlimited()
         cache.check_correct_solution(self.task_id)
         self.correct_solution = get_correct_solution(self.task_id)
@@ -1,24 +1,29 @@
 # Modified version of https://sinol3.dasie.mimuw.edu.pl/oij/jury/package/-/blob/master/runner.py
 # Author of the original code: Bartosz Kostka <kostka@oij.edu.pl>
 # Version 0.6 (2021-08-29)
+import queue
 import threading
 import glob
 import shutil
 import os
 import collections
+import copy
 import sys
 import math
 import dictdiffer
 import multiprocessing as mp
-from io import StringIO
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Union
 
 from sinol_make import contest_types, util, sio2jail
-from sinol_make.structs.run_structs import ExecutionData, PrintData
+from sinol_make.structs.run_structs import ExecutionData, PrintData, CpuLayout
 from sinol_make.structs.cache_structs import CacheTest, CacheFile
 from sinol_make.interfaces.BaseCommand import BaseCommand
 from sinol_make.interfaces.Errors import CompilationError, UnknownContestType
-from sinol_make.helpers import compile, compiler, package_util, printer, paths, cache, parsers
+from sinol_make.helpers import compile, compiler, package_util, printer, paths, cache, parsers, affinity, batch_checker
+from sinol_make.helpers.package_index import PackageIndex
+from sinol_make.helpers.progress import ProgressReporter
+from sinol_make.executors.cgroup import CgroupExecutor
 from sinol_make.structs.status_structs import Status, ResultChange, PointsChange, ValidationResult, ExecutionResult, \
     TotalPointsChange
 
@@ -48,6 +53,7 @@ def color_time(time, limit):
 def colorize_status(status):
     if status == Status.OK: return util.bold(util.color_green(status))
     if status == Status.PENDING: return util.warning(status)
+    if status == Status.SKIPPED: return util.color_gray(status.value)
     return util.error(status)
 
 
@@ -61,201 +67,262 @@ def colorize_points(points, min_points, max_points):
 
 
 def update_group_status(group_status, new_status):
-    order = [Status.CE, Status.TL, Status.ML, Status.RE, Status.WA, Status.OK, Status.PENDING]
+    order = [Status.CE, Status.TL, Status.ML, Status.RE, Status.WA, Status.OK, Status.SKIPPED, Status.PENDING]
     if order.index(new_status) < order.index(group_status):
         return new_status
     return group_status
 
 
-def print_view(term_width, term_height, task_id, program_groups_scores, all_results, print_data: PrintData, names, executions,
-               groups, scores, tests, possible_score, cpus, hide_memory, config, contest, args):
-    width = term_width - 11  # First column has 6 characters, the " | " separator has 3 characters and 2 for margin
-    # First column has 11 characters and each solution has 13 characters and the " | " separator has 3 characters
-    programs_in_row = width // 16
-    if programs_in_row == 0:
-        return ["Terminal window is too small to display the results."], None, None
-
-    previous_stdout = sys.stdout
-    output = StringIO()
-    sys.stdout = output
-
-    program_scores = collections.defaultdict(int)
-    # program_times and program_memory are dictionaries of tuples (max, limit),
-    # where max is the maximum time/memory used by a program and
-    # limit is the time/memory limit of the test that caused the maximum
-    # time/memory usage.
-    program_times = collections.defaultdict(lambda: (-1, 0))
-    program_memory = collections.defaultdict(lambda: (-1, 0))
-
-    time_sum = 0
-    for solution in names:
-        lang = package_util.get_file_lang(solution)
-        for test in tests:
-            time_sum += package_util.get_time_limit(test, config, lang, task_id, args)
-
-    time_remaining = (len(executions) - print_data.i - 1) * 2 * time_sum / cpus / 1000.0
-    title = 'Done %4d/%4d. Time remaining (in the worst case): %5d seconds.' \
-            % (print_data.i + 1, len(executions), time_remaining)
-    title = title.center(term_width)
-    margin = "  "
-    for program_ix in range(0, len(names), programs_in_row):
-        program_group = names[program_ix:program_ix + programs_in_row]
-
-        def print_table_end():
-            print("-" * 8, end="-+-")
-            for i in range(len(program_group)):
-                if i != len(program_group) - 1:
-                    print("-" * 13, end="-+-")
-                else:
-                    print("-" * 13, end="-+")
-            print()
-
-        print_table_end()
+class ResultsTable:
+    """
+    Table with results of solutions, printed while solutions are running and after all of them are finished.
+    Cells of the table are rendered again only after results they show change (see `update`),
+    and only lines visible on the screen are rendered.
+    """
 
-        print(margin + "groups", end=" | ")
-        next_row = {solution: solution for solution in program_group}
-        first = True
-        while next_row != {}:
-            if first:
-                first = False
+    def __init__(self, task_id, program_groups_scores, all_results, print_data: PrintData, names, executions, groups,
+                 scores, tests, possible_score, cpus, hide_memory, limits: package_util.LimitTable, contest):
+        """
+        :param program_groups_scores: Dictionary filled with scores of groups: {"<program>": {<group>: {"status": ..., "points": ...}}}
+        :param all_results: Results of solutions: {"<program>": {<group>: {"<test>": ExecutionResult}}}
+        :param executions: List of executions, which can grow while solutions are compiled.
+        """
+        self.task_id = task_id
+        self.program_groups_scores = program_groups_scores
+        self.all_results = all_results
+        self.print_data = print_data
+        self.names = names
+        self.executions = executions
+        self.groups = groups
+        self.scores = scores
+        self.tests = tests
+        self.possible_score = possible_score
+        self.cpus = cpus
+        self.hide_memory = hide_memory
+        self.limits = limits
+        self.contest = contest
+
+        self.langs = {name: package_util.get_file_lang(name) for name in names}
+        self.test_groups = {test: package_util.get_group(test, task_id) for test in tests}
+        self.time_sum = sum(limits.get_time_limit(test, self.langs[name]) for name in names for test in tests)
+        # Cells of groups: {(program, group): (text, time effect, memory effect)}, see `_render_group`.
+        self.group_cells = printer.CellCache(self._render_group)
+        # Summary of programs: {program: (points, time, memory)}
+        self.program_cells = printer.CellCache(self._render_program)
+        # Cells of tests: {(program, test): (status and time, points and memory)}
+        self.test_cells = printer.CellCache(self._render_test)
+        # Layouts of lines for terminal widths: {width: [line]}, see `_get_layout`.
+        self.layouts = {}
+        for program in names:
+            for group in groups:
+                self._update_group_score(program, group)
+
+    def update(self, program, group, test):
+        """
+        Updates the score of the group and marks cells showing the result of `program` on `test` as dirty.
+        Has to be called after the result changes.
+        """
+        self._update_group_score(program, group)
+        self.test_cells.mark_dirty((program, test))
+        self.group_cells.mark_dirty((program, group))
+        self.program_cells.mark_dirty(program)
+
+    def _update_group_score(self, program, group):
+        results = self.all_results[program][group]
+        group_status = Status.OK
+        test_scores = []
+        for test in results:
+            status = results[test].Status
+            if status == Status.SKIPPED:
+                continue
+            test_scores.append(results[test].Points)
+            if status == Status.PENDING:
+                group_status = Status.PENDING
             else:
-                print(margin + " " * 6, end=" | ")
-
-            for solution in program_group:
-                if solution in next_row:
-                    to_print = next_row[solution]
-                    if len(to_print) > 13:
-                        print(to_print[:13], end=" | ")
-                        next_row[solution] = to_print[13:]
-                    else:
-                        print(to_print.ljust(13), end=" | ")
-                        del next_row[solution]
-                else:
-                    print(" " * 13, end=" | ")
-            print()
-
-        print(8 * "-", end=" | ")
-        for program in program_group:
-            print(13 * "-", end=" | ")
-        print()
-        for group in groups:
-            print(margin + "%6s" % group, end=" | ")
-            for program in program_group:
-                lang = package_util.get_file_lang(program)
-                results = all_results[program][group]
-                group_status = Status.OK
-                test_scores = []
-
-                for test in results:
-                    test_scores.append(results[test].Points)
-                    status = results[test].Status
-                    if results[test].Time is not None:
-                        if program_times[program][0] < results[test].Time:
-                            program_times[program] = (results[test].Time, package_util.get_time_limit(test, config,
-                                                                                                      lang, task_id, args))
-                    elif status == Status.TL:
-                        program_times[program] = (2 * package_util.get_time_limit(test, config, lang, task_id, args),
-                                                  package_util.get_time_limit(test, config, lang, task_id, args))
-                    if results[test].Memory is not None:
-                        if program_memory[program][0] < results[test].Memory:
-                            program_memory[program] = (results[test].Memory, package_util.get_memory_limit(test, config,
-                                                                                                           lang, task_id, args))
-                    elif status == Status.ML:
-                        program_memory[program] = (2 * package_util.get_memory_limit(test, config, lang, task_id, args),
-                                                   package_util.get_memory_limit(test, config, lang, task_id, args))
-                    if status == Status.PENDING:
-                        group_status = Status.PENDING
-                    else:
-                        group_status = update_group_status(group_status, status)
+                group_status = update_group_status(group_status, status)
+        if len(test_scores) == 0:
+            # All tests were skipped by `--short-circuit`, because the score of the solution was decided.
+            group_status = Status.SKIPPED
+            test_scores = [self.contest.min_score_per_test()]
+        points = self.contest.get_group_score(test_scores, self.scores[group])
+        self.program_groups_scores[program][group] = {"status": group_status, "points": points}
+
+    def _render_group(self, key):
+        program, group = key
+        lang = self.langs[program]
+        results = self.all_results[program][group]
+        # Maximum time and memory are computed as tuples (max, limit), where limit is the limit of the test that
+        # caused the maximum usage. A test with TL or ML status without measured usage replaces the maximum,
+        # so effects of groups are pairs (replacement or None, maximum of the following tests).
+        time_replacement, max_time = None, (-1, 0)
+        memory_replacement, max_memory = None, (-1, 0)
+
+        for test in results:
+            status = results[test].Status
+            if status == Status.SKIPPED:
+                continue
+            if results[test].Time is not None:
+                if max_time[0] < results[test].Time:
+                    max_time = (results[test].Time, self.limits.get_time_limit(test, lang))
+            elif status == Status.TL:
+                time_limit = self.limits.get_time_limit(test, lang)
+                time_replacement, max_time = (2 * time_limit, time_limit), (-1, 0)
+            if results[test].Memory is not None:
+                if max_memory[0] < results[test].Memory:
+                    max_memory = (results[test].Memory, self.limits.get_memory_limit(test, lang))
+            elif status == Status.ML:
+                memory_limit = self.limits.get_memory_limit(test, lang)
+                memory_replacement, max_memory = (2 * memory_limit, memory_limit), (-1, 0)
+
+        group_status = self.program_groups_scores[program][group]["status"]
+        points = self.program_groups_scores[program][group]["points"]
+        if any([results[test].Status == Status.PENDING for test in results]):
+            text = " " * 6 + ("?" * len(str(self.scores[group]))).rjust(3) + f'/{str(self.scores[group]).rjust(3)}'
+        else:
+            if group_status == Status.OK:
+                status_text = util.bold(util.color_green(group_status.ljust(6)))
+            else:
+                status_text = util.bold(util.color_red(group_status.ljust(6)))
+            text = f"{status_text}{str(int(points)).rjust(3)}/{str(self.scores[group]).rjust(3)}"
+        return text, (time_replacement, max_time), (memory_replacement, max_memory)
+
+    def _render_program(self, program):
+        program_time = (-1, 0)
+        program_memory = (-1, 0)
+        for group in self.groups:
+            _, (time_replacement, max_time), (memory_replacement, max_memory) = self.group_cells.get((program, group))
+            if time_replacement is not None:
+                program_time = time_replacement
+            if program_time[0] < max_time[0]:
+                program_time = max_time
+            if memory_replacement is not None:
+                program_memory = memory_replacement
+            if program_memory[0] < max_memory[0]:
+                program_memory = max_memory
+        program_score = self.contest.get_global_score(self.program_groups_scores[program], self.possible_score)
+
+        points = util.bold("      %3s/%3s" % (program_score, self.possible_score))
+        time = util.bold(("%23s" % color_time(program_time[0], program_time[1]))
+                         if program_time[0] < 2 * program_time[1] and program_time[0] >= 0
+                         else "      " + 7 * '-')
+        memory = util.bold(("%23s" % color_memory(program_memory[0], program_memory[1]))
+                           if program_memory[0] < 2 * program_memory[1] and program_memory[0] >= 0
+                           else "      " + 7 * '-')
+        return points, time, memory
+
+    def _render_test(self, key):
+        program, test = key
+        lang = self.langs[program]
+        result = self.all_results[program][self.test_groups[test]][test]
+        status = result.Status
+        if status == Status.PENDING:
+            first_line = 13 * ' '
+        else:
+            first_line = "%3s" % colorize_status(status) + " " + \
+                         (("%20s" % color_time(result.Time, self.limits.get_time_limit(test, lang)))
+                          if result.Time is not None else 10 * " ")
+        if result.Status not in (Status.PENDING, Status.SKIPPED):
+            second_line = colorize_points(int(result.Points), self.contest.min_score_per_test(),
+                                          self.contest.max_score_per_test()).ljust(13)
+        else:
+            second_line = 3 * " "
+        second_line += ("%20s" % color_memory(result.Memory, self.limits.get_memory_limit(test, lang))) \
+            if result.Memory is not None else 10 * " "
+        return first_line, second_line
 
-                points = contest.get_group_score(test_scores, scores[group])
-                if any([results[test].Status == Status.PENDING for test in results]):
-                    print(" " * 6 + ("?" * len(str(scores[group]))).rjust(3) +
-                          f'/{str(scores[group]).rjust(3)}', end=' | ')
-                else:
-                    if group_status == Status.OK:
-                        status_text = util.bold(util.color_green(group_status.ljust(6)))
-                    else:
-                        status_text = util.bold(util.color_red(group_status.ljust(6)))
-                    print(f"{status_text}{str(int(points)).rjust(3)}/{str(scores[group]).rjust(3)}", end=' | ')
-                program_groups_scores[program][group] = {"status": group_status, "points": points}
-            print()
-        for program in program_group:
-            program_scores[program] = contest.get_global_score(program_groups_scores[program], possible_score)
-
-        print(8 * " ", end=" | ")
-        for program in program_group:
-            print(13 * " ", end=" | ")
-        print()
-        print(margin + "points", end=" | ")
-        for program in program_group:
-            print(util.bold("      %3s/%3s" % (program_scores[program], possible_score)), end=" | ")
-        print()
-        print(margin + "  time", end=" | ")
-        for program in program_group:
-            program_time = program_times[program]
-            print(util.bold(("%23s" % color_time(program_time[0], program_time[1]))
-                            if program_time[0] < 2 * program_time[1] and program_time[0] >= 0
-                            else "      " + 7 * '-'), end=" | ")
-        print()
-        print(margin + "memory", end=" | ")
-        for program in program_group:
-            program_mem = program_memory[program]
-            print(util.bold(("%23s" % color_memory(program_mem[0], program_mem[1]))
-                            if program_mem[0] < 2 * program_mem[1] and program_mem[0] >= 0
-                            else "      " + 7 * '-'), end=" | ")
-        print()
-        print(8*" ", end=" | ")
-        for program in program_group:
-            print(13*" ", end=" | ")
-        print()
-
-        def print_group_seperator():
-            print(8 * "-", end=" | ")
-            for program in program_group:
-                print(13 * "-", end=" | ")
-            print()
-
-        print_group_seperator()
-
-        last_group = None
-        for test in tests:
-            group = package_util.get_group(test, task_id)
-            if last_group != group:
-                if last_group is not None:
-                    print_group_seperator()
-                last_group = group
-
-            print(margin + "%6s" % package_util.extract_test_id(test, task_id), end=" | ")
-            for program in program_group:
-                lang = package_util.get_file_lang(program)
-                result = all_results[program][package_util.get_group(test, task_id)][test]
-                status = result.Status
-                if status == Status.PENDING: print(13 * ' ', end=" | ")
-                else:
-                    print("%3s" % colorize_status(status),
-                         ("%20s" % color_time(result.Time, package_util.get_time_limit(test, config, lang, task_id, args)))
-                         if result.Time is not None else 10*" ", end=" | ")
-            print()
-            if not hide_memory:
-                print(8*" ", end=" | ")
-                for program in program_group:
-                    lang = package_util.get_file_lang(program)
-                    result = all_results[program][package_util.get_group(test, task_id)][test]
-                    if result.Status != Status.PENDING:
-                        print(colorize_points(int(result.Points), contest.min_score_per_test(),
-                                              contest.max_score_per_test()).ljust(13), end="")
+    def _get_layout(self, programs_in_row):
+        """
+        Returns lines of the table. Lines which don't depend on results are strings, other lines are tuples
+        (kind of the line, programs shown in the line, group or test).
+        """
+        if programs_in_row in self.layouts:
+            return self.layouts[programs_in_row]
+        margin = "  "
+        layout = []
+        for program_ix in range(0, len(self.names), programs_in_row):
+            program_group = self.names[program_ix:program_ix + programs_in_row]
+            table_end = "-" * 8 + "-+-" + "-+-".join(["-" * 13] * len(program_group)) + "-+"
+            group_separator = 8 * "-" + " | " + "".join(13 * "-" + " | " for _ in program_group)
+            empty_line = 8 * " " + " | " + "".join(13 * " " + " | " for _ in program_group)
+            layout.append(table_end)
+
+            next_row = {solution: solution for solution in program_group}
+            line = margin + "groups" + " | "
+            while next_row != {}:
+                for solution in program_group:
+                    if solution in next_row:
+                        to_print = next_row[solution]
+                        if len(to_print) > 13:
+                            line += to_print[:13] + " | "
+                            next_row[solution] = to_print[13:]
+                        else:
+                            line += to_print.ljust(13) + " | "
+                            del next_row[solution]
                     else:
-                        print(3*" ", end="")
-                    print(("%20s" % color_memory(result.Memory, package_util.get_memory_limit(test, config, lang, task_id, args)))
-                          if result.Memory is not None else 10*" ", end=" | ")
-                print()
+                        line += " " * 13 + " | "
+                layout.append(line)
+                line = margin + " " * 6 + " | "
+
+            layout.append(group_separator)
+            for group in self.groups:
+                layout.append(("group", program_group, group))
+            layout.append(empty_line)
+            layout.append(("points", program_group, None))
+            layout.append(("time", program_group, None))
+            layout.append(("memory", program_group, None))
+            layout.append(empty_line)
+            layout.append(group_separator)
+
+            last_group = None
+            for test in self.tests:
+                group = self.test_groups[test]
+                if last_group != group:
+                    if last_group is not None:
+                        layout.append(group_separator)
+                    last_group = group
+                layout.append(("test", program_group, test))
+                if not self.hide_memory:
+                    layout.append(("test_memory", program_group, test))
+
+            layout.append(table_end)
+            layout.append("")
+        self.layouts[programs_in_row] = layout
+        return layout
+
+    def _render_line(self, line):
+        if isinstance(line, str):
+            return line
+        kind, program_group, key = line
+        margin = "  "
+        if kind == "group":
+            cells = [self.group_cells.get((program, key))[0] for program in program_group]
+            label = margin + "%6s" % key
+        elif kind in ("points", "time", "memory"):
+            index = ["points", "time", "memory"].index(kind)
+            cells = [self.program_cells.get(program)[index] for program in program_group]
+            label = margin + kind.rjust(6)
+        else:
+            index = 0 if kind == "test" else 1
+            cells = [self.test_cells.get((program, key))[index] for program in program_group]
+            label = (margin + "%6s" % package_util.extract_test_id(key, self.task_id)) if kind == "test" else 8 * " "
+        return label + " | " + "".join(cell + " | " for cell in cells)
 
-        print_table_end()
-        print()
+    def render(self, term_width, term_height):
+        """
+        Returns lines of the table, title and footer, as expected by `printer.printer`.
+        """
+        width = term_width - 11  # First column has 6 characters, the " | " separator has 3 characters and 2 for margin
+        # First column has 11 characters and each solution has 13 characters and the " | " separator has 3 characters
+        programs_in_row = width // 16
+        if programs_in_row == 0:
+            return ["Terminal window is too small to display the results."], None, None
 
-    sys.stdout = previous_stdout
-    return output.getvalue().splitlines(), title, "Use arrows to move."
+        time_remaining = (len(self.executions) - self.print_data.i - 1) * 2 * self.time_sum / self.cpus / 1000.0
+        title = 'Done %4d/%4d. Time remaining (in the worst case): %5d seconds.' \
+                % (self.print_data.i + 1, len(self.executions), time_remaining)
+        title = title.center(term_width)
+        layout = self._get_layout(programs_in_row)
+        return printer.LazyLines(len(layout), lambda i: self._render_line(layout[i])), title, "Use arrows to move."
 
 
 class Command(BaseCommand):
@@ -290,6 +357,8 @@ class Command(BaseCommand):
         parser.add_argument('--hide-memory', dest='hide_memory', action='store_true',
                             help='hide memory usage in report')
         parsers.add_time_tool_argument(parser)
+        parsers.add_short_circuit_argument(parser)
+        parsers.add_resume_argument(parser)
         parser.add_argument('--sio2jail-path', dest='sio2jail_path', type=str,
                             help='path to sio2jail executable (default: `~/.local/bin/sio2jail`)')
         parser.add_argument('-a', '--apply-suggestions', dest='apply_suggestions', action='store_true',
@@ -301,6 +370,13 @@ class Command(BaseCommand):
                             help='allow running the script without full outputs')
         parser.add_argument('-o', '--comments', dest='comments', action='store_true',
                             help="show checker's comments")
+        parser.add_argument('--online-check', dest='online_check', action='store_true',
+                            help='compare outputs with answers while solutions run and stop solutions on their first '
+                                 'wrong token, without saving outputs. Works only for tasks without a checker. '
+                                 'Stopped solutions get WA, even if they would exceed the time limit later.')
+        parser.add_argument('--keep-outputs', dest='keep_outputs', action='store_true',
+                            help='save outputs of solutions to .cache/executions when using --online-check '
+                                 '(only up to the first wrong token)')
         parsers.add_compilation_arguments(parser)
         return parser
 
@@ -308,8 +384,18 @@ class Command(BaseCommand):
         return os.path.split(file_path)[1]
 
     def get_group(self, test_path):
+        if self.index is not None:
+            return self.index.get_group(test_path)
         return package_util.get_group(test_path, self.ID)
 
+    def get_index(self) -> PackageIndex:
+        """
+        Returns index of the package, which is created on first use.
+        """
+        if self.index is None:
+            self.index = PackageIndex(self.ID)
+        return self.index
+
     def get_solution_from_exe(self, executable):
         file = os.path.splitext(executable)[0]
         for ext in self.SOURCE_EXTENSIONS:
@@ -326,15 +412,34 @@ class Command(BaseCommand):
     def get_groups(self, tests):
         return sorted(list(set([self.get_group(test) for test in tests])))
 
-    def compile_solutions(self, solutions):
-        print("Compiling %d solutions..." % len(solutions))
-        args = [(solution, None, True, False, None) for solution in solutions]
-        with mp.Pool(self.cpus) as pool:
-            compilation_results = pool.starmap(self.compile, args)
-        return compilation_results
+    @staticmethod
+    def get_compile_log_path(solution):
+        return paths.get_compilation_log_path("%s.compile_log" % package_util.get_file_name(solution))
 
-    def compile(self, solution, dest=None, use_extras=False, clear_cache=False, name=None):
-        compile_log_file = paths.get_compilation_log_path("%s.compile_log" % package_util.get_file_name(solution))
+    @staticmethod
+    def print_compilation_result(name, success, compile_log_file):
+        if success:
+            print(util.info(f"Compilation of {name} was successful."))
+        else:
+            print(util.error(f"Compilation of {name} was unsuccessful."))
+            compile.print_compile_log(compile_log_file)
+
+    def get_compilation_threads(self, cpu_layout: Union[CpuLayout, None]) -> int:
+        """
+        Returns the number of solutions compiled at once. Compilations overlap with executions, so they use
+        only cpus not used by the workers measuring solutions (at least one, so that anything gets compiled).
+        """
+        if cpu_layout is not None:
+            return len(cpu_layout.housekeeping_cpus)
+        return max(1, (os.cpu_count() or 1) - self.cpus)
+
+    def compile(self, solution, dest=None, use_extras=False, clear_cache=False, name=None, print_result=True):
+        """
+        Compiles a program and returns whether the compilation was successful.
+        :param print_result: If False, the result isn't printed, so that it can be printed later
+                             with `print_compilation_result` (for example when the results table is shown).
+        """
+        compile_log_file = self.get_compile_log_path(solution)
         source_file = os.path.join(os.getcwd(), "prog", self.get_solution_from_exe(solution))
         if dest:
             output = dest
@@ -363,33 +468,185 @@ class Command(BaseCommand):
             with open(compile_log_file, "w") as compile_log:
                 compile.compile(source_file, output, self.compilers, compile_log, self.args.compile_mode,
                                 extra_compilation_args, extra_compilation_files, clear_cache=clear_cache)
-            print(util.info(f"Compilation of {name} was successful."))
-            return True
-        except CompilationError as e:
-            print(util.error(f"Compilation of {name} was unsuccessful."))
-            compile.print_compile_log(compile_log_file)
-            return False
+            success = True
+        except CompilationError:
+            success = False
+        if print_result:
+            self.print_compilation_result(name, success, compile_log_file)
+        return success
+
+    def get_execution_file(self, name, test, ext):
+        """
+        Returns path to a file of the execution of solution `name` on `test`, for example the output file.
+        """
+        return paths.get_executions_path(name, package_util.extract_test_id(test, self.ID) + ext)
 
     def run_solution(self, data_for_execution: ExecutionData):
         """
         Run an execution and return the result as ExecutionResult object.
         """
+        return self.check_solution(data_for_execution, self.execute_solution(data_for_execution))
 
+    def execute_solution(self, data_for_execution: ExecutionData):
+        """
+        Run an execution without checking its output (see `check_solution`) and return the result
+        as ExecutionResult object.
+        """
         (name, executable, test, time_limit, memory_limit, timetool_path, execution_dir) = data_for_execution
-        file_no_ext = paths.get_executions_path(name, package_util.extract_test_id(test, self.ID))
-        output_file = file_no_ext + ".out"
-        result_file = file_no_ext + ".res"
         hard_time_limit = math.ceil(2 * time_limit / 1000.0)
 
-        return self.task_type.run(time_limit, hard_time_limit, memory_limit, test, output_file,
-                                  package_util.get_out_from_in(test), result_file, executable, execution_dir)
+        return self.task_type.execute(time_limit, hard_time_limit, memory_limit, test,
+                                      self.get_execution_file(name, test, ".out"), package_util.get_out_from_in(test),
+                                      self.get_execution_file(name, test, ".res"), executable, execution_dir)
+
+    def check_solution(self, data_for_execution: ExecutionData, result: ExecutionResult):
+        """
+        Check output of an execution returned by `execute_solution` and return the updated result.
+        """
+        (name, executable, test) = data_for_execution[:3]
+        return self.task_type.check_result(result, test, self.get_execution_file(name, test, ".out"),
+                                           package_util.get_out_from_in(test))
 
-    def run_solutions(self, compiled_commands, names, solutions, executables_dir):
+    @staticmethod
+    def get_cached_cost(cache_test: CacheTest) -> Union[int, None]:
+        """
+        Returns wall time (in milliseconds) which the cached execution took or None if it's unknown.
+        Executions which exceeded the time limit run until the hard time limit, which is twice the time limit.
+        """
+        if cache_test.result.Status == Status.TL:
+            return 2 * cache_test.time_limit
+        return cache_test.result.Time
+
+    def sort_executions(self, executions, all_cache_files: Dict[str, CacheFile]):
+        """
+        Sorts executions by expected running time in descending order, so that the longest executions
+        don't start at the end of the run and leave other cpus idle. Expected running time is taken from
+        cached results of the same solution on the same test, or else the average of cached results of other
+        solutions on the same test. Tests without any cached results are estimated by their input file size.
+        """
+        test_costs = collections.defaultdict(list)
+        for cache_file in all_cache_files.values():
+            for md5sum, cache_test in cache_file.tests.items():
+                cost = self.get_cached_cost(cache_test)
+                if cost is not None:
+                    test_costs[md5sum].append(cost)
+
+        # Milliseconds per byte of input, used for tests without cached results.
+        known_time, known_size = 0, 0
+        input_sizes = {}
+        for test in self.tests:
+            package_test = self.get_index().get_test(test)
+            input_sizes[test] = package_test.size if package_test is not None else os.path.getsize(test)
+            costs = test_costs.get(self.test_md5sums[os.path.basename(test)], [])
+            if costs:
+                known_time += sum(costs) / len(costs)
+                known_size += input_sizes[test]
+        ms_per_byte = known_time / known_size if known_time > 0 and known_size > 0 else 1
+
+        def expected_cost(execution):
+            name, _, test = execution[:3]
+            md5sum = self.test_md5sums[os.path.basename(test)]
+            cache_test = all_cache_files[name].tests.get(md5sum, None)
+            if cache_test is not None and self.get_cached_cost(cache_test) is not None:
+                return self.get_cached_cost(cache_test)
+            costs = test_costs.get(md5sum, [])
+            if costs:
+                return sum(costs) / len(costs)
+            return input_sizes[test] * ms_per_byte
+
+        executions.sort(key=lambda x: (-expected_cost(x), package_util.get_executable_key(x[1], self.ID), x[2]))
+
+    def execute_in_pool(self, pool, check_pool, pending, is_skipped, compilations):
+        """
+        Runs executions from the `pending` list in the pool and yields tuples (execution, result) in order
+        of completion. Executions are sent to the pool one by one, from the beginning of `pending`, so that
+        at most `self.cpus` of them are running at once. Outputs of finished executions are checked
+        in `check_pool`, so that checkers don't occupy the pool. Executions for which `is_skipped` returns True
+        aren't run and None is yielded for them instead of the result.
+        `compilations` is a list of tuples (future, callback). When a future is done, the callback is called
+        with it in this thread. The callback can add new executions to `pending`.
+        """
+        events = queue.Queue()
+        for future, callback in compilations:
+            future.add_done_callback(lambda future, callback=callback: events.put(("compiled", callback, future)))
+        compiling = len(compilations)
+        running = 0
+        checking = 0
+
+        def on_checked(future, execution):
+            if future.exception() is not None:
+                events.put(("failed", None, future.exception()))
+            else:
+                events.put(("checked", execution, future.result()))
+
+        while True:
+            while running < self.cpus and pending:
+                execution = pending.pop(0)
+                if is_skipped(execution):
+                    yield execution, None
+                    continue
+                pool.apply_async(self.execute_solution, (execution,),
+                                 callback=lambda result, execution=execution:
+                                 events.put(("executed", execution, result)),
+                                 error_callback=lambda error: events.put(("failed", None, error)))
+                running += 1
+            if running == 0 and checking == 0 and compiling == 0 and not pending:
+                return
+
+            event, data, value = events.get()
+            if event == "compiled":
+                compiling -= 1
+                data(value)
+            elif event == "executed":
+                running -= 1
+                checking += 1
+                check_pool.submit(self.check_solution, data, value).add_done_callback(
+                    lambda future, execution=data: on_checked(future, execution))
+            elif event == "checked":
+                checking -= 1
+                yield data, value
+            else:
+                raise value
+
+    def get_cpu_layout(self) -> Union[CpuLayout, None]:
+        """
+        Returns assignment of cpus to workers or None if workers are not pinned. The default number of workers
+        is based on the number of logical cpus, so it's lowered to the number of physical cores
+        which can be assigned to workers. A number of workers given with `--cpus` isn't changed,
+        so pinning is disabled if there are not enough physical cores for them.
+        """
+        cpu_layout = affinity.get_layout(self.cpus)
+        if cpu_layout is None or len(cpu_layout.worker_cpus) == self.cpus:
+            return cpu_layout
+        if getattr(self.args, 'cpus', None) is not None:
+            return None
+        self.cpus = len(cpu_layout.worker_cpus)
+        return cpu_layout
+
+    def create_pool(self, cpu_layout: Union[CpuLayout, None]):
+        """
+        Creates the pool in which solutions are run. If `cpu_layout` is not None,
+        every worker is pinned to its own physical core.
+        """
+        if cpu_layout is None:
+            return mp.Pool(self.cpus)
+        cpu_queue = mp.SimpleQueue()
+        for cpu in cpu_layout.worker_cpus:
+            cpu_queue.put(cpu)
+        return mp.Pool(self.cpus, initializer=affinity.pin_worker, initargs=(cpu_queue, cpu_layout.housekeeping_cpus))
+
+    def run_solutions(self, compiled_commands, names, solutions, executables_dir, pool, cpu_layout):
         """
         Run solutions on tests and print the results as a table to stdout.
+        :param compiled_commands: List of tuples (name, executable, compilation), where compilation is a future
+                                  which returns whether the solution was compiled successfully. Executions of
+                                  a solution are started as soon as it is compiled.
+        :param pool: Pool created by `create_pool`, in which solutions are run
+        :param cpu_layout: Layout of cpus with which the pool was created
         """
 
         executions = []
+        pending = []
         all_cache_files: Dict[str, CacheFile] = {}
         all_results = collections.defaultdict(
             lambda: collections.defaultdict(lambda: collections.defaultdict(map)))
@@ -401,81 +658,201 @@ class Command(BaseCommand):
         for file in glob.glob(os.path.join(os.getcwd(), "prog", f"_{self.ID}lib.so")):
             shutil.copy(file, executables_dir)
 
-        for (name, executable, result) in compiled_commands:
-            lang = package_util.get_file_lang(name)
-            solution_cache = cache.get_cache_file(os.path.join(os.getcwd(), "prog", name))
-            all_cache_files[name] = solution_cache
+        compiled_commands = list(compiled_commands)
+        for (name, executable, compilation) in compiled_commands:
+            for test in self.tests:
+                all_results[name][self.get_group(test)][test] = ExecutionResult(Status.PENDING)
+        program_groups_scores = collections.defaultdict(dict)
+        print_data = PrintData(0)
+        table = ResultsTable(self.ID, program_groups_scores, all_results, print_data, names, executions, self.groups,
+                             self.scores, self.tests, self.possible_score, self.cpus, self.args.hide_memory,
+                             self.limits, self.contest)
+
+        def set_result(name, test, result):
+            group = self.get_group(test)
+            all_results[name][group][test] = result
+            table.update(name, group, test)
+
+        # Solutions with the same code are run once on every test and the result is used for all of them.
+        # Executables are identified by keys (language, key of their cached results, see `CacheFile.results_key`),
+        # which depend only on code and data of the executables, so sources differing only in comments
+        # or names share a key.
+        executable_keys = {}
+        # First compiled solution with each executable key: {key: name}
+        executable_owners = {}
+        # Solutions with the same code as another solution: {name: name of the other solution}
+        duplicates = {}
+        # Solutions waiting for results of scheduled executions: {(executable key, test): [name]}
+        waiting = {}
+        # Results of finished executions: {(executable key, test): ExecutionResult}
+        finished = {}
+        resume = getattr(self.args, 'resume', False)
+        if not resume and cache.journal_exists():
+            print(util.warning("Discarding results of an interrupted run. Use `--resume` to continue it next time."))
+        journal = cache.open_journal(resume)
+        replayed = 0
+
+        # Compilation results are printed after the results table, as they would break it.
+        has_terminal, terminal_width, terminal_height = util.get_terminal_size()
+        compilation_messages = []
 
-            if result:
-                for test in self.tests:
-                    test_time_limit = package_util.get_time_limit(test, self.config, lang, self.ID, self.args)
-                    test_memory_limit = package_util.get_memory_limit(test, self.config, lang, self.ID, self.args)
-
-                    test_result: CacheTest = solution_cache.tests.get(self.test_md5sums[os.path.basename(test)], None)
-                    if test_result is not None and test_result.time_limit == test_time_limit and \
-                            test_result.memory_limit == test_memory_limit and \
-                            test_result.time_tool == self.timetool_name:
-                        all_results[name][self.get_group(test)][test] = test_result.result
-                    else:
-                        executions.append((name, executable, test, test_time_limit, test_memory_limit,
-                                           self.timetool_path, os.path.dirname(executable)))
-                        all_results[name][self.get_group(test)][test] = ExecutionResult(Status.PENDING)
-                os.makedirs(paths.get_executions_path(name), exist_ok=True)
+        def on_compiled(name, executable, compilation):
+            nonlocal replayed
+            success = compilation.result()
+            if has_terminal:
+                compilation_messages.append((name, success))
             else:
+                self.print_compilation_result("file " + name, success, self.get_compile_log_path(name))
+            lang = package_util.get_file_lang(name)
+            if not success:
+                self.failed_compilations.append(name)
                 for test in self.tests:
-                    all_results[name][self.get_group(test)][test] = ExecutionResult(Status.CE)
-        print()
-        executions.sort(key = lambda x: (package_util.get_executable_key(x[1], self.ID), x[2]))
-        program_groups_scores = collections.defaultdict(dict)
-        print_data = PrintData(0)
+                    set_result(name, test, ExecutionResult(Status.CE))
+                return
+
+            solution_path = os.path.join(os.getcwd(), "prog", name)
+            if cache.get_cache_file(solution_path, tests=[]).executable_md5 == "":
+                # Solutions are compiled from the first source with their name (see `get_solution_from_exe`),
+                # so for example `abc.py` doesn't have its own cache file when `abc.cpp` exists.
+                # The cache file is needed to find results of its executable.
+                cache.save_compiled(solution_path, executable, self.args.compile_mode, False)
+            solution_cache = cache.get_cache_file(solution_path, tests=self.test_md5sums.values())
+            key = (lang, solution_cache.results_key)
+            executable_keys[name] = key
+            if key in executable_owners:
+                duplicates[name] = executable_owners[key]
+            else:
+                executable_owners[key] = name
 
-        has_terminal, terminal_width, terminal_height = util.get_terminal_size()
+            all_cache_files[name] = solution_cache
+            if resume:
+                replayed += cache.replay_journal({name: solution_cache})
+            os.makedirs(paths.get_executions_path(name), exist_ok=True)
+            for test in self.tests:
+                test_time_limit = self.limits.get_time_limit(test, lang)
+                test_memory_limit = self.limits.get_memory_limit(test, lang)
+
+                test_result: CacheTest = solution_cache.tests.get(self.test_md5sums[os.path.basename(test)], None)
+                if test_result is not None and test_result.time_limit == test_time_limit and \
+                        test_result.memory_limit == test_memory_limit and \
+                        test_result.time_tool == self.timetool_name:
+                    set_result(name, test, test_result.result)
+                    finished.setdefault((key, test), test_result.result)
+                elif (key, test) in finished:
+                    record_result(name, test, copy.copy(finished[(key, test)]))
+                elif (key, test) in waiting:
+                    waiting[(key, test)].append(name)
+                else:
+                    waiting[(key, test)] = [name]
+                    execution = (name, executable, test, test_time_limit, test_memory_limit,
+                                 self.timetool_path, os.path.dirname(executable))
+                    executions.append(execution)
+                    pending.append(execution)
+            self.sort_executions(pending, all_cache_files)
+
+        compilations = [(compilation, lambda compilation, name=name, executable=executable:
+                         on_compiled(name, executable, compilation))
+                        for (name, executable, compilation) in compiled_commands]
+        # Every worker gets its own physical core. The main process (with the printer thread) and checkers
+        # run on the remaining housekeeping cores.
+        if cpu_layout is not None:
+            previous_affinity = os.sched_getaffinity(0)
+            affinity.pin_current_thread(cpu_layout.housekeeping_cpus)
+            affinity.set_housekeeping_cpus(cpu_layout.housekeeping_cpus)
 
         if has_terminal:
             run_event = threading.Event()
             run_event.set()
-            thr = threading.Thread(target=printer.printer_thread,
-                                   args=(run_event, print_view, self.ID, program_groups_scores, all_results, print_data,
-                                         names, executions, self.groups, self.scores, self.tests, self.possible_score,
-                                         self.cpus, self.args.hide_memory, self.config, self.contest, self.args))
+            thr = threading.Thread(target=printer.printer_thread, args=(run_event, table.render))
             thr.start()
-
-        pool = mp.Pool(self.cpus)
+        else:
+            progress = ProgressReporter("executions", len(executions))
+
+        # Solutions (and groups of solutions) for which the score is decided, used by `--short-circuit`.
+        short_circuit = getattr(self.args, 'short_circuit', False)
+        decided_solutions = set()
+        decided_groups = set()
+
+        def is_skipped(execution):
+            if not short_circuit:
+                return False
+            name, test = execution[0], execution[2]
+            group = self.get_group(test)
+            return all(solution in decided_solutions or (solution, group) in decided_groups
+                       for solution in waiting[(executable_keys[name], test)])
+
+        def record_result(name, test, result):
+            group = self.get_group(test)
+            lang = package_util.get_file_lang(name)
+            test_time_limit = self.limits.get_time_limit(test, lang)
+            test_memory_limit = self.limits.get_memory_limit(test, lang)
+            result.Points = self.contest.get_test_score(result, test_time_limit, test_memory_limit)
+            set_result(name, test, result)
+
+            if short_circuit:
+                if self.contest.is_group_decided([result.Points for result in all_results[name][group].values()
+                                                  if result.Status not in (Status.PENDING, Status.SKIPPED)]):
+                    decided_groups.add((name, group))
+                if self.contest.is_run_decided([result.Points for group_results in all_results[name].values()
+                                                for result in group_results.values()
+                                                if result.Status not in (Status.PENDING, Status.SKIPPED)]):
+                    decided_solutions.add(name)
+
+            # We store the result in dictionary to write it to cache files later.
+            cache_test = CacheTest(
+                time_limit=test_time_limit,
+                memory_limit=test_memory_limit,
+                time_tool=self.timetool_name,
+                result=result
+            )
+            test_md5sum = self.test_md5sums[os.path.basename(test)]
+            all_cache_files[name].tests[test_md5sum] = cache_test
+            cache.append_to_journal(journal, name, all_cache_files[name], test_md5sum, cache_test)
+
+        # Outputs are checked in threads of this process, so checkers run on the housekeeping cpus.
+        check_pool = ThreadPoolExecutor(len(cpu_layout.housekeeping_cpus) if cpu_layout is not None else self.cpus)
         keyboard_interrupt = False
         try:
-            for i, result in enumerate(pool.imap(self.run_solution, executions)):
-                (name, executable, test, time_limit, memory_limit) = executions[i][:5]
-                contest_points = self.contest.get_test_score(result, time_limit, memory_limit)
-                result.Points = contest_points
-                all_results[name][self.get_group(test)][test] = result
-                print_data.i = i
-
-                # We store the result in dictionary to write it to cache files later.
-                lang = package_util.get_file_lang(name)
-                test_time_limit = package_util.get_time_limit(test, self.config, lang, self.ID, self.args)
-                test_memory_limit = package_util.get_memory_limit(test, self.config, lang, self.ID, self.args)
-                all_cache_files[name].tests[self.test_md5sums[os.path.basename(test)]] = CacheTest(
-                    time_limit=test_time_limit,
-                    memory_limit=test_memory_limit,
-                    time_tool=self.timetool_name,
-                    result=result
-                )
+            for done, (execution, result) in enumerate(self.execute_in_pool(pool, check_pool, pending, is_skipped,
+                                                                            compilations)):
+                (name, executable, test) = execution[:3]
+                print_data.i = done
+                if not has_terminal:
+                    progress.update(result is not None and result.Status != Status.OK, len(executions))
+                key = executable_keys[name]
+                for solution in waiting.pop((key, test)):
+                    if result is None:
+                        set_result(solution, test, ExecutionResult(Status.SKIPPED))
+                    else:
+                        record_result(solution, test, result if solution == name else copy.copy(result))
+                if result is not None:
+                    finished[(key, test)] = result
             pool.terminate()
         except KeyboardInterrupt:
             keyboard_interrupt = True
             pool.terminate()
         finally:
+            check_pool.shutdown(wait=not keyboard_interrupt, cancel_futures=keyboard_interrupt)
+            batch_checker.close_all()
             if has_terminal:
                 run_event.clear()
                 thr.join()
-
-        print("\n".join(print_view(terminal_width, terminal_height, self.ID, program_groups_scores, all_results, print_data,
-                                   names, executions, self.groups, self.scores, self.tests, self.possible_score,
-                                   self.cpus, self.args.hide_memory, self.config, self.contest, self.args)[0]))
-
-        # Write cache files.
-        for solution, cache_data in all_cache_files.items():
-            cache_data.save(os.path.join(os.getcwd(), "prog", solution))
+            if cpu_layout is not None:
+                affinity.pin_current_thread(previous_affinity)
+                affinity.set_housekeeping_cpus(None)
+
+        print("\n".join(table.render(terminal_width, terminal_height)[0]))
+        print(util.info(affinity.describe_layout(cpu_layout, self.cpus)))
+        for name, success in compilation_messages:
+            self.print_compilation_result("file " + name, success, self.get_compile_log_path(name))
+        if resume:
+            print(util.info(f"Restored {replayed} results of the interrupted run."))
+        for name, owner in sorted(duplicates.items()):
+            print(util.info(f"Solution {name} has the same code as {owner}, so they share results of executions."))
+
+        # Save results, including results journaled by the interrupted run for solutions which weren't run now.
+        journal.close()
+        cache.merge_journal(all_cache_files)
 
         if keyboard_interrupt:
             util.exit_with_error("Stopped due to keyboard interrupt.")
@@ -483,14 +860,43 @@ class Command(BaseCommand):
         return program_groups_scores, all_results
 
     def compile_and_run(self, solutions):
-        compilation_results = self.compile_solutions(solutions)
-        for i in range(len(solutions)):
-            if not compilation_results[i]:
-                self.failed_compilations.append(solutions[i])
-        executables = [paths.get_executables_path(package_util.get_executable(solution)) for solution in solutions]
-        compiled_commands = zip(solutions, executables, compilation_results)
-        names = solutions
-        return self.run_solutions(compiled_commands, names, solutions, paths.get_executables_path())
+        """
+        Compiles additional files (checker, interactor) and solutions concurrently. Solutions are run as soon as
+        they and additional files are compiled, while other solutions are still compiling.
+        """
+        # Workers are forked before any compilation thread is started, as a process forked while
+        # other threads are running can deadlock on locks held by them.
+        cpu_layout = self.get_cpu_layout()
+        pool = self.create_pool(cpu_layout)
+        # Solutions are compiled while others are measured, so compilers run on the housekeeping cpus.
+        # Threads of the pool are pinned before they start compiling and compilers inherit their affinity.
+        if cpu_layout is not None:
+            compile_pool_args = dict(initializer=affinity.pin_current_thread,
+                                     initargs=(cpu_layout.housekeeping_cpus,))
+        else:
+            compile_pool_args = {}
+        try:
+            with ThreadPoolExecutor(self.get_compilation_threads(cpu_layout), **compile_pool_args) as compile_pool:
+                additional_compilations = self.start_additional_compilations(compile_pool)
+                print("Compiling %d solutions..." % len(solutions))
+                compilations = [compile_pool.submit(self.compile, solution, None, True, print_result=False)
+                                for solution in solutions]
+                try:
+                    self.wait_for_additional_compilations(additional_compilations)
+                except SystemExit:
+                    compile_pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+                if self.task_type.online_check and not self.task_type.uses_online_check():
+                    print(util.warning("Online check works only for normal tasks without a checker, "
+                                       "outputs will be checked after executions."))
+                executables = [paths.get_executables_path(package_util.get_executable(solution))
+                               for solution in solutions]
+                compiled_commands = zip(solutions, executables, compilations)
+                names = solutions
+                return self.run_solutions(compiled_commands, names, solutions, paths.get_executables_path(),
+                                          pool, cpu_layout)
+        finally:
+            pool.terminate()
 
     def convert_status_to_string(self, dictionary):
         """
@@ -512,15 +918,15 @@ class Command(BaseCommand):
         Returns a list of groups for which all tests were run.
         """
         group_sizes = {}
-        for test in package_util.get_tests(self.ID):
-            group = package_util.get_group(test, self.ID)
+        for test in self.get_index().tests.values():
+            group = test.group
             if group not in group_sizes:
                 group_sizes[group] = 0
             group_sizes[group] += 1
 
         run_group_sizes = {}
         for test in self.tests:
-            group = package_util.get_group(test, self.ID)
+            group = self.get_group(test)
             if group not in run_group_sizes:
                 run_group_sizes[group] = 0
             run_group_sizes[group] += 1
@@ -531,6 +937,31 @@ class Command(BaseCommand):
                 whole_groups.append(group)
         return whole_groups
 
+    def keep_expected_statuses_of_skipped_groups(self, results, all_results):
+        """
+        With `--short-circuit`, status of a group with skipped tests is the status of the first failed test,
+        which may differ from the one in a full run. If points for such a group are the same as the expected ones,
+        the expected status is kept. Groups with all tests skipped weren't run at all, so they are removed
+        from `results` and saved in `self.skipped_groups`, so that they aren't compared with expected scores.
+        """
+        config_expected_scores = self.config.get("sinol_expected_scores", {})
+        for solution, groups in results.items():
+            expected = config_expected_scores.get(solution, {}).get("expected", {})
+            for group in list(groups.keys()):
+                group_result = groups[group]
+                if all(result.Status == Status.SKIPPED for result in all_results[solution][group].values()):
+                    self.skipped_groups.setdefault(solution, set()).add(group)
+                    del groups[group]
+                    continue
+                if not isinstance(expected.get(group, None), dict) or \
+                        not any(result.Status == Status.SKIPPED for result in all_results[solution][group].values()):
+                    continue
+                if group_result["points"] == expected[group]["points"]:
+                    group_result["status"] = Status.from_str(expected[group]["status"])
+        for solution, groups in sorted(self.skipped_groups.items()):
+            print(util.warning(f"Solution {solution} was not run on groups {', '.join(map(str, sorted(groups)))} "
+                               f"(--short-circuit), so they are not compared with expected scores."))
+
     def validate_expected_scores(self, results):
         new_expected_scores = {} # Expected scores based on results
 
@@ -590,7 +1021,8 @@ class Command(BaseCommand):
                 }
 
                 for group in used_groups:
-                    if group in config_expected_scores[solution]["expected"]:
+                    if group in config_expected_scores[solution]["expected"] and \
+                            group not in self.skipped_groups.get(solution, set()):
                         expected_scores[solution]["expected"][group] = config_expected_scores[solution]["expected"][group]
 
                 expected_scores[solution]["points"] = self.contest.get_global_score(expected_scores[solution]["expected"],
@@ -755,6 +1187,7 @@ class Command(BaseCommand):
         self.ID = package_util.get_task_id()
         self.SOURCE_EXTENSIONS = ['.c', '.cpp', '.py', '.java']
         self.SOLUTIONS_RE = package_util.get_solutions_re(self.ID)
+        self.index = None
 
     def validate_arguments(self, args):
         compilers = compiler.verify_compilers(args, package_util.get_solutions(self.ID, None))
@@ -783,6 +1216,16 @@ class Command(BaseCommand):
             if sys.platform == 'win32' or sys.platform == 'cygwin':
                 util.exit_with_error('Measuring with `time` is not supported on Windows.')
             return 'time', 'time'
+        def use_rusage():
+            if not util.is_linux():
+                util.exit_with_error('Measuring with `rusage` is supported only on Linux.')
+            return None, 'rusage'
+        def use_cgroup():
+            if CgroupExecutor.prepare() is None:
+                print(util.warning('Delegated cgroup v2 subtree with the memory controller is not available, '
+                                   'falling back to `rusage`.'))
+                return use_rusage()
+            return None, 'cgroup'
 
         timetool_path, timetool_name = None, None
         preferred_timetool = self.contest.preferred_timetool()
@@ -798,6 +1241,10 @@ class Command(BaseCommand):
                 timetool_path, timetool_name = use_sio2jail()
             elif self.config.get('sinol_undocumented_time_tool', '') == 'time':
                 timetool_path, timetool_name = use_time()
+            elif self.config.get('sinol_undocumented_time_tool', '') == 'rusage':
+                timetool_path, timetool_name = use_rusage()
+            elif self.config.get('sinol_undocumented_time_tool', '') == 'cgroup':
+                timetool_path, timetool_name = use_cgroup()
             else:
                 util.exit_with_error('Invalid time tool specified in config.yml.')
         elif args.time_tool is None:
@@ -806,6 +1253,10 @@ class Command(BaseCommand):
             timetool_path, timetool_name = use_sio2jail()
         elif args.time_tool == 'time':
             timetool_path, timetool_name = use_time()
+        elif args.time_tool == 'rusage':
+            timetool_path, timetool_name = use_rusage()
+        elif args.time_tool == 'cgroup':
+            timetool_path, timetool_name = use_cgroup()
         else:
             util.exit_with_error('Invalid time tool specified.')
         return compilers, timetool_path, timetool_name
@@ -837,11 +1288,10 @@ class Command(BaseCommand):
         """
         Returns list of input files that have corresponding output file.
         """
-        output_tests = glob.glob(os.path.join(os.getcwd(), "out", "*.out"))
-        output_tests_ids = [package_util.extract_test_id(test, self.ID) for test in output_tests]
         valid_input_files = []
         for test in self.tests:
-            if package_util.extract_test_id(test, self.ID) in output_tests_ids:
+            package_test = self.get_index().get_test(test)
+            if package_test is not None and package_test.has_output:
                 valid_input_files.append(test)
         return valid_input_files
 
@@ -923,20 +1373,32 @@ class Command(BaseCommand):
 
     def set_task_type(self, timetool_name, timetool_path):
         self.task_type = package_util.get_task_type(timetool_name, timetool_path)
+        self.task_type.online_check = getattr(self.args, 'online_check', False)
+        self.task_type.keep_outputs = getattr(self.args, 'keep_outputs', False)
 
-    def compile_additional_files(self):
-        additional_files = self.task_type.additional_files_to_compile()
-        for file, dest, name, clear_cache, fail_on_error in additional_files:
+    def start_additional_compilations(self, compile_pool: ThreadPoolExecutor):
+        """
+        Starts compilation of additional files (checker, interactor) in the pool.
+        Returns a list of tuples (future, whether to exit on compilation error).
+        """
+        compilations = []
+        for file, dest, name, clear_cache, fail_on_error in self.task_type.additional_files_to_compile():
             print(f"Compiling {name}...")
-            success = self.compile(file, dest, False, clear_cache, name)
-            if not success and fail_on_error:
+            compilations.append((compile_pool.submit(self.compile, file, dest, False, clear_cache, name),
+                                 fail_on_error))
+        return compilations
+
+    def wait_for_additional_compilations(self, compilations):
+        for compilation, fail_on_error in compilations:
+            if not compilation.result() and fail_on_error:
                 sys.exit(1)
 
     def run(self, args):
         args = util.init_package_command(args)
 
         self.set_constants()
-        package_util.validate_test_names(self.ID)
+        self.index = PackageIndex(self.ID)
+        self.index.validate_test_names()
         self.args = args
         self.config = package_util.get_config()
         try:
@@ -957,27 +1419,26 @@ class Command(BaseCommand):
         cache.remove_results_if_contest_type_changed(self.config.get("sinol_contest_type", "default"))
 
         self.set_task_type(self.timetool_name, self.timetool_path)
-        self.compile_additional_files()
 
-        lib = package_util.get_files_matching_pattern(self.ID, f'{self.ID}lib.*')
-        self.has_lib = len(lib) != 0
+        self.has_lib = len(self.index.get_programs("lib")) != 0
 
-        self.tests = package_util.get_tests(self.ID, self.args.tests)
-        self.test_md5sums = {os.path.basename(test): util.get_file_md5(test) for test in self.tests}
+        self.tests = self.index.get_tests(self.args.tests)
+        self.test_md5sums = {os.path.basename(test): md5sum for test, md5sum in util.get_files_md5(self.tests).items()}
         self.check_are_any_tests_to_run()
         self.set_scores()
         self.failed_compilations = []
+        # Groups not run by solutions because of `--short-circuit`: {"<solution>": {<group>}}
+        self.skipped_groups = {}
         solutions = package_util.get_solutions(self.ID, self.args.solutions)
 
         util.change_stack_size_to_unlimited()
-        for solution in solutions:
-            lang = package_util.get_file_lang(solution)
-            for test in self.tests:
-                # The functions will exit if the limits are not set
-                _ = package_util.get_time_limit(test, self.config, lang, self.ID, self.args)
-                _ = package_util.get_memory_limit(test, self.config, lang, self.ID, self.args)
+        # Exits if any of the limits is not set.
+        self.limits = package_util.get_limit_table(self.tests, map(package_util.get_file_lang, solutions),
+                                                   self.config, self.ID, self.args)
 
         results, all_results = self.compile_and_run(solutions)
+        if self.args.short_circuit:
+            self.keep_expected_statuses_of_skipped_groups(results, all_results)
         self.check_errors(all_results)
         if self.args.comments:
             self.print_checker_comments(all_results)
@@ -6,6 +6,7 @@ import subprocess
 
 from sinol_make import util, contest_types
 from sinol_make.helpers import parsers, package_util, paths, cache
+from sinol_make.helpers.package_index import PackageIndex
 from sinol_make.interfaces.BaseCommand import BaseCommand
 from sinol_make.commands.gen import Command as GenCommand
 from sinol_make.commands.doc import Command as DocCommand
@@ -49,6 +50,8 @@ class Command(BaseCommand):
                                  'the expected scores are not compared with the actual scores. '
                                  'This flag will be passed to the run command.')
         parsers.add_time_tool_argument(parser)
+        parsers.add_short_circuit_argument(parser)
+        parsers.add_resume_argument(parser)
         parsers.add_compilation_arguments(parser)
 
     def correct_contest_type(self):
@@ -60,11 +63,28 @@ class Command(BaseCommand):
     def remove_cache(self):
         """
         Remove whole cache dir, but keep the directories.
+        With `--resume`, the journal of the interrupted run is kept, together with cache files of programs
+        other than solutions (checker, interactor), so that recompiling them doesn't invalidate the journal.
         """
         cache_dir = paths.get_cache_path()
+        kept_files = []
+        if self.args.resume and cache.journal_exists():
+            kept_files.append("run_journal")
+            solutions_re = package_util.get_solutions_re(self.task_id)
+            if os.path.isdir(paths.get_cache_path("md5sums")):
+                for file in os.listdir(paths.get_cache_path("md5sums")):
+                    if not solutions_re.match(file):
+                        kept_files.append(os.path.join("md5sums", file))
+        contents = {}
+        for name in kept_files:
+            with open(paths.get_cache_path(name), "r") as f:
+                contents[name] = f.read()
         if os.path.exists(cache_dir):
             shutil.rmtree(cache_dir)
         cache.create_cache_dirs()
+        for name, content in contents.items():
+            with open(paths.get_cache_path(name), "w") as f:
+                f.write(content)
 
     def check_extra_files(self):
         """
@@ -154,7 +174,7 @@ class Command(BaseCommand):
         print(util.bold(' Generating tests '.center(util.get_terminal_size()[1], '=')))
         gen = GenCommand()
         gen.run(self.prepare_args(gen))
-        self.verify_scores(package_util.get_groups(package_util.get_all_inputs(self.task_id), self.task_id))
+        self.verify_scores(PackageIndex(self.task_id).get_groups())
 
         # Generate problem statements
         print(util.bold(' Generating problem statements '.center(util.get_terminal_size()[1], '=')))
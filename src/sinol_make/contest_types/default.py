@@ -98,6 +98,22 @@ class DefaultContest:
         min_score = min(test_scores)
         return int(ceil(group_max_score * (min_score / 100.0)))
 
+    def is_group_decided(self, test_scores: List[int]) -> bool:
+        """
+        Returns whether the group score can't change, regardless of scores for the remaining tests in the group.
+        Used by `run --short-circuit` to skip the remaining tests.
+        :param test_scores: List of scores for tests which were already run
+        """
+        return any(score <= self.min_score_per_test() for score in test_scores)
+
+    def is_run_decided(self, test_scores: List[int]) -> bool:
+        """
+        Returns whether the global score can't change, regardless of scores for the remaining tests.
+        Used by `run --short-circuit` to skip all remaining tests of a solution.
+        :param test_scores: List of scores for tests which were already run (from all groups)
+        """
+        return False
+
     def get_global_score(self, groups_scores: Dict[int, Dict], global_max_score) -> int:
         """
         Calculates global score based on groups scores.
@@ -30,6 +30,9 @@ class ICPCContest(DefaultContest):
     def get_group_score(self, test_scores, group_max_score):
         return min(test_scores)
 
+    def is_run_decided(self, test_scores: List[int]) -> bool:
+        return any(score == 0 for score in test_scores)
+
     def get_global_score(self, groups_scores: Dict[int, Dict], global_max_score):
         return min(group["points"] for group in groups_scores.values())
 
@@ -40,7 +40,7 @@ class OIContest(DefaultContest):
         """
         Verify if scores sum up to 100.
         """
-        config = package_util.get_config()
+        config = package_util.get_config_snapshot().config
         if 'scores' not in config:
             util.exit_with_error("Scores are not defined in config.yml.")
         total_score = sum(config['scores'].values())
@@ -1,10 +1,45 @@
+import os
+import shlex
+import signal
+import threading
 import subprocess
-from typing import List, Tuple, Union
+from typing import Callable, List, Tuple, Union
+
+import psutil
 
 from sinol_make import util
 from sinol_make.structs.status_structs import ExecutionResult, Status
 
 
+class Cancellation:
+    """
+    Allows stopping a running solution from another thread, for example when its output was found wrong.
+    Executors register a function killing the solution (but not tools measuring it, so that they still
+    report its result) while it runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._kill = None
+        self.cancelled = False
+
+    def register(self, kill: Callable[[], None]):
+        with self._lock:
+            self._kill = kill
+            if self.cancelled:
+                kill()
+
+    def unregister(self):
+        with self._lock:
+            self._kill = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._kill is not None:
+                self._kill()
+
+
 class BaseExecutor:
     """
     Base class for executors. Executors are used to run commands and measure their time and memory usage.
@@ -19,12 +54,36 @@ class BaseExecutor:
         """
         raise NotImplementedError()
 
+    @staticmethod
+    def _kill_group(pgid: int):
+        try:
+            os.killpg(pgid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    def _kill_children(pid: int):
+        """
+        Kills all descendants of a process, for example of a tool measuring the solution.
+        """
+        try:
+            children = psutil.Process(pid).children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+        for child in children:
+            try:
+                child.kill()
+            except psutil.NoSuchProcess:
+                pass
+
     def _execute(self, command: List[str], time_limit: int, hard_time_limit: int, memory_limit: int,
                  result_file_path: str, executable: str, execution_dir: str, stdin: int, stdout: int,
                  stderr: Union[None, int], fds_to_close: Union[None, List[int]],
-                 *args, **kwargs) -> Tuple[bool, bool, int, List[str]]:
+                 cancellation: Union[None, Cancellation], *args, **kwargs) -> Tuple[bool, bool, int, List[str]]:
         """
-        This function should run subprocess.Popen with the given command and return a tuple of three values:
+        This function should run subprocess.Popen with the given command (list of arguments, without a shell)
+        and return a tuple of four values. While the solution runs, a function killing it should be registered
+        in `cancellation` (if it isn't None). Returned values:
         - bool: whether the process was terminated due to time limit
         - bool: whether the process was terminated due to memory limit
         - int: return code of the process
@@ -40,17 +99,19 @@ class BaseExecutor:
 
     def execute(self, command: List[str], time_limit, hard_time_limit, memory_limit, result_file_path, executable,
                 execution_dir, stdin=None, stdout=subprocess.DEVNULL, stderr=None,
-                fds_to_close: Union[None, List[int]] = None, *args, **kwargs) -> ExecutionResult:
+                fds_to_close: Union[None, List[int]] = None, cancellation: Union[None, Cancellation] = None,
+                *args, **kwargs) -> ExecutionResult:
         """
         Executes the command and returns the result, stdout and stderr.
+        The solution can be killed from another thread with `cancellation`.
         """
 
         command = self._wrap_command(command, result_file_path, time_limit, memory_limit)
-        cmdline = " ".join(command)
+        cmdline = shlex.join(command)
         try:
-            tle, mle, return_code, proc_stderr = self._execute(cmdline, time_limit, hard_time_limit, memory_limit,
+            tle, mle, return_code, proc_stderr = self._execute(command, time_limit, hard_time_limit, memory_limit,
                                                                result_file_path, executable, execution_dir, stdin, stdout,
-                                                               stderr, fds_to_close, *args, **kwargs)
+                                                               stderr, fds_to_close, cancellation, *args, **kwargs)
             result = self._parse_result(tle, mle, return_code, result_file_path)
         except Exception as e:
             print(util.error(f"Failed to run executor command:\n\t{cmdline}\n"))
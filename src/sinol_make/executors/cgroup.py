@@ -0,0 +1,272 @@
+import os
+import math
+import atexit
+import select
+import signal
+import resource
+import itertools
+import subprocess
+import threading
+import time
+from typing import List, Tuple, Union
+
+from sinol_make import util
+from sinol_make.executors import BaseExecutor, Cancellation
+from sinol_make.structs.status_structs import ExecutionResult, Status
+
+
+class CgroupExecutor(BaseExecutor):
+    """
+    Executor which runs every command in its own transient cgroup v2. CPU time is read from `cpu.stat`
+    and memory usage from `memory.peak`, so short allocation spikes and child processes are accounted for.
+    Memory limit is enforced by `memory.max` and CPU time limit by the kernel with `setrlimit` (RLIMIT_CPU),
+    so the command isn't polled while it runs.
+    Requires a delegated cgroup v2 subtree with the memory controller (Linux 5.19 or newer), for example
+    `systemd-run --user --scope -p Delegate=yes sinol-make run`.
+    If the memory controller isn't enabled for children of the cgroup of sinol-make, sinol-make moves itself
+    to a child cgroup `sinol-make` (processes can't be in a cgroup which distributes controllers to its children).
+    It's moved back and the child cgroup is removed when sinol-make exits.
+    """
+
+    # Name of the cgroup to which sinol-make moves itself, as processes can't be in a cgroup
+    # which distributes controllers to its children.
+    SUPERVISOR_CGROUP = "sinol-make"
+
+    # Path to the cgroup in which run cgroups are created. None if cgroups are not available,
+    # False if it wasn't checked yet.
+    _cgroup_root = False
+    # Path to the cgroup to which sinol-make moved itself, None if it wasn't moved.
+    _supervisor = None
+    _run_counter = itertools.count()
+
+    def __init__(self):
+        super().__init__()
+        self.cgroup_root = self.prepare()
+        if self.cgroup_root is None:
+            util.exit_with_error("Delegated cgroup v2 subtree with the memory controller is not available.")
+
+    @staticmethod
+    def _read(path: str) -> str:
+        with open(path, "r") as f:
+            return f.read()
+
+    @staticmethod
+    def _write(path: str, value: str):
+        with open(path, "w") as f:
+            f.write(value)
+
+    @staticmethod
+    def _get_own_cgroup() -> Union[str, None]:
+        """
+        Returns path to the cgroup v2 of the current process or None if cgroup v2 is not mounted.
+        """
+        mount_point = None
+        with open("/proc/self/mountinfo", "r") as f:
+            for line in f:
+                fields = line.split(" - ")
+                if len(fields) == 2 and fields[1].split()[0] == "cgroup2":
+                    mount_point = fields[0].split()[4]
+                    break
+        if mount_point is None:
+            return None
+        with open("/proc/self/cgroup", "r") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    return os.path.join(mount_point, line[3:].strip().lstrip("/"))
+        return None
+
+    @classmethod
+    def prepare(cls) -> Union[str, None]:
+        """
+        Checks if cgroups can be used and prepares the cgroup in which run cgroups are created.
+        If needed, current process is moved to a child cgroup, so that the memory controller can be enabled.
+        This is undone by `restore` when the process exits.
+        Returns path to the prepared cgroup or None if cgroups can't be used.
+        Has to be called before any worker processes are created.
+        """
+        if cls._cgroup_root is not False:
+            return cls._cgroup_root
+        cls._cgroup_root = None
+        if not util.is_linux():
+            return None
+
+        try:
+            root = cls._get_own_cgroup()
+            if root is None or "memory" not in cls._read(os.path.join(root, "cgroup.controllers")).split():
+                return None
+            if "memory" not in cls._read(os.path.join(root, "cgroup.subtree_control")).split():
+                supervisor = os.path.join(root, cls.SUPERVISOR_CGROUP)
+                os.makedirs(supervisor, exist_ok=True)
+                cls._write(os.path.join(supervisor, "cgroup.procs"), str(os.getpid()))
+                try:
+                    cls._write(os.path.join(root, "cgroup.subtree_control"), "+memory")
+                except OSError:
+                    # Other processes are in this cgroup, so it isn't delegated to us.
+                    cls._write(os.path.join(root, "cgroup.procs"), str(os.getpid()))
+                    os.rmdir(supervisor)
+                    return None
+                cls._supervisor = supervisor
+                atexit.register(cls.restore)
+
+            # `memory.peak` is available since Linux 5.19.
+            probe = os.path.join(root, f"probe-{os.getpid()}")
+            os.makedirs(probe, exist_ok=True)
+            has_peak = os.path.exists(os.path.join(probe, "memory.peak"))
+            os.rmdir(probe)
+            if not has_peak:
+                return None
+        except OSError:
+            return None
+        cls._cgroup_root = root
+        return root
+
+    @classmethod
+    def restore(cls):
+        """
+        Disables the memory controller enabled by `prepare`, moves current process back to its original cgroup
+        and removes the cgroup to which it was moved.
+        """
+        if cls._supervisor is None:
+            return
+        supervisor, cls._supervisor = cls._supervisor, None
+        root = os.path.dirname(supervisor)
+        try:
+            cls._write(os.path.join(root, "cgroup.subtree_control"), "-memory")
+            cls._write(os.path.join(root, "cgroup.procs"), str(os.getpid()))
+            os.rmdir(supervisor)
+        except OSError:
+            # Processes started by sinol-make (for example pool workers) can still be in the cgroup.
+            pass
+
+    def _wrap_command(self, command: List[str], result_file_path: str, time_limit: int, memory_limit: int) -> List[str]:
+        return command
+
+    def _create_cgroup(self, memory_limit: int) -> str:
+        cgroup = os.path.join(self.cgroup_root, f"run-{os.getpid()}-{next(self._run_counter)}")
+        os.mkdir(cgroup)
+        self._write(os.path.join(cgroup, "memory.max"), str(memory_limit * 1024))
+        if os.path.exists(os.path.join(cgroup, "memory.swap.max")):
+            self._write(os.path.join(cgroup, "memory.swap.max"), "0")
+        self._write(os.path.join(cgroup, "memory.oom.group"), "1")
+        return cgroup
+
+    def _kill(self, cgroup: str, pgid: int):
+        if os.path.exists(os.path.join(cgroup, "cgroup.kill")):
+            self._write(os.path.join(cgroup, "cgroup.kill"), "1")
+        else:
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def _empty_cgroup(self, cgroup: str, pgid: int):
+        """
+        Kills all processes left in the cgroup (for example, ones started in background).
+        """
+        while "populated 1" in self._read(os.path.join(cgroup, "cgroup.events")):
+            self._kill(cgroup, pgid)
+            time.sleep(0.001)
+
+    def _cpu_usage(self, cgroup: str) -> Tuple[int, int]:
+        """
+        Returns a tuple of user CPU time and total CPU time used in the cgroup (in microseconds).
+        """
+        stats = dict(line.split() for line in self._read(os.path.join(cgroup, "cpu.stat")).splitlines())
+        return int(stats["user_usec"]), int(stats["usage_usec"])
+
+    def _execute(self, command: List[str], time_limit: int, hard_time_limit: int, memory_limit: int,
+                 result_file_path: str, executable: str, execution_dir: str, stdin: int, stdout: int,
+                 stderr: Union[None, int], fds_to_close: Union[None, List[int]],
+                 cancellation: Union[None, Cancellation], *args, **kwargs) -> Tuple[bool, bool, int, List[str]]:
+        if stderr is None:
+            stderr = subprocess.PIPE
+        cgroup = self._create_cgroup(memory_limit)
+        procs_path = os.path.join(cgroup, "cgroup.procs")
+
+        def preexec():
+            os.setpgrp()
+            cpu_limit = max(1, int(math.ceil(hard_time_limit)))
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+            with open(procs_path, "w") as f:
+                f.write("0")
+
+        process = subprocess.Popen(command, *args, stdin=stdin, stdout=stdout, stderr=stderr,
+                                   preexec_fn=preexec, cwd=execution_dir, **kwargs)
+        if fds_to_close is not None:
+            for fd in fds_to_close:
+                os.close(fd)
+        if cancellation is not None:
+            cancellation.register(lambda: self._kill(cgroup, process.pid))
+
+        # Stderr has to be read while waiting, otherwise the process could block on a full pipe.
+        proc_stderr = []
+        reader = None
+        if stderr == subprocess.PIPE:
+            def read_stderr():
+                proc_stderr.extend(process.stderr.read().decode('utf-8').split('\n'))
+            reader = threading.Thread(target=read_stderr)
+            reader.start()
+
+        # Solutions that sleep or wait for input don't use CPU time, so a wall time limit is also needed.
+        # The process is waited for with a pidfd, so it isn't polled.
+        tle = False
+        pidfd = os.pidfd_open(process.pid)
+        try:
+            poller = select.poll()
+            poller.register(pidfd, select.POLLIN)
+            if not poller.poll(hard_time_limit * 2 * 1000):
+                tle = True
+                self._kill(cgroup, process.pid)
+        finally:
+            os.close(pidfd)
+        process.wait()
+        if cancellation is not None:
+            cancellation.unregister()
+
+        self._empty_cgroup(cgroup, process.pid)
+        if reader is not None:
+            reader.join()
+            process.stderr.close()
+
+        user_usec, usage_usec = self._cpu_usage(cgroup)
+        time_used = round(user_usec / 1000)
+        mem_used = int(self._read(os.path.join(cgroup, "memory.peak")).strip()) // 1024
+        events = dict(line.split() for line in self._read(os.path.join(cgroup, "memory.events")).splitlines())
+        oom_killed = int(events.get("oom_kill", 0)) > 0
+        os.rmdir(cgroup)
+        return_code = process.returncode
+        # Kernel sends SIGXCPU after the soft CPU limit and SIGKILL after the hard one.
+        # CPU limits count both user and system time, while only user time is reported.
+        tle = tle or time_used > hard_time_limit * 1000 or return_code == -signal.SIGXCPU or \
+            (return_code == -signal.SIGKILL and not oom_killed and usage_usec >= hard_time_limit * 1_000_000)
+        mle = not tle and (oom_killed or mem_used > memory_limit)
+
+        with open(result_file_path, "w") as result_file:
+            result_file.write(f"{time_used}\n{mem_used}\n{return_code}\n")
+        # Return code of the solution is parsed from the result file, so that the status isn't overwritten
+        # by `execute` (it's negative if the solution was terminated by a signal).
+        return tle, mle, 0, proc_stderr
+
+    def _parse_result(self, tle, mle, return_code, result_file_path) -> ExecutionResult:
+        result = ExecutionResult()
+        with open(result_file_path, "r") as result_file:
+            lines = result_file.readlines()
+        if len(lines) != 3:
+            result.Status = Status.RE
+            result.Error = "Unexpected output from execution:\n" + "".join(lines)
+            result.Fail = True
+            return result
+
+        result.Time = int(lines[0].strip())
+        result.Memory = int(lines[1].strip())
+        return_code = int(lines[2].strip())
+        if tle or mle:
+            return result
+        if return_code < 0:
+            result.Status = Status.RE
+            result.Error = f"Solution was terminated by signal {-return_code}"
+            result.ExitSignal = -return_code
+        elif return_code != 0:
+            result.Status = Status.RE
+            result.Error = f"Solution exited with code {return_code}"
+        return result
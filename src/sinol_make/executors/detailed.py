@@ -5,7 +5,7 @@ import time
 import psutil
 from typing import List, Tuple, Union
 
-from sinol_make.executors import BaseExecutor
+from sinol_make.executors import BaseExecutor, Cancellation
 from sinol_make.structs.status_structs import ExecutionResult, Status
 
 
@@ -17,32 +17,28 @@ class DetailedExecutor(BaseExecutor):
     def _wrap_command(self, command: List[str], result_file_path: str, time_limit: int, memory_limit: int) -> List[str]:
         return command
 
-    def _execute(self, cmdline: str, time_limit: int, hard_time_limit: int, memory_limit: int,
+    def _execute(self, command: List[str], time_limit: int, hard_time_limit: int, memory_limit: int,
                  result_file_path: str, executable: str, execution_dir: str, stdin: int, stdout: int,
                  stderr: Union[None, int], fds_to_close: Union[None, List[int]],
-                 *args, **kwargs) -> Tuple[bool, bool, int, List[str]]:
+                 cancellation: Union[None, Cancellation], *args, **kwargs) -> Tuple[bool, bool, int, List[str]]:
         timeout = False
         mem_used = 0
         if stderr is None:
             stderr = subprocess.PIPE
-        process = subprocess.Popen(cmdline, shell=True, *args, stdin=stdin, stdout=stdout, stderr=stderr,
-                                   preexec_fn=os.setpgrp, cwd=execution_dir, **kwargs)
+        process = subprocess.Popen(command, *args, stdin=stdin, stdout=stdout, stderr=stderr,
+                                   start_new_session=True, cwd=execution_dir, **kwargs)
         if fds_to_close is not None:
             for fd in fds_to_close:
                 os.close(fd)
+        if cancellation is not None:
+            cancellation.register(lambda: self._kill_group(process.pid))
 
         start_time = time.time()
         while process.poll() is None:
             try:
-                time_process = psutil.Process(process.pid)
-                executable_process = None
-                for child in time_process.children():
-                    if child.name() == executable:
-                        executable_process = child
-                        break
-                if executable_process is not None:
-                    mem_used = max(mem_used, executable_process.memory_info().rss)
-                if executable_process is not None and mem_used > memory_limit * 1024:
+                executable_process = psutil.Process(process.pid)
+                mem_used = max(mem_used, executable_process.memory_info().rss)
+                if mem_used > memory_limit * 1024:
                     try:
                         os.killpg(process.pid, signal.SIGKILL)
                     except ProcessLookupError:
@@ -66,6 +62,8 @@ class DetailedExecutor(BaseExecutor):
         else:
             proc_stderr = []
             process.communicate()
+        if cancellation is not None:
+            cancellation.unregister()
 
         with open(result_file_path, "w") as result_file:
             result_file.write(f"{time_used}\n{mem_used}\n{process.returncode}\n")
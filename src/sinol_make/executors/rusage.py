@@ -0,0 +1,167 @@
+import os
+import math
+import ctypes
+import select
+import signal
+import subprocess
+import threading
+import resource
+from typing import List, Tuple, Union
+
+from sinol_make.executors import BaseExecutor, Cancellation
+from sinol_make.structs.status_structs import ExecutionResult, Status
+
+
+PR_SET_CHILD_SUBREAPER = 36
+
+
+class RusageExecutor(BaseExecutor):
+    """
+    Executor which doesn't poll the running process. Hard limits are enforced by the kernel with `setrlimit`
+    (RLIMIT_CPU for time, RLIMIT_AS for memory) and CPU time (user and system) and max RSS are read
+    with `os.wait4` once the process exits. Memory limit is checked against max RSS, the address space limit
+    is only a safety net against runaway solutions. Works only on Linux.
+    """
+
+    # Address space used by shared libraries and interpreters (in KB), added to the hard memory limit.
+    ADDRESS_SPACE_OVERHEAD = 64 * 2 ** 10
+
+    # Whether current process was made a child subreaper. It's not inherited by forked processes,
+    # so every pool worker sets it on its first execution.
+    _subreaper_pid = None
+
+    def _wrap_command(self, command: List[str], result_file_path: str, time_limit: int, memory_limit: int) -> List[str]:
+        return command
+
+    @classmethod
+    def _become_subreaper(cls):
+        if cls._subreaper_pid == os.getpid():
+            return
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) != 0:
+            raise OSError(ctypes.get_errno(), "Failed to set child subreaper")
+        cls._subreaper_pid = os.getpid()
+
+    @classmethod
+    def _set_limits(cls, hard_time_limit: int, memory_limit: int):
+        """
+        Returns a function which is run in the child process before exec.
+        Hard memory limit is twice the memory limit, the same as hard time limit is twice the time limit.
+        """
+        def preexec():
+            os.setpgrp()
+            cpu_limit = max(1, int(math.ceil(hard_time_limit)))
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+            as_limit = (2 * memory_limit + cls.ADDRESS_SPACE_OVERHEAD) * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (as_limit, as_limit))
+        return preexec
+
+    def _wait(self, pid: int, pgid: int, wall_time_limit: int) -> Tuple[bool, int, resource.struct_rusage]:
+        """
+        Blocks until the process exits or the wall time limit passes.
+        Returns a tuple: whether the process was killed due to wall time, its wait status and its resource usage.
+        """
+        killed = False
+        _, status, rusage = os.wait4(pid, os.WUNTRACED)
+        if not os.WIFSTOPPED(status):
+            return killed, status, rusage
+        pidfd = os.pidfd_open(pid)
+        os.kill(pid, signal.SIGCONT)
+        try:
+            poller = select.poll()
+            poller.register(pidfd, select.POLLIN)
+            if not poller.poll(wall_time_limit * 1000):
+                self._kill_group(pgid)
+                killed = True
+        finally:
+            os.close(pidfd)
+        _, status, rusage = os.wait4(pid, 0)
+        return killed, status, rusage
+
+    def _execute(self, command: List[str], time_limit: int, hard_time_limit: int, memory_limit: int,
+                 result_file_path: str, executable: str, execution_dir: str, stdin: int, stdout: int,
+                 stderr: Union[None, int], fds_to_close: Union[None, List[int]],
+                 cancellation: Union[None, Cancellation], *args, **kwargs) -> Tuple[bool, bool, int, List[str]]:
+        self._become_subreaper()
+        if stderr is None:
+            stderr = subprocess.PIPE
+
+        # Max RSS survives exec, so a process forked from this (large) python process would report
+        # at least our memory usage. Because of that the solution is forked by a small shell, which
+        # saves its pid to the result file (it is later overwritten with the result) and exits.
+        # The solution is then reparented to us, as we are a subreaper. The solution stops itself
+        # before exec, so that the shell can't reap it first. The shell redirects stdin of background
+        # commands to /dev/null, so the original one is kept on fd 9. The result file path and the command
+        # are passed to the shell as arguments, so they don't need quoting.
+        shell_cmdline = 'result="$1"; shift; exec 9<&0; ' \
+                        '/bin/sh -c \'kill -STOP $$; exec "$@"\' sh "$@" <&9 9<&- & echo $! > "$result"'
+        shell = subprocess.Popen(['/bin/sh', '-c', shell_cmdline, 'sh', result_file_path] + command, *args,
+                                 stdin=stdin, stdout=stdout, stderr=stderr, preexec_fn=self._set_limits(hard_time_limit, memory_limit),
+                                 cwd=execution_dir, **kwargs)
+        if fds_to_close is not None:
+            for fd in fds_to_close:
+                os.close(fd)
+
+        # Stderr has to be read while waiting, otherwise the process could block on a full pipe.
+        proc_stderr = []
+        reader = None
+        if stderr == subprocess.PIPE:
+            def read_stderr():
+                proc_stderr.extend(shell.stderr.read().decode('utf-8').split('\n'))
+            reader = threading.Thread(target=read_stderr)
+            reader.start()
+
+        shell.wait()
+        with open(result_file_path, "r") as pid_file:
+            pid = int(pid_file.read().strip())
+        if cancellation is not None:
+            # The shell has exited, so the process group contains only the solution.
+            cancellation.register(lambda: self._kill_group(shell.pid))
+        # Solutions that sleep or wait for input don't use CPU time, so a wall time limit is also needed.
+        wall_timeout, status, rusage = self._wait(pid, shell.pid, hard_time_limit * 2)
+        if cancellation is not None:
+            cancellation.unregister()
+        if reader is not None:
+            reader.join()
+            shell.stderr.close()
+
+        # CPU limits count both user and system time, so both are reported. Otherwise a solution could
+        # exceed the hard limit with a reported time below the time limit.
+        time_used = round((rusage.ru_utime + rusage.ru_stime) * 1000)
+        mem_used = rusage.ru_maxrss
+        exit_signal = os.WTERMSIG(status) if os.WIFSIGNALED(status) else 0
+        exit_code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else 0
+        # Kernel sends SIGXCPU after the soft CPU limit and SIGKILL after the hard one.
+        tle = wall_timeout or exit_signal == signal.SIGXCPU or \
+            (exit_signal == signal.SIGKILL and time_used >= hard_time_limit * 1000)
+        mle = not tle and mem_used > memory_limit
+
+        with open(result_file_path, "w") as result_file:
+            result_file.write(f"{time_used}\n{mem_used}\n{exit_code}\n{exit_signal}\n")
+
+        return tle, mle, 0, proc_stderr
+
+    def _parse_result(self, tle, mle, return_code, result_file_path) -> ExecutionResult:
+        result = ExecutionResult()
+        with open(result_file_path, "r") as result_file:
+            lines = result_file.readlines()
+        if len(lines) != 4:
+            result.Status = Status.RE
+            result.Error = "Unexpected output from execution:\n" + "".join(lines)
+            result.Fail = True
+            return result
+
+        result.Time = int(lines[0].strip())
+        result.Memory = int(lines[1].strip())
+        exit_code = int(lines[2].strip())
+        exit_signal = int(lines[3].strip())
+        if tle or mle:
+            return result
+        if exit_signal != 0:
+            result.Status = Status.RE
+            result.Error = f"Solution was terminated by signal {exit_signal}"
+            result.ExitSignal = exit_signal
+        elif exit_code != 0:
+            result.Status = Status.RE
+            result.Error = f"Solution exited with code {exit_code}"
+        return result
@@ -7,7 +7,7 @@ from typing import List, Tuple, Union
 
 import psutil
 from sinol_make import util
-from sinol_make.executors import BaseExecutor
+from sinol_make.executors import BaseExecutor, Cancellation
 from sinol_make.structs.status_structs import ExecutionResult, Status
 
 
@@ -16,25 +16,28 @@ class TimeExecutor(BaseExecutor):
         if sys.platform == 'darwin':
             time_name = 'gtime'
         elif sys.platform == 'linux':
-            time_name = '\\time'
+            time_name = 'time'
         else:
             util.exit_with_error("Measuring time with GNU time on Windows is not supported.")
 
-        return [f'{time_name}', '-f', '"%U\\n%M\\n%x"', '-o', f'"{result_file_path}"'] + command
+        return [time_name, '-f', '%U\\n%M\\n%x', '-o', result_file_path] + command
 
-    def _execute(self, cmdline: str, time_limit: int, hard_time_limit: int, memory_limit: int,
+    def _execute(self, command: List[str], time_limit: int, hard_time_limit: int, memory_limit: int,
                  result_file_path: str, executable: str, execution_dir: str, stdin: int, stdout: int,
                  stderr: Union[None, int], fds_to_close: Union[None, List[int]],
-                 *args, **kwargs) -> Tuple[bool, bool, int, List[str]]:
+                 cancellation: Union[None, Cancellation], *args, **kwargs) -> Tuple[bool, bool, int, List[str]]:
         timeout = False
         mem_limit_exceeded = False
         if stderr is None:
             stderr = subprocess.PIPE
-        process = subprocess.Popen(cmdline, shell=True, *args, stdin=stdin, stdout=stdout, stderr=stderr,
-                                   preexec_fn=os.setpgrp, cwd=execution_dir, **kwargs)
+        process = subprocess.Popen(command, *args, stdin=stdin, stdout=stdout, stderr=stderr,
+                                   start_new_session=True, cwd=execution_dir, **kwargs)
         if fds_to_close is not None:
             for fd in fds_to_close:
                 os.close(fd)
+        if cancellation is not None:
+            # Only the solution is killed, so that `time` still writes its result.
+            cancellation.register(lambda: self._kill_children(process.pid))
 
         start_time = time.time()
         while process.poll() is None:
@@ -68,6 +71,9 @@ class TimeExecutor(BaseExecutor):
             proc_stderr = proc_stderr.decode('utf-8').split('\n')
         else:
             proc_stderr = []
+            process.wait()
+        if cancellation is not None:
+            cancellation.unregister()
         return timeout, mem_limit_exceeded, 0, proc_stderr
 
     def _parse_result(self, tle, mle, return_code, result_file_path) -> ExecutionResult:
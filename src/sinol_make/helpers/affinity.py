@@ -0,0 +1,118 @@
+import os
+from typing import List, Union
+
+from sinol_make.structs.run_structs import CpuLayout
+
+
+SYSFS_CPU_PATH = "/sys/devices/system/cpu"
+
+# Cpus on which checkers are run. None if cpus are not pinned.
+_housekeeping_cpus = None
+
+# Niceness added to checkers, so that they don't slow down measured solutions when they share cpus with them.
+HOUSEKEEPING_NICENESS = 5
+
+
+def affinity_supported() -> bool:
+    return hasattr(os, "sched_setaffinity") and hasattr(os, "sched_getaffinity")
+
+
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """
+    Parses cpu list in the kernel format (for example `0-3,8,10-11`).
+    """
+    cpus = []
+    for part in cpu_list.strip().split(","):
+        if part == "":
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def get_physical_cores(sysfs_path: str = SYSFS_CPU_PATH) -> List[List[int]]:
+    """
+    Returns a list of physical cores available to this process. Every core is a list of its logical cpus
+    (SMT siblings), which are read from `topology/thread_siblings_list` in sysfs.
+    """
+    available = os.sched_getaffinity(0)
+    cores = set()
+    for cpu in available:
+        try:
+            with open(os.path.join(sysfs_path, f"cpu{cpu}", "topology", "thread_siblings_list")) as f:
+                siblings = parse_cpu_list(f.read())
+        except (OSError, ValueError):
+            siblings = [cpu]
+        cores.add(tuple(sorted(sibling for sibling in siblings if sibling in available or sibling == cpu)))
+    return sorted(list(core) for core in cores)
+
+
+def get_layout(workers: int, sysfs_path: str = SYSFS_CPU_PATH) -> Union[CpuLayout, None]:
+    """
+    Assigns a separate physical core to every worker and the remaining cores to housekeeping.
+    At least one physical core is left for housekeeping, so if there are not enough cores, the layout
+    has fewer workers than requested. Returns None if there is only one physical core.
+    """
+    if not affinity_supported():
+        return None
+    cores = get_physical_cores(sysfs_path)
+    workers = min(workers, len(cores) - 1)
+    if workers < 1:
+        return None
+    return CpuLayout(
+        worker_cpus=[core[0] for core in cores[:workers]],
+        housekeeping_cpus=[cpu for core in cores[workers:] for cpu in core]
+    )
+
+
+def describe_layout(layout: Union[CpuLayout, None], workers: int) -> str:
+    if not affinity_supported():
+        return "CPU pinning is not supported on this system."
+    if layout is None:
+        return f"CPU pinning disabled ({workers} workers need at least {workers + 1} physical cores)."
+    return (f"Workers pinned to cpus {', '.join(map(str, layout.worker_cpus))}, "
+            f"housekeeping on cpus {', '.join(map(str, layout.housekeeping_cpus))}.")
+
+
+def set_housekeeping_cpus(cpus: Union[List[int], None]):
+    """
+    Sets cpus on which checkers are run. If `cpus` is None, checkers are not pinned.
+    """
+    global _housekeeping_cpus
+    _housekeeping_cpus = cpus
+
+
+def pin_current_thread(cpus: List[int]):
+    """
+    Pins the calling thread to given cpus. Threads and processes it creates afterwards inherit the affinity,
+    other threads of this process keep theirs.
+    """
+    os.sched_setaffinity(0, cpus)
+
+
+def pin_worker(cpu_queue, housekeeping_cpus: List[int]):
+    """
+    Initializer for pool workers. Takes a cpu from the queue and pins the worker to it.
+    """
+    pin_current_thread([cpu_queue.get()])
+    set_housekeeping_cpus(housekeeping_cpus)
+
+
+def move_to_housekeeping(pid: int):
+    """
+    Moves a process started by this process (for example a checker) to the housekeeping cpus and lowers
+    its priority. It's done after the process is started, as `preexec_fn` of `subprocess.Popen` isn't safe
+    in processes with many threads and prevents faster ways of starting processes.
+    """
+    cpus = _housekeeping_cpus
+    try:
+        if cpus is not None:
+            os.sched_setaffinity(pid, cpus)
+        if hasattr(os, "setpriority"):
+            os.setpriority(os.PRIO_PROCESS, pid, os.getpriority(os.PRIO_PROCESS, 0) + HOUSEKEEPING_NICENESS)
+    except OSError:
+        # The process may have already exited.
+        pass
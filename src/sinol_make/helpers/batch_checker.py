@@ -0,0 +1,185 @@
+import atexit
+import os
+import time
+import selectors
+import subprocess
+import threading
+from typing import Dict, List, Tuple, Union
+
+from sinol_make.helpers import affinity
+
+
+class LineReader:
+    """
+    Reads lines from stdout of a long-lived process with a deadline, so that a process which hanged
+    or stopped replying doesn't block the reader forever.
+    """
+
+    def __init__(self, stdout):
+        self.fd = stdout.fileno()
+        # Bytes read from the pipe, which weren't returned yet.
+        self.buffer = b""
+
+    def read_lines(self, count: int, deadline: float) -> Union[List[str], None]:
+        """
+        Reads `count` lines. Returns None if the process exited or didn't write them before `deadline`
+        (in terms of `time.monotonic`). Bytes written after these lines are kept in `buffer`.
+        """
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.fd, selectors.EVENT_READ)
+            while self.buffer.count(b"\n") < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    return None
+                chunk = os.read(self.fd, 65536)
+                if not chunk:
+                    return None
+                self.buffer += chunk
+        lines = self.buffer.split(b"\n", count)
+        self.buffer = lines.pop() if len(lines) > count else b""
+        return [line.decode("utf-8", errors="replace") for line in lines]
+
+    def has_pending_output(self) -> bool:
+        """
+        Returns True if the process wrote something which wasn't read yet.
+        """
+        if self.buffer:
+            return True
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.fd, selectors.EVENT_READ)
+            return len(selector.select(0)) > 0
+
+
+class BatchChecker:
+    """
+    Long-lived checker process using the batch protocol. The checker is started with `--batch` argument
+    and reads requests from stdin, each being three lines with paths to the input, output and answer files.
+    For each request it writes the usual verdict of exactly three lines (OK or WRONG, comment and points)
+    to stdout and flushes it. The checker exits when stdin is closed.
+    """
+
+    # Maximum time (in seconds) the checker can take to reply to a request.
+    TIMEOUT = 60
+
+    def __init__(self, checker_path: str):
+        self.process = subprocess.Popen([checker_path, "--batch"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+        affinity.move_to_housekeeping(self.process.pid)
+        self.reader = LineReader(self.process.stdout)
+
+    def check(self, input_file_path, output_file_path, answer_file_path) -> Union[List[str], None]:
+        """
+        Returns three lines of the verdict or None if the checker exited, didn't reply in `TIMEOUT` seconds
+        or its reply isn't a valid verdict. The checker shouldn't be used after None is returned.
+        """
+        # Output written before a request or after the last reply means that replies can't be matched to requests.
+        if self.reader.has_pending_output():
+            return None
+        request = "".join(os.path.abspath(path) + "\n"
+                          for path in (input_file_path, output_file_path, answer_file_path))
+        try:
+            self.process.stdin.write(request.encode("utf-8"))
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            return None
+        lines = self.reader.read_lines(3, time.monotonic() + self.TIMEOUT)
+        if lines is None or self.reader.buffer or lines[0].strip() not in ("OK", "WRONG"):
+            return None
+        return lines
+
+    def close(self, kill=False) -> int:
+        """
+        Closes stdin of the checker and returns its exit code. If `kill` is True, the checker is killed first.
+        """
+        if kill:
+            self.process.kill()
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.process.stdout.close()
+        return self.process.wait()
+
+
+class BatchCheckerPool:
+    """
+    Pool of batch checker processes of a single checker executable. A new process is started
+    when all others are busy, so there are at most as many processes as threads checking outputs at once.
+    """
+
+    def __init__(self, checker_path: str):
+        self.checker_path = checker_path
+        self._lock = threading.Lock()
+        self._idle: List[BatchChecker] = []
+        self._all: List[BatchChecker] = []
+
+    def check(self, input_file_path, output_file_path, answer_file_path) -> Union[List[str], None]:
+        """
+        Returns three lines of the verdict or None if the checker failed (see `BatchChecker.check`).
+        """
+        with self._lock:
+            checker = self._idle.pop() if self._idle else None
+        if checker is None:
+            checker = BatchChecker(self.checker_path)
+            with self._lock:
+                self._all.append(checker)
+        lines = checker.check(input_file_path, output_file_path, answer_file_path)
+        if lines is None:
+            # Failed checkers are replaced by new ones when needed.
+            with self._lock:
+                self._all.remove(checker)
+            checker.close(kill=True)
+            return None
+        with self._lock:
+            self._idle.append(checker)
+        return lines
+
+    def close(self):
+        with self._lock:
+            checkers, self._all, self._idle = self._all, [], []
+        for checker in checkers:
+            checker.close()
+
+
+# Pools of checkers of this process by path to the checker and its inode and modification time,
+# so that a recompiled checker gets new processes. They are kept between tasks of multiprocessing pools.
+_pools: Dict[Tuple[str, int, int], BatchCheckerPool] = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+# Pools inherited by a forked process. Their pipes are shared with the parent, so they are neither used
+# nor closed (not even by the garbage collector).
+_inherited_pools: List[BatchCheckerPool] = []
+
+
+def _check_forked():
+    global _pools, _pools_lock, _pools_pid
+    if _pools_pid != os.getpid():
+        _inherited_pools.extend(_pools.values())
+        _pools = {}
+        _pools_lock = threading.Lock()
+        _pools_pid = os.getpid()
+
+
+def get_pool(checker_path: str) -> BatchCheckerPool:
+    _check_forked()
+    stat = os.stat(checker_path)
+    key = (checker_path, stat.st_ino, stat.st_mtime_ns)
+    with _pools_lock:
+        if key not in _pools:
+            for old_key in [old_key for old_key in _pools if old_key[0] == checker_path]:
+                _pools.pop(old_key).close()
+            _pools[key] = BatchCheckerPool(checker_path)
+        return _pools[key]
+
+
+@atexit.register
+def close_all():
+    """
+    Stops all batch checker processes started by this process.
+    """
+    _check_forked()
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -1,49 +1,77 @@
 import os
+import json
+import collections
 import yaml
-from typing import Union
+from typing import Dict, Iterable, Iterator, List, TextIO, Tuple, Union
 
 from sinol_make import util
-from sinol_make.structs.cache_structs import CacheFile
-from sinol_make.helpers import paths, package_util
+from sinol_make.structs.cache_structs import CacheFile, CacheTest
+from sinol_make.helpers import paths, package_util, results_db, elf
 
 
-def get_cache_file(solution_path: str) -> CacheFile:
+def get_cache_file(solution_path: str, tests: Union[Iterable[str], None] = None) -> CacheFile:
     """
-    Returns content of cache file for given solution
+    Returns content of cache file for given solution, with test results read from the results database
     :param solution_path: Path to solution
+    :param tests: md5sums of tests for which results are loaded. If None, all results are loaded.
     :return: Content of cache file
     """
-    cache_file_path = paths.get_cache_path("md5sums", os.path.basename(solution_path))
+    solution = os.path.basename(solution_path)
+    cache_file_path = paths.get_cache_path("md5sums", solution)
     try:
         with open(cache_file_path, 'r') as cache_file:
             data = yaml.load(cache_file, Loader=yaml.FullLoader)
             if not isinstance(data, dict):
-                print(util.warning(f"Cache file for program {os.path.basename(solution_path)} is corrupted."))
-                os.unlink(cache_file_path)
+                print(util.warning(f"Cache file for program {solution} is corrupted."))
+                _remove_cache_file(solution)
                 return CacheFile()
             try:
-                return CacheFile.from_dict(data)
+                info = CacheFile.from_dict(data)
             except ValueError as exc:
-                print(util.error(f"An error occured while parsing cache file for solution {os.path.basename(solution_path)}."))
+                print(util.error(f"An error occured while parsing cache file for solution {solution}."))
                 util.exit_with_error(str(exc))
     except FileNotFoundError:
-        return CacheFile()
+        # Results can be saved without compilation info, for example by `merge_journal`.
+        data = {}
+        info = CacheFile()
     except (yaml.YAMLError, TypeError):
-        print(util.warning(f"Cache file for program {os.path.basename(solution_path)} is corrupted."))
-        os.unlink(cache_file_path)
+        print(util.warning(f"Cache file for program {solution} is corrupted."))
+        _remove_cache_file(solution)
         return CacheFile()
 
+    if "tests" in data:
+        # Cache file from an older version, which kept test results. They are moved to the results database.
+        info.save(solution)
+    if info.results_key != "":
+        info.tests = {test: CacheTest.from_dict(result)
+                      for test, result in results_db.load_results(info.results_key, tests).items()}
+    return info
+
+
+def _remove_cache_file(solution: str, results_key: str = ""):
+    """
+    Removes cache file of a program and cached test results with its key (see `CacheFile.results_key`).
+    """
+    if os.path.exists(paths.get_cache_path("md5sums", solution)):
+        os.unlink(paths.get_cache_path("md5sums", solution))
+    if results_key != "":
+        results_db.remove_results(solution_md5s=[results_key])
+
 
-def check_compiled(file_path: str, compilation_flags: str, sanitizers: bool) -> Union[str, None]:
+def check_compiled(file_path: str, compilation_flags: str, sanitizers: bool,
+                   object_hash: Union[str, None] = None) -> Union[str, None]:
     """
     Check if a file is compiled
     :param file_path: Path to the file
+    :param object_hash: If not None, the executable also has to have this key in the store of compiled executables.
     :return: executable path if compiled, None otherwise
     """
     md5sum = util.get_file_md5(file_path)
     try:
-        info = get_cache_file(file_path)
-        if info.md5sum == md5sum and info.compilation_flags == compilation_flags and info.sanitizers == sanitizers:
+        info = get_cache_file(file_path, tests=[])
+        # Cache files of older versions don't have md5sum of the executable, so it's compiled again.
+        if info.md5sum == md5sum and info.compilation_flags == compilation_flags and info.sanitizers == sanitizers \
+                and info.executable_md5 != "" and (object_hash is None or info.object_hash == object_hash):
             exe_path = info.executable_path
             if os.path.exists(exe_path):
                 return exe_path
@@ -52,33 +80,39 @@ def check_compiled(file_path: str, compilation_flags: str, sanitizers: bool) ->
         return None
 
 
-def save_compiled(file_path: str, exe_path: str, compilation_flags: str, sanitizers: bool, clear_cache: bool = False):
+def save_compiled(file_path: str, exe_path: str, compilation_flags: str, sanitizers: bool, clear_cache: bool = False,
+                  object_hash: str = ""):
     """
     Save the compiled executable path to cache in `.cache/md5sums/<basename of file_path>`,
-    which contains the md5sum of the file and the path to the executable.
+    which contains the md5sum of the file, the path to the executable and md5sum of its code.
+    Cached test results are kept, as they belong to the executable (see `CacheFile.results_key`).
     :param file_path: Path to the file
     :param exe_path: Path to the compiled executable
     :param compilation_flags: Compilation flags used
     :param sanitizers: Whether -fsanitize=undefined,address was used
-    :param clear_cache: Set to True if you want to delete all cached test results.
+    :param clear_cache: Set to True if you want to delete all cached test results if the file has changed.
+    :param object_hash: Key of the executable in the store of compiled executables
     """
-    info = CacheFile(util.get_file_md5(file_path), exe_path, compilation_flags, sanitizers)
+    previous_md5sum = get_cache_file(file_path, tests=[]).md5sum
+    executable_md5 = elf.get_code_md5(exe_path) if os.path.exists(exe_path) else ""
+    info = CacheFile(util.get_file_md5(file_path), exe_path, compilation_flags, sanitizers, object_hash=object_hash,
+                     executable_md5=executable_md5)
     info.save(file_path)
-    if clear_cache:
+    if clear_cache and previous_md5sum != info.md5sum:
         remove_results_cache()
 
 
 def _check_file_changed(file_path, lang, task_id):
     solutions_re = package_util.get_solutions_re(task_id)
     md5sum = util.get_file_md5(file_path)
-    info = get_cache_file(file_path)
+    info = get_cache_file(file_path, tests=[])
 
     if info.md5sum != md5sum:
         for solution in os.listdir(paths.get_cache_path('md5sums')):
             # Remove only files in the same language and matching the solution regex
             if package_util.get_file_lang(solution) == lang and \
                     solutions_re.match(solution) is not None:
-                os.unlink(paths.get_cache_path('md5sums', solution))
+                _remove_cache_file(solution, get_cache_file(solution, tests=[]).results_key)
 
     info.md5sum = md5sum
     info.save(file_path)
@@ -121,10 +155,132 @@ def remove_results_cache():
     """
     Removes all cached test results
     """
-    for solution in os.listdir(paths.get_cache_path('md5sums')):
-        info = get_cache_file(solution)
-        info.tests = {}
-        info.save(solution)
+    results_db.remove_results()
+    remove_journal()
+
+
+def remove_tests_results(test_md5sums: List[str]):
+    """
+    Removes cached results of all solutions for given tests.
+    :param test_md5sums: md5sums of the tests
+    """
+    results_db.remove_results(tests=test_md5sums)
+
+
+def journal_exists() -> bool:
+    return os.path.exists(paths.get_cache_path("run_journal"))
+
+
+def open_journal(resume: bool) -> TextIO:
+    """
+    Opens the run journal for appending. Results of finished executions are written to it immediately,
+    so that they aren't lost if sinol-make is killed before saving cache files.
+    :param resume: If False, journal of the previous run is removed.
+    """
+    if not resume:
+        remove_journal()
+    return open(paths.get_cache_path("run_journal"), "a")
+
+
+def _read_journal():
+    """
+    Yields entries of the run journal.
+    """
+    try:
+        with open(paths.get_cache_path("run_journal"), "r") as journal:
+            for line in journal:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # The last line may be incomplete if sinol-make was killed while writing it.
+                    continue
+    except FileNotFoundError:
+        return
+
+
+def append_to_journal(journal: TextIO, solution: str, solution_cache: CacheFile, test_md5sum: str,
+                      cache_test: CacheTest):
+    """
+    Appends result of an execution to the run journal.
+    :param journal: Journal opened with `open_journal`
+    :param solution: Name of the solution
+    :param solution_cache: Cache file of the solution, used to check if the result is still valid when replaying
+    :param test_md5sum: md5sum of the test
+    :param cache_test: Result to save
+    """
+    journal.write(json.dumps({
+        "solution": solution,
+        "md5sum": solution_cache.md5sum,
+        "compilation_flags": solution_cache.compilation_flags,
+        "sanitizers": solution_cache.sanitizers,
+        "executable_md5": solution_cache.executable_md5,
+        "test": test_md5sum,
+        "result": cache_test.to_dict(),
+    }) + "\n")
+    journal.flush()
+
+
+def _journal_results(cache_files: Dict[str, CacheFile]) -> Iterator[Tuple[str, str, CacheTest]]:
+    """
+    Yields results from the run journal which are still valid, as tuples: (solution, md5sum of test, result).
+    Results for solutions which were changed or compiled with different flags since they were journaled are skipped.
+    """
+    for entry in _read_journal():
+        try:
+            cache_file = cache_files.get(entry["solution"], None)
+            if cache_file is None or cache_file.md5sum != entry["md5sum"] or \
+                    cache_file.compilation_flags != entry["compilation_flags"] or \
+                    cache_file.sanitizers != entry["sanitizers"] or \
+                    cache_file.executable_md5 != entry["executable_md5"]:
+                continue
+            yield entry["solution"], entry["test"], CacheTest.from_dict(entry["result"])
+        except (ValueError, KeyError, TypeError):
+            continue
+
+
+def replay_journal(cache_files: Dict[str, CacheFile]) -> int:
+    """
+    Adds results from the run journal to cache files of solutions. Results for solutions which were changed
+    or compiled with different flags since they were journaled are ignored.
+    :param cache_files: Dictionary: {"<solution>": <cache file>}
+    :return: Number of replayed results
+    """
+    replayed = 0
+    for solution, test, cache_test in _journal_results(cache_files):
+        cache_files[solution].tests[test] = cache_test
+        replayed += 1
+    return replayed
+
+
+def merge_journal(cache_files: Dict[str, CacheFile]):
+    """
+    Saves results from the run journal to the results database and removes the journal.
+    Only journaled results are written, other cached results are left untouched.
+    Cache files of journaled solutions which are not in `cache_files` are read from the cache directory.
+    :param cache_files: Dictionary: {"<solution>": <cache file>}
+    """
+    cache_files = dict(cache_files)
+    for entry in _read_journal():
+        solution = entry.get("solution", None) if isinstance(entry, dict) else None
+        if solution is not None and solution not in cache_files:
+            cache_file = get_cache_file(solution, tests=[])
+            if cache_file.md5sum != "":
+                cache_files[solution] = cache_file
+    results = collections.defaultdict(dict)
+    for solution, test, cache_test in _journal_results(cache_files):
+        cache_files[solution].tests[test] = cache_test
+        results[solution][test] = cache_test.to_dict()
+    for solution, solution_results in results.items():
+        results_db.save_results(solution, cache_files[solution].results_key, solution_results)
+    remove_journal()
+
+
+def remove_journal():
+    """
+    Removes the run journal. Should be called after its results are saved to cache files.
+    """
+    if os.path.exists(paths.get_cache_path("run_journal")):
+        os.unlink(paths.get_cache_path("run_journal"))
 
 
 def remove_results_if_contest_type_changed(contest_type):
@@ -157,7 +313,7 @@ def has_file_changed(file_path: str) -> bool:
     :return: True if file has changed, False otherwise
     """
     try:
-        info = get_cache_file(file_path)
+        info = get_cache_file(file_path, tests=[])
         return info.md5sum != util.get_file_md5(file_path)
     except FileNotFoundError:
         return True
@@ -0,0 +1,48 @@
+import os
+from fractions import Fraction
+from typing import Tuple, Union
+
+from sinol_make.helpers import paths, results_db, hash_cache
+
+
+def get_key(checker_path: str, input_file_path: str, output_file_path: str,
+            answer_file_path: str) -> Union[Tuple[str, str, str, str], None]:
+    """
+    Returns key of a verdict of the checker: md5sums of the checker executable, input, output and answer files.
+    As the executable is hashed, verdicts of a rebuilt checker aren't used.
+    Returns None if the verdict can't be cached: outside of packages or if some file doesn't exist
+    (for example tasks with a library can have no answer files).
+    """
+    if not os.path.isdir(paths.get_cache_path()):
+        return None
+    files = [checker_path, input_file_path, output_file_path, answer_file_path]
+    try:
+        md5sums = hash_cache.get_files_md5(files)
+    except FileNotFoundError:
+        return None
+    return tuple(md5sums[file] for file in files)
+
+
+def load_verdict(key: Union[Tuple[str, str, str, str], None]) -> Union[Tuple[bool, Fraction, str], None]:
+    """
+    Returns cached verdict (correct, points, comment) for the key or None if it isn't cached.
+    """
+    if key is None:
+        return None
+    row = results_db.get_connection().execute(
+        "SELECT correct, points, comment FROM checker_verdicts WHERE checker_md5 = ? AND input_md5 = ? "
+        "AND output_md5 = ? AND answer_md5 = ?", key).fetchone()
+    if row is None:
+        return None
+    return bool(row[0]), Fraction(row[1]), row[2]
+
+
+def save_verdict(key: Union[Tuple[str, str, str, str], None], verdict: Tuple[bool, Fraction, str]):
+    if key is None:
+        return
+    correct, points, comment = verdict
+    connection = results_db.get_connection()
+    with connection:
+        connection.execute("INSERT OR REPLACE INTO checker_verdicts (checker_md5, input_md5, output_md5, answer_md5, "
+                           "correct, points, comment) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           key + (int(correct), str(points), comment))
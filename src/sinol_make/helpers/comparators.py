@@ -0,0 +1,188 @@
+import collections
+import contextlib
+import itertools
+import math
+import re
+from fractions import Fraction
+from typing import Dict, Iterator, Mapping, Tuple, Type, Union
+
+from sinol_make import util
+from sinol_make.helpers import oicompare
+
+
+# Tokens are separated by whitespace and null bytes, the same as in oicompare.
+_TOKEN_RE = re.compile(rb'[^\s\0]+')
+
+
+def _tokens(data) -> Iterator[bytes]:
+    for match in _TOKEN_RE.finditer(data):
+        yield match.group()
+
+
+class BaseComparator:
+    """
+    Comparator built into sinol-make, used instead of a checker for simple tasks.
+    Comparators are configured with the `sinol_comparator` key in config.yml
+    and compare outputs with answers in-process.
+    """
+
+    # Parameters accepted by the comparator with their default values.
+    params: Dict[str, float] = {}
+
+    def __init__(self, **params):
+        self.params = {**self.params, **params}
+
+    @staticmethod
+    def name() -> str:
+        raise NotImplementedError()
+
+    def compare(self, output, answer) -> Union[str, None]:
+        """
+        Compares contents of the output with the answer (bytes-like objects).
+        Returns None if the output is correct, otherwise a comment describing the difference.
+        """
+        raise NotImplementedError()
+
+    def check(self, output_file_path, answer_file_path) -> Tuple[bool, Fraction, str]:
+        """
+        Returns a tuple of three values, the same as a checker:
+        - bool: whether the output is correct
+        - Fraction: percentage of the score
+        - str: optional comment
+        """
+        with open(output_file_path, "rb") as output_file, open(answer_file_path, "rb") as answer_file, \
+                contextlib.ExitStack() as stack:
+            comment = self.compare(oicompare.map_file(output_file, stack), oicompare.map_file(answer_file, stack))
+        if comment is None:
+            return True, Fraction(100, 1), ""
+        return False, Fraction(0, 1), comment
+
+
+class TokenComparator(BaseComparator):
+    """
+    Compares whitespace separated tokens, ignoring line breaks.
+    """
+
+    def tokens_equal(self, output_token: bytes, answer_token: bytes) -> bool:
+        return output_token == answer_token
+
+    def compare(self, output, answer) -> Union[str, None]:
+        for i, (output_token, answer_token) in enumerate(itertools.zip_longest(_tokens(output), _tokens(answer))):
+            if output_token is None:
+                return f"Token {i + 1}: expected {oicompare.quote_token(answer_token)}, read end of file"
+            if answer_token is None:
+                return f"Token {i + 1}: expected end of file, read {oicompare.quote_token(output_token)}"
+            if not self.tokens_equal(output_token, answer_token):
+                return f"Token {i + 1}: expected {oicompare.quote_token(answer_token)}, read {oicompare.quote_token(output_token)}"
+        return None
+
+
+class FloatComparator(TokenComparator):
+    """
+    Compares tokens, allowing numbers to differ by `abs_eps` or by `rel_eps` relative to the answer.
+    Tokens which aren't finite numbers have to be equal.
+    """
+
+    params = {"abs_eps": 1e-6, "rel_eps": 1e-6}
+
+    @staticmethod
+    def name() -> str:
+        return "float"
+
+    def tokens_equal(self, output_token: bytes, answer_token: bytes) -> bool:
+        if output_token == answer_token:
+            return True
+        try:
+            output_value = float(output_token)
+            answer_value = float(answer_token)
+        except ValueError:
+            return False
+        if not math.isfinite(output_value) or not math.isfinite(answer_value):
+            return False
+        difference = abs(output_value - answer_value)
+        return difference <= self.params["abs_eps"] or difference <= self.params["rel_eps"] * abs(answer_value)
+
+
+class TokenCaseInsensitiveComparator(TokenComparator):
+    """
+    Compares tokens ignoring case, for example for answers like `YES` / `NO`.
+    """
+
+    @staticmethod
+    def name() -> str:
+        return "token_case_insensitive"
+
+    def tokens_equal(self, output_token: bytes, answer_token: bytes) -> bool:
+        return output_token.lower() == answer_token.lower()
+
+
+class UnorderedLinesComparator(BaseComparator):
+    """
+    Compares lines (with whitespace normalized the same as in oicompare) in any order. Empty lines are ignored.
+    """
+
+    @staticmethod
+    def name() -> str:
+        return "unordered_lines"
+
+    def compare(self, output, answer) -> Union[str, None]:
+        output_lines = collections.Counter(line for line in oicompare.normalized_lines(output) if line)
+        answer_lines = collections.Counter(line for line in oicompare.normalized_lines(answer) if line)
+        missing = answer_lines - output_lines
+        if missing:
+            return f"Missing line {oicompare.quote_token(next(iter(missing)))}"
+        extra = output_lines - answer_lines
+        if extra:
+            return f"Unexpected line {oicompare.quote_token(next(iter(extra)))}"
+        return None
+
+
+COMPARATORS: Dict[str, Type[BaseComparator]] = {
+    comparator.name(): comparator
+    for comparator in [FloatComparator, TokenCaseInsensitiveComparator, UnorderedLinesComparator]
+}
+
+
+def _parse_param(value) -> Union[float, None]:
+    """
+    Returns value of a parameter as a float or None if it isn't a non-negative number.
+    """
+    if isinstance(value, bool):
+        return None
+    # YAML parses numbers like `1e-6` (without a dot) as strings.
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value >= 0 else None
+
+
+def get_comparator(config: Mapping) -> Union[BaseComparator, None]:
+    """
+    Returns the comparator configured with the `sinol_comparator` key in config.yml or None if there is no such key.
+    The key can be a name of a comparator (for example `unordered_lines`)
+    or a dictionary with its type and parameters (for example `{type: float, abs_eps: 1e-6}`).
+    """
+    comparator_config = config.get("sinol_comparator", None)
+    if comparator_config is None:
+        return None
+    if isinstance(comparator_config, str):
+        comparator_config = {"type": comparator_config}
+    if not isinstance(comparator_config, Mapping) or "type" not in comparator_config:
+        util.exit_with_error("Invalid `sinol_comparator` in config.yml, expected a name of a comparator "
+                             "or a dictionary with its type and parameters.")
+
+    params = dict(comparator_config)
+    comparator_type = params.pop("type")
+    if comparator_type not in COMPARATORS:
+        util.exit_with_error(f'Unknown comparator "{comparator_type}" in config.yml. '
+                             f'Available comparators: {", ".join(COMPARATORS)}.')
+    comparator_cls = COMPARATORS[comparator_type]
+    for param, value in params.items():
+        if param not in comparator_cls.params:
+            util.exit_with_error(f'Unknown parameter "{param}" of comparator "{comparator_type}" in config.yml.')
+        params[param] = _parse_param(value)
+        if params[param] is None:
+            util.exit_with_error(f'Parameter "{param}" of comparator "{comparator_type}" in config.yml should be '
+                                 f'a non-negative number.')
+    return comparator_cls(**params)
@@ -7,7 +7,7 @@ import subprocess
 
 import sinol_make.helpers.compiler as compiler
 from sinol_make import util
-from sinol_make.helpers import paths
+from sinol_make.helpers import paths, object_store
 from sinol_make.helpers.cache import check_compiled, save_compiled, package_util
 from sinol_make.interfaces.Errors import CompilationError
 from sinol_make.structs.compiler_structs import Compilers
@@ -47,18 +47,6 @@ def compile(program, output, compilers: Compilers = None, compile_log=None, comp
     if extra_compilation_files is None:
         extra_compilation_files = []
 
-    compiled_exe = check_compiled(program, compilation_flags, use_fsanitize)
-    if compiled_exe is not None:
-        if compile_log is not None:
-            compile_log.write(f'Using cached executable {compiled_exe}\n')
-            compile_log.close()
-        if os.path.abspath(compiled_exe) != os.path.abspath(output):
-            shutil.copy(compiled_exe, output)
-        return True
-
-    for file in extra_compilation_files:
-        shutil.copy(file, os.path.join(os.path.dirname(output), os.path.basename(file)))
-
     gcc_compilation_flags = ''
     if compilation_flags == 'weak':
         gcc_compilation_flags = ''  # Disable all warnings
@@ -86,6 +74,41 @@ def compile(program, output, compilers: Compilers = None, compile_log=None, comp
         if use_fsanitize and compilation_flags != 'weak':
             arguments += ['-fsanitize=address,undefined', '-fno-sanitize-recover']
     elif ext == '.py':
+        arguments = [compilers.python_interpreter_path, '-m', 'py_compile', program]
+    elif ext == '.java':
+        raise NotImplementedError('Java compilation is not implemented')
+    else:
+        raise CompilationError('Unknown file extension: ' + ext)
+
+    # C and C++ executables are kept in a store shared between packages, keyed by everything that affects the build.
+    object_hash = None
+    if ext in ('.c', '.cpp') and arguments[0] is not None:
+        object_hash = object_store.get_object_hash(program, output, arguments,
+                                                   compiler.get_compiler_version(arguments[0]),
+                                                   extra_compilation_files)
+
+    compiled_exe = check_compiled(program, compilation_flags, use_fsanitize, object_hash)
+    if compiled_exe is not None:
+        if compile_log is not None:
+            compile_log.write(f'Using cached executable {compiled_exe}\n')
+            compile_log.close()
+        if os.path.abspath(compiled_exe) != os.path.abspath(output):
+            shutil.copy(compiled_exe, output)
+        return True
+
+    stored_exe = object_store.get_object(object_hash) if object_hash is not None else None
+    if stored_exe is not None:
+        if compile_log is not None:
+            compile_log.write(f'Using stored executable {stored_exe}\n')
+            compile_log.close()
+        shutil.copy2(stored_exe, output)
+        save_compiled(program, output, compilation_flags, use_fsanitize, clear_cache, object_hash)
+        return True
+
+    for file in extra_compilation_files:
+        shutil.copy(file, os.path.join(os.path.dirname(output), os.path.basename(file)))
+
+    if ext == '.py':
         if sys.platform == 'win32' or sys.platform == 'cygwin':
             # TODO: Make this work on Windows
             print(util.error('Python is not supported on Windows'))
@@ -97,11 +120,6 @@ def compile(program, output, compilers: Compilers = None, compile_log=None, comp
 
             st = os.stat(output)
             os.chmod(output, st.st_mode | stat.S_IEXEC)
-        arguments = [compilers.python_interpreter_path, '-m', 'py_compile', program]
-    elif ext == '.java':
-        raise NotImplementedError('Java compilation is not implemented')
-    else:
-        raise CompilationError('Unknown file extension: ' + ext)
 
     process = subprocess.Popen(arguments, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
     out, _ = process.communicate()
@@ -114,7 +132,9 @@ def compile(program, output, compilers: Compilers = None, compile_log=None, comp
     if process.returncode != 0:
         raise CompilationError('Compilation failed')
     else:
-        save_compiled(program, output, compilation_flags, use_fsanitize, clear_cache)
+        if object_hash is not None:
+            object_store.save_object(object_hash, output)
+        save_compiled(program, output, compilation_flags, use_fsanitize, clear_cache, object_hash or "")
         return True
 
 
@@ -132,7 +152,7 @@ def compile_file(file_path: str, name: str, compilers: Compilers, compilation_fl
     :param use_extras: Whether to use extra compilation files and arguments from config
     :return: Tuple of (executable path or None if compilation failed, log path)
     """
-    config = package_util.get_config()
+    config = package_util.get_config_snapshot().config
 
     extra_compilation_args = []
     extra_compilation_files = []
@@ -3,6 +3,7 @@ import subprocess
 import argparse
 import sys
 import os
+import shutil
 
 from sinol_make import util
 from sinol_make.structs.compiler_structs import Compilers
@@ -90,6 +91,21 @@ def get_java_compiler_path():
         return 'javac'
 
 
+@cache_result()
+def get_compiler_version(compiler: str) -> str:
+    """
+    Returns a string identifying the compiler: its resolved path and output of `<compiler> --version`.
+    The result is cached for every compiler, as it's a part of the key of every compiled executable.
+    :param compiler: Path or name of the compiler
+    """
+    path = os.path.realpath(shutil.which(compiler) or compiler)
+    try:
+        process = subprocess.run([path, '--version'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        return path + '\n' + process.stdout.decode('utf-8', errors='replace')
+    except OSError:
+        return path
+
+
 def get_default_compilers():
     """
     Get the default compilers
@@ -0,0 +1,60 @@
+import struct
+import hashlib
+from typing import List, Tuple
+
+from sinol_make.helpers import hash_cache
+
+
+# Flag of sections loaded into memory.
+SHF_ALLOC = 0x2
+# Types of sections: notes (for example the build id, which is a hash of the whole file)
+# and sections without contents in the file (.bss).
+SHT_NOTE = 7
+SHT_NOBITS = 8
+
+
+def _get_sections(data: bytes) -> Tuple[tuple, List[tuple]]:
+    """
+    Returns a tuple (ELF header, list of section headers) of an ELF file. Section headers are tuples
+    (name, type, flags, address, offset, size). Raises ValueError if the file isn't a valid ELF file.
+    """
+    if len(data) < 16 or data[:4] != b"\x7fELF" or data[4] not in (1, 2) or data[5] not in (1, 2):
+        raise ValueError("Not an ELF file")
+    endian = "<" if data[5] == 1 else ">"
+    if data[4] == 1:
+        header_format, section_format = endian + "HHIIIIIHHHHHH", endian + "IIIIIIIIII"
+    else:
+        header_format, section_format = endian + "HHIQQQIHHHHHH", endian + "IIQQQQIIQQ"
+    try:
+        header = struct.unpack_from(header_format, data, 16)
+        shoff, shentsize, shnum, shstrndx = header[5], header[10], header[11], header[12]
+        sections = [struct.unpack_from(section_format, data, shoff + i * shentsize)[:6] for i in range(shnum)]
+        names_offset = sections[shstrndx][4]
+        return header, [(data[names_offset + section[0]:data.index(b"\0", names_offset + section[0])],)
+                        + section[1:] for section in sections]
+    except (struct.error, IndexError, ValueError):
+        raise ValueError("Invalid ELF file")
+
+
+def get_code_md5(path: str) -> str:
+    """
+    Returns md5sum of the parts of an executable loaded into memory (code and data), so that executables
+    differing only in symbols, the name of the source file or the build id have the same md5sum.
+    Files which aren't ELF executables are hashed whole.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        header, sections = _get_sections(data)
+    except ValueError:
+        return hash_cache.get_file_md5(path)
+    md5 = hashlib.md5()
+    # Type, machine and entry point of the executable.
+    md5.update(repr((header[0], header[1], header[3])).encode())
+    for name, sh_type, flags, address, offset, size in sections:
+        if not flags & SHF_ALLOC or sh_type == SHT_NOTE:
+            continue
+        md5.update(repr((name, sh_type, flags, address, size)).encode())
+        if sh_type != SHT_NOBITS:
+            md5.update(data[offset:offset + size])
+    return md5.hexdigest()
@@ -1,24 +1,35 @@
 import os
+import functools
 
 __cache = {}
 
 
 def cache_result(cwd=False):
     """
-    Function to cache the result of a function.
+    Function to cache the result of a function. Results are cached separately for every combination of
+    arguments, which have to be hashable. If `cwd` is True, they are also cached separately for every
+    working directory. The cache of a function can be cleared with `<function>.cache_clear()`.
     """
     def decorator(func):
+        name = (func.__module__, func.__qualname__)
+
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
+            key = (name, args, frozenset(kwargs.items()))
             if cwd:
-                key = (func.__name__, os.getcwd())
-            else:
-                key = func.__name__
+                key += (os.getcwd(),)
 
             if key in __cache:
                 return __cache[key]
             result = func(*args, **kwargs)
             __cache[key] = result
             return result
+
+        def cache_clear():
+            for key in [key for key in __cache if key[0] == name]:
+                del __cache[key]
+
+        wrapper.cache_clear = cache_clear
         return wrapper
     return decorator
 
@@ -0,0 +1,106 @@
+import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from sinol_make.helpers import paths, results_db
+
+
+# Size of chunks in which files are read while hashing.
+CHUNK_SIZE = 1024 * 1024
+
+# Files modified or changed less than this many nanoseconds before hashing aren't cached, as they could be
+# modified again without changing their modification time (timestamps of some filesystems have a granularity
+# of seconds).
+RACY_WINDOW_NS = 2 * 10**9
+
+# Maximum number of threads used for hashing files which aren't cached.
+MAX_THREADS = 8
+
+# md5sums of files hashed by this process: {(device, inode, size, mtime_ns, ctime_ns): md5sum}
+# ctime is included, as copying a file can preserve its modification time, but not its ctime.
+_hashes: Dict[Tuple[int, int, int, int, int], str] = {}
+
+
+def hash_file(path: str) -> str:
+    """
+    Computes md5sum of a file, reading it in chunks of `CHUNK_SIZE` bytes.
+    """
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _get_key(stat: os.stat_result) -> Tuple[int, int, int, int, int]:
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns
+
+
+def _is_racy(stat: os.stat_result) -> bool:
+    return time.time_ns() - max(stat.st_mtime_ns, stat.st_ctime_ns) < RACY_WINDOW_NS
+
+
+def _use_db() -> bool:
+    # Files outside of packages (for example in temporary directories) are hashed without the database.
+    return os.path.isdir(paths.get_cache_path())
+
+
+def _load_hashes(keys: List[Tuple[int, int, int, int, int]]) -> Dict[Tuple[int, int, int, int, int], str]:
+    connection = results_db.get_connection()
+    hashes = {}
+    for key in keys:
+        row = connection.execute("SELECT md5sum FROM file_hashes WHERE device = ? AND inode = ? AND size = ? "
+                                 "AND mtime_ns = ? AND ctime_ns = ?", key).fetchone()
+        if row is not None:
+            hashes[key] = row[0]
+    return hashes
+
+
+def _save_hashes(hashes: Dict[Tuple[int, int, int, int, int], str]):
+    if len(hashes) == 0:
+        return
+    connection = results_db.get_connection()
+    with connection:
+        connection.executemany("INSERT OR REPLACE INTO file_hashes (device, inode, size, mtime_ns, ctime_ns, "
+                               "md5sum) VALUES (?, ?, ?, ?, ?, ?)", [key + (md5sum,) for key, md5sum in hashes.items()])
+
+
+def get_files_md5(files: List[str]) -> Dict[str, str]:
+    """
+    Returns md5sums of files. Files which weren't modified since they were last hashed
+    (same device, inode, size, modification and change time) aren't read again. Other files are hashed in parallel
+    and their md5sums are saved in the cache directory of the package.
+    :param files: Paths to the files
+    :return: Dictionary: {"<path>": "<md5sum>"}
+    """
+    stats = {file: os.stat(file) for file in files}
+    keys = {file: _get_key(stat) for file, stat in stats.items()}
+    use_db = _use_db()
+    missing = [key for key in set(keys.values()) if key not in _hashes]
+    if use_db and len(missing) > 0:
+        _hashes.update(_load_hashes(missing))
+
+    # Files with the same key are hashed once.
+    to_hash = {keys[file]: file for file in files if keys[file] not in _hashes}
+    if len(to_hash) > 1:
+        # hashlib releases the GIL while hashing large chunks, so threads can hash files in parallel.
+        with ThreadPoolExecutor(min(MAX_THREADS, len(to_hash))) as pool:
+            hashed = dict(zip(to_hash.keys(), pool.map(hash_file, to_hash.values())))
+    else:
+        hashed = {key: hash_file(file) for key, file in to_hash.items()}
+
+    result = {file: _hashes[keys[file]] if keys[file] in _hashes else hashed[keys[file]] for file in files}
+    new_hashes = {key: md5sum for key, md5sum in hashed.items() if not _is_racy(stats[to_hash[key]])}
+    _hashes.update(new_hashes)
+    if use_db:
+        _save_hashes(new_hashes)
+    return result
+
+
+def get_file_md5(file: str) -> str:
+    """
+    Returns md5sum of a file, using hashes cached by `get_files_md5`.
+    """
+    return get_files_md5([file])[file]
@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Dict, List, Tuple, Union
+
+from sinol_make.helpers import paths, hash_cache, user_cache
+
+
+def get_verdicts_path(*path) -> str:
+    """
+    Returns a path in the cache of inwer verdicts. It's shared between packages and isn't removed
+    together with the cache directory of the package (for example by `sinol-make verify`).
+    """
+    return paths.get_user_cache_path("inwer", *path)
+
+
+def get_keys(inwer_exe_path: str, compilation_flags: str, use_fsanitize: bool, tests: List[str]) -> Dict[str, str]:
+    """
+    Returns keys of verdicts of the inwer on the tests. A key depends on md5sums of the inwer executable
+    and of the test, on the name of the test (inwers can check constraints of its group) and on the compilation
+    flags and sanitizers the inwer was compiled with.
+    :return: Dictionary: {"<test path>": "<key>"}
+    """
+    md5sums = hash_cache.get_files_md5([inwer_exe_path] + tests)
+    keys = {}
+    for test in tests:
+        key = {
+            "inwer": md5sums[inwer_exe_path],
+            "compilation_flags": compilation_flags,
+            "fsanitize": use_fsanitize,
+            "test_name": os.path.basename(test),
+            "test": md5sums[test],
+        }
+        keys[test] = hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+    return keys
+
+
+def load_verdict(key: str) -> Union[Tuple[bool, str], None]:
+    """
+    Returns cached verdict (valid, output) for the key or None if it isn't cached.
+    """
+    try:
+        with open(get_verdicts_path(key), "r") as f:
+            verdict = json.load(f)
+        user_cache.touch(get_verdicts_path(key))
+        return verdict["valid"], verdict["output"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save(name: str, data):
+    """
+    Saves the data as json to a file in the cache. The file is written atomically, as many processes can
+    verify tests at once. Failures (for example read-only home directory) are ignored, as the cache is only
+    an optimization.
+    """
+    try:
+        os.makedirs(get_verdicts_path(), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=get_verdicts_path(), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, get_verdicts_path(name))
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+    user_cache.maybe_prune()
+
+
+def save_verdict(key: str, valid: bool, output: str):
+    """
+    Saves the verdict to the cache.
+    """
+    _save(key, {"valid": valid, "output": output})
+
+
+def _get_batch_support_name(inwer_exe_path: str) -> str:
+    return "batch-" + hash_cache.get_file_md5(inwer_exe_path)
+
+
+def load_batch_support(inwer_exe_path: str) -> Union[bool, None]:
+    """
+    Returns cached result of checking if the inwer supports the batch protocol
+    or None if it isn't cached. The result is cached by md5sum of the inwer executable.
+    """
+    name = _get_batch_support_name(inwer_exe_path)
+    try:
+        with open(get_verdicts_path(name), "r") as f:
+            supported = json.load(f)["batch"]
+        user_cache.touch(get_verdicts_path(name))
+        return supported if isinstance(supported, bool) else None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_batch_support(inwer_exe_path: str, supported: bool):
+    """
+    Saves the result of checking if the inwer supports the batch protocol to the cache.
+    """
+    _save(_get_batch_support_name(inwer_exe_path), {"batch": supported})
@@ -0,0 +1,113 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+from typing import Dict, List, Union
+
+from sinol_make import util
+from sinol_make.helpers import paths, user_cache
+
+
+INCLUDE_RE = re.compile(r'^\s*#\s*include\s*"([^"]+)"', re.MULTILINE)
+
+
+def get_objects_path(*path) -> str:
+    """
+    Returns a path in the content-addressed store of compiled executables, shared between packages.
+    """
+    return paths.get_user_cache_path("objects", *path)
+
+
+def _get_local_includes(source: str) -> Dict[str, str]:
+    """
+    Returns md5sums of all files included with `#include "..."` by the source file, directly or indirectly.
+    Included files are searched for in the directory of the including file, the same as the compiler does.
+    :return: Dictionary: {"<included path relative to the source directory>": "<md5sum>"}
+    """
+    source_dir = os.path.dirname(os.path.abspath(source))
+    includes = {}
+    to_visit = [os.path.abspath(source)]
+    visited = set()
+    while to_visit:
+        file = to_visit.pop()
+        if file in visited:
+            continue
+        visited.add(file)
+        try:
+            with open(file, 'r', errors='replace') as f:
+                content = f.read()
+        except OSError:
+            continue
+        for include in INCLUDE_RE.findall(content):
+            path = os.path.normpath(os.path.join(os.path.dirname(file), include))
+            if os.path.isfile(path):
+                includes[os.path.relpath(path, source_dir)] = util.get_file_md5(path)
+                to_visit.append(path)
+    return includes
+
+
+def get_object_hash(program: str, output: str, arguments: List[str], compiler_version: str,
+                    extra_compilation_files: List[str]) -> str:
+    """
+    Returns key of the compiled executable in the store. It depends on contents of the source file, files it includes,
+    extra compilation files and file arguments, on the compiler version and on all compiler arguments.
+    Paths to the source and to the output are not a part of the key, so identical programs from different packages
+    share the executable.
+    :param program: Path to the source file
+    :param output: Path to the output file
+    :param arguments: Full compiler command line
+    :param compiler_version: Compiler identification, as returned by `compiler.get_compiler_version`
+    :param extra_compilation_files: Files copied to the directory of the output before compiling
+    """
+    normalized_arguments = []
+    for arg in arguments[1:]:
+        if arg == program:
+            normalized_arguments.append("<source>")
+        elif arg == output:
+            normalized_arguments.append("<output>")
+        elif os.path.isfile(arg):
+            normalized_arguments.append(f"<file {os.path.basename(arg)} {util.get_file_md5(arg)}>")
+        else:
+            normalized_arguments.append(arg)
+    key = {
+        "source": util.get_file_md5(program),
+        "includes": _get_local_includes(program),
+        "extra_files": {os.path.basename(file): util.get_file_md5(file)
+                        for file in extra_compilation_files if os.path.isfile(file)},
+        "compiler": compiler_version,
+        "arguments": normalized_arguments,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def get_object(object_hash: str) -> Union[str, None]:
+    """
+    Returns path to the stored executable with given key or None if it's not in the store.
+    """
+    path = get_objects_path(object_hash)
+    if os.path.isfile(path):
+        user_cache.touch(path)
+        return path
+    return None
+
+
+def save_object(object_hash: str, executable: str):
+    """
+    Saves the executable to the store. The file is written atomically, as many processes can compile at once.
+    Failures (for example read-only home directory) are ignored, as the store is only an optimization.
+    """
+    try:
+        os.makedirs(get_objects_path(), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=get_objects_path(), prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copy2(executable, tmp_path)
+            os.replace(tmp_path, get_objects_path(object_hash))
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+    user_cache.maybe_prune()
@@ -1,7 +1,11 @@
+import contextlib
+import itertools
+import mmap
 import os
 import re
 import requests
 import subprocess
+from typing import Iterator
 
 from sinol_make import util
 
@@ -60,54 +64,160 @@ def check_and_download():
         util.exit_with_error("Couldn't download oicompare. Please try again later or download it manually.")
 
 
-def _strip(s: str) -> str:
+# Size of chunks in which files are compared by `files_equal`.
+CHUNK_SIZE = 1024 * 1024
+
+# Maximum length of a token quoted in a comment.
+MAX_COMMENT_TOKEN_LENGTH = 30
+
+# Longest sequences of whitespace (and null bytes) are equivalent to a single space.
+_WHITESPACE_RE = re.compile(rb'[\s\0]+')
+
+
+def quote_token(token: bytes) -> str:
+    """
+    Returns the token quoted for a comment, shortened if it's long.
+    """
+    text = token.decode("utf-8", errors="replace")
+    if len(text) > MAX_COMMENT_TOKEN_LENGTH:
+        text = text[:MAX_COMMENT_TOKEN_LENGTH] + "..."
+    return f'"{text}"'
+
+
+def map_file(file, stack: contextlib.ExitStack):
+    """
+    Returns contents of an open file as a bytes-like object, mapped into memory if the file isn't empty.
+    """
+    if os.fstat(file.fileno()).st_size == 0:
+        return b""
+    return stack.enter_context(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def normalized_lines(data) -> Iterator[bytes]:
+    """
+    Yields lines of `data` with whitespace normalized, without loading the whole file into a new buffer.
     """
-    Replace all longest sequences of spaces with a single space.
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = len(data)
+        yield _WHITESPACE_RE.sub(b" ", data[start:end]).strip()
+        start = end + 1
+
+
+def files_equal(file1_path: str, file2_path: str) -> bool:
     """
-    return re.sub(r'[\s\0]+', ' ', s).strip()
+    Returns True if the files have exactly the same contents. Much cheaper than `compare`,
+    so it's used first, as outputs of correct solutions are usually the same as the answers.
+    """
+    if os.path.getsize(file1_path) != os.path.getsize(file2_path):
+        return False
+    with open(file1_path, "rb") as file1, open(file2_path, "rb") as file2, contextlib.ExitStack() as stack:
+        data1 = map_file(file1, stack)
+        data2 = map_file(file2, stack)
+        # Comparing slices uses memcmp, which is faster than comparing memoryviews.
+        return all(data1[i:i + CHUNK_SIZE] == data2[i:i + CHUNK_SIZE] for i in range(0, len(data1), CHUNK_SIZE))
 
 
 def compare(file1_path: str, file2_path: str) -> bool:
     """
     Compare two files in the same way as oicompare does. Returns True if the files are the same, False otherwise.
+    Lines are compared after replacing sequences of whitespace with a single space, trailing empty lines are ignored.
     """
-    with open(file1_path, "r") as file1, open(file2_path, "r") as file2:
-        eof1 = False
-        eof2 = False
-        while True:
-            try:
-                line1 = _strip(next(file1))
-            except StopIteration:
-                eof1 = True
-            try:
-                line2 = _strip(next(file2))
-            except StopIteration:
-                eof2 = True
-
-            if eof1 and eof2:
-                return True
-            if eof1:
-                while line2 == "":
-                    try:
-                        line2 = _strip(next(file2))
-                    except StopIteration:
-                        eof2 = True
-                        break
-            elif eof2:
-                while line1 == "":
-                    try:
-                        line1 = _strip(next(file1))
-                    except StopIteration:
-                        eof1 = True
-                        break
-                    if line1 != "":
-                        break
-
-            if eof1 and eof2:
+    with open(file1_path, "rb") as file1, open(file2_path, "rb") as file2, contextlib.ExitStack() as stack:
+        lines1 = normalized_lines(map_file(file1, stack))
+        lines2 = normalized_lines(map_file(file2, stack))
+        for line1, line2 in itertools.zip_longest(lines1, lines2):
+            # After the end of one file, the other can only have empty lines.
+            if line1 != line2 and (line1 or line2):
+                return False
+        return True
+
+
+class StreamComparator:
+    """
+    Compares output read in chunks with the answer in the same way as `compare`, so that a wrong output
+    is detected as soon as its first wrong token is read, without saving the output to a file.
+    Lines are compared token by token, with line breaks treated as separate tokens.
+    """
+
+    # Tokens and line breaks.
+    _ITEM_RE = re.compile(rb'[^\s\0]+|\n')
+    _SEPARATOR_RE = re.compile(rb'[\s\0]')
+
+    def __init__(self, answer):
+        """
+        :param answer: Contents of the answer file (a bytes-like object, for example mmapped file)
+        """
+        self._answer = self._ITEM_RE.finditer(answer)
+        # Token at the end of the last chunk, which can continue in the next one.
+        self._pending = bytearray()
+        self._line = 1
+        # Comment describing the first difference, None if none was found yet.
+        self.comment = None
+
+    @staticmethod
+    def _describe(item: bytes) -> str:
+        return "end of line" if item == b"\n" else quote_token(item)
+
+    def _compare(self, item: bytes) -> bool:
+        expected = next(self._answer, None)
+        if expected is None:
+            # After the end of the answer, the output can only have empty lines.
+            if item != b"\n":
+                self.comment = f"Line {self._line}: expected end of file, read {self._describe(item)}"
+                return False
+        elif item != expected.group():
+            self.comment = (f"Line {self._line}: expected {self._describe(expected.group())}, "
+                            f"read {self._describe(item)}")
+            return False
+        if item == b"\n":
+            self._line += 1
+        return True
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Compares the next chunk of output. Returns False if the output is already known to be wrong.
+        """
+        if self.comment is not None:
+            return False
+        start = 0
+        if self._pending:
+            separator = self._SEPARATOR_RE.search(chunk)
+            if separator is None:
+                self._pending += chunk
                 return True
-            if (eof1 and line2 == "") or (eof2 and line1 == ""):
-                continue
-            if (eof1 and line2 != "") or (eof2 and line1 != ""):
+            self._pending += chunk[:separator.start()]
+            if not self._compare(bytes(self._pending)):
+                return False
+            self._pending = bytearray()
+            start = separator.start()
+        for match in self._ITEM_RE.finditer(chunk, start):
+            if match.end() == len(chunk) and match.group() != b"\n":
+                self._pending += match.group()
+                break
+            if not self._compare(match.group()):
                 return False
-            if line1 != line2:
+        return True
+
+    def close(self):
+        """
+        Releases the answer, so that its file can be unmapped.
+        """
+        self._answer = iter(())
+
+    def finish(self) -> bool:
+        """
+        Compares the rest of the answer after the end of output. Returns True if the output is correct.
+        """
+        if self.comment is not None:
+            return False
+        if self._pending and not self._compare(bytes(self._pending)):
+            return False
+        for expected in self._answer:
+            # Empty lines at the end of the answer are ignored.
+            if expected.group() != b"\n":
+                self.comment = f"Line {self._line}: expected {self._describe(expected.group())}, read end of file"
                 return False
+        return True
@@ -0,0 +1,130 @@
+import os
+from typing import Dict, List, Union
+
+from sinol_make import util
+from sinol_make.helpers import package_util
+from sinol_make.structs.package_structs import PackageTest
+
+
+# Extensions of source files of programs in `prog/`.
+CODE_EXTENSIONS = ["c", "cpp", "py", "java"]
+
+# Roles of programs in `prog/`, recognized by the suffix after the task id (for example `abcchk.cpp`).
+PROGRAM_ROLES = ["ingen", "inwer", "chk", "soc", "lib"]
+
+
+def _scan(directory: str) -> List[os.DirEntry]:
+    try:
+        with os.scandir(directory) as entries:
+            return [entry for entry in entries if entry.is_file()]
+    except FileNotFoundError:
+        return []
+
+
+class PackageIndex:
+    """
+    Index of tests and programs of the package in the current directory, built with a single scan
+    of `in/`, `out/` and `prog/`. The index isn't updated when files change, so a new one
+    has to be created after tests are generated.
+    """
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        root = os.getcwd()
+        in_re = package_util.get_in_tests_re(task_id)
+        out_re = package_util.get_out_tests_re(task_id)
+
+        # Filenames of input and output files which don't match the naming scheme.
+        self.invalid_inputs: List[str] = []
+        self.invalid_outputs: List[str] = []
+        outputs = set()
+        for entry in _scan(os.path.join(root, "out")):
+            if entry.name.endswith(".out"):
+                outputs.add(entry.name)
+                if not out_re.match(entry.name):
+                    self.invalid_outputs.append(entry.name)
+
+        tests = []
+        for entry in _scan(os.path.join(root, "in")):
+            if not entry.name.endswith(".in"):
+                continue
+            if not in_re.match(entry.name):
+                self.invalid_inputs.append(entry.name)
+                continue
+            tests.append(PackageTest(
+                name=entry.name,
+                group=package_util.get_group(entry.name, task_id),
+                in_path=os.path.join("in", entry.name),
+                has_output=os.path.splitext(entry.name)[0] + ".out" in outputs,
+                size=entry.stat().st_size,
+            ))
+        tests.sort(key=lambda test: (test.group, test.in_path))
+        # Tests by filename of the input file, sorted by group and name.
+        self.tests: Dict[str, PackageTest] = {test.name: test for test in tests}
+
+        # Programs in `prog/` by role: {"<role>": [<absolute paths>]}
+        self.programs: Dict[str, List[str]] = {role: [] for role in PROGRAM_ROLES}
+        for entry in sorted(_scan(os.path.join(root, "prog")), key=lambda entry: entry.name):
+            name, ext = os.path.splitext(entry.name)
+            if ext[1:] not in CODE_EXTENSIONS and not (name == f"{task_id}ingen" and ext == ".sh"):
+                continue
+            role = name[len(task_id):] if name.startswith(task_id) else None
+            if role in self.programs:
+                self.programs[role].append(entry.path)
+
+    def validate_test_names(self):
+        """
+        Checks if all input and output files have valid names.
+        Same as `package_util.validate_test_names`, but without scanning the package again.
+        """
+        if len(self.invalid_inputs) > 0:
+            util.exit_with_error(f'Input tests with invalid names: {", ".join(sorted(self.invalid_inputs))}.')
+        if len(self.invalid_outputs) > 0:
+            util.exit_with_error(f'Output tests with invalid names: {", ".join(sorted(self.invalid_outputs))}.')
+
+    def get_test(self, test_path: str) -> Union[PackageTest, None]:
+        """
+        Returns the test with the same filename as `test_path` or None if there is no such test.
+        """
+        return self.tests.get(os.path.basename(test_path), None)
+
+    def get_group(self, test_path: str) -> int:
+        test = self.get_test(test_path)
+        if test is None:
+            return package_util.get_group(test_path, self.task_id)
+        return test.group
+
+    def get_tests(self, arg_tests: Union[List[str], None] = None) -> List[str]:
+        """
+        Returns list of tests to run, the same as `package_util.get_tests`.
+        :param arg_tests: Tests specified in command line arguments. If None, all tests are returned.
+        :return: List of tests to run.
+        """
+        if arg_tests is None:
+            return [test.in_path for test in self.tests.values()]
+        existing_tests = []
+        for test in package_util.get_files_matching(arg_tests, "in"):
+            if not os.path.isfile(test):
+                util.exit_with_error("Test %s does not exist" % test)
+            if os.path.splitext(test)[1] == ".in":
+                existing_tests.append(os.path.join("in", os.path.basename(test)))
+        return sorted(existing_tests, key=lambda test: (self.get_group(test), test))
+
+    def get_groups(self) -> List[int]:
+        """
+        Returns sorted list of groups of all tests.
+        """
+        return sorted(set(test.group for test in self.tests.values()))
+
+    def get_all_inputs(self) -> List[str]:
+        """
+        Returns absolute paths to all input files with valid names.
+        """
+        return [os.path.join(os.getcwd(), test.in_path) for test in self.tests.values()]
+
+    def get_programs(self, role: str) -> List[str]:
+        """
+        Returns absolute paths to programs with given role (one of `PROGRAM_ROLES`), for example
+        `get_programs("chk")` returns all checkers.
+        """
+        return self.programs[role]
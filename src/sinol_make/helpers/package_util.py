@@ -1,11 +1,14 @@
 import os
 import re
+import copy
 import yaml
 import glob
 import fnmatch
 import multiprocessing as mp
+from dataclasses import dataclass
 from enum import Enum
-from typing import List, Union, Dict, Any, Tuple, Type
+from types import MappingProxyType
+from typing import List, Union, Dict, Any, Tuple, Type, Iterable, Mapping
 
 from sinol_make.helpers.func_cache import cache_result
 from sinol_make import util, contest_types
@@ -15,7 +18,7 @@ from sinol_make.task_type import BaseTaskType
 
 @cache_result(cwd=True)
 def get_task_id() -> str:
-    config = get_config()
+    config = get_config_snapshot().config
     if "sinol_task_id" in config:
         return config["sinol_task_id"]
     else:
@@ -52,15 +55,81 @@ def get_test_key(test, task_id):
     return get_group(test, task_id), test
 
 
-def get_config():
+# libyaml bindings are much faster than the pure Python loader, but they may not be installed.
+YAML_LOADER = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Parsed config.yml, together with the size and modification time of the file it was read from.
+    """
+    # Path to config.yml
+    path: str
+    # Modification time of config.yml in nanoseconds
+    mtime_ns: int
+    # Size of config.yml in bytes
+    size: int
+    # Parsed config. Shared by all users of the snapshot, so it's read-only: dictionaries are
+    # `MappingProxyType` and lists are tuples. Use `get_config` for a copy which can be modified.
+    config: Mapping[str, Any]
+
+
+def _freeze(value):
+    """
+    Returns a read-only copy of a parsed YAML value.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    elif isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """
+    Returns a copy of a value frozen by `_freeze` which can be modified.
+    """
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    elif isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return copy.deepcopy(value)
+
+
+# Snapshots of read configs: {"<path to config.yml>": <snapshot>}. Pool workers inherit them when forked.
+_config_snapshots: Dict[str, ConfigSnapshot] = {}
+
+
+def get_config_snapshot() -> ConfigSnapshot:
+    """
+    Returns snapshot of config.yml in the current directory. The config is parsed again only
+    if the size or modification time of the file changed since it was last read.
+    """
+    path = os.path.join(os.getcwd(), "config.yml")
     try:
-        with open(os.path.join(os.getcwd(), "config.yml"), "r") as config_file:
-            return yaml.load(config_file, Loader=yaml.FullLoader) or {}
+        stat = os.stat(path)
+        snapshot = _config_snapshots.get(path, None)
+        if snapshot is not None and snapshot.mtime_ns == stat.st_mtime_ns and snapshot.size == stat.st_size:
+            return snapshot
+        with open(path, "r") as config_file:
+            config = yaml.load(config_file, Loader=YAML_LOADER) or {}
     except FileNotFoundError:
         # Potentially redundant with util:exit_if_not_package
         util.exit_with_error("You are not in a package directory (couldn't find config.yml in current directory).")
     except yaml.YAMLError as e:
         util.exit_with_error("config.yml is not a valid YAML. Fix it before continuing:\n" + str(e))
+    snapshot = ConfigSnapshot(path, stat.st_mtime_ns, stat.st_size, _freeze(config))
+    _config_snapshots[path] = snapshot
+    return snapshot
+
+
+def get_config():
+    """
+    Returns a copy of config.yml in the current directory, which can be modified.
+    Use `get_config_snapshot` if the config is only read.
+    """
+    return _thaw(get_config_snapshot().config)
 
 
 def get_solutions_re(task_id: str) -> re.Pattern:
@@ -226,11 +295,17 @@ def _get_limit_from_dict(dict: Dict[str, Any], limit_type: LimitTypes, test_id:
         return None
 
 
-def _get_limit(limit_type: LimitTypes, test_path: str, config: Dict[str, Any], lang: str, task_id: str):
+def _allow_test_limit(config: Dict[str, Any]) -> bool:
+    return config.get("sinol_undocumented_test_limits", False) or \
+        contest_types.get_contest_type().allow_per_test_limits()
+
+
+def _get_limit(limit_type: LimitTypes, test_path: str, config: Dict[str, Any], lang: str, task_id: str,
+               allow_test_limit: Union[bool, None] = None):
     test_id = extract_test_id(test_path, task_id)
     test_group = str(get_group(test_path, task_id))
-    contest_type = contest_types.get_contest_type()
-    allow_test_limit = config.get("sinol_undocumented_test_limits", False) or contest_type.allow_per_test_limits()
+    if allow_test_limit is None:
+        allow_test_limit = _allow_test_limit(config)
     global_limit = _get_limit_from_dict(config, limit_type, test_id, test_group, test_path, allow_test_limit)
     override_limits_dict = config.get("override_limits", {}).get(lang, {})
     overriden_limit = _get_limit_from_dict(override_limits_dict, limit_type, test_id, test_group, test_path,
@@ -271,6 +346,66 @@ def get_memory_limit(test_path, config, lang, task_id, args=None):
     return _get_limit(LimitTypes.MEMORY_LIMIT, test_path, str_config, lang, task_id)
 
 
+class LimitTable:
+    """
+    Immutable table of time and memory limits, indexed by test and language.
+    Use `get_limit_table` to create it.
+    """
+
+    def __init__(self, time_limits: Dict[Tuple[str, str], int], memory_limits: Dict[Tuple[str, str], int]):
+        self._time_limits = MappingProxyType(dict(time_limits))
+        self._memory_limits = MappingProxyType(dict(memory_limits))
+
+    def __reduce__(self):
+        # The table is sent to pool workers with the command, but mapping proxies can't be pickled.
+        return LimitTable, (dict(self._time_limits), dict(self._memory_limits))
+
+    def get_time_limit(self, test_path: str, lang: str) -> int:
+        """
+        Returns time limit (in milliseconds) for given test and language.
+        """
+        return self._time_limits[(os.path.basename(test_path), lang)]
+
+    def get_memory_limit(self, test_path: str, lang: str) -> int:
+        """
+        Returns memory limit (in KB) for given test and language.
+        """
+        return self._memory_limits[(os.path.basename(test_path), lang)]
+
+
+def get_limit_table(tests: List[str], langs: Iterable[str], config: Dict[str, Any], task_id: str,
+                    args=None) -> LimitTable:
+    """
+    Computes time and memory limits for all tests and languages, the same way as `get_time_limit` and
+    `get_memory_limit`. Exits with error if any limit is invalid or not defined.
+    :param tests: Paths to tests.
+    :param langs: Languages of solutions.
+    :param config: Config of the package.
+    :param task_id: Task id.
+    :param args: Command arguments, `--tl` and `--ml` override limits from config.
+    """
+    tl_override = getattr(args, "tl", None) if args is not None else None
+    ml_override = getattr(args, "ml", None) if args is not None else None
+    str_config = util.stringify_keys(config)
+    allow_test_limit = _allow_test_limit(str_config)
+    time_limits = {}
+    memory_limits = {}
+    for lang in set(langs):
+        for test in tests:
+            key = (os.path.basename(test), lang)
+            if tl_override is not None:
+                time_limits[key] = tl_override * 1000
+            else:
+                time_limits[key] = _get_limit(LimitTypes.TIME_LIMIT, test, str_config, lang, task_id,
+                                              allow_test_limit)
+            if ml_override is not None:
+                memory_limits[key] = int(ml_override * 1024)
+            else:
+                memory_limits[key] = _get_limit(LimitTypes.MEMORY_LIMIT, test, str_config, lang, task_id,
+                                                allow_test_limit)
+    return LimitTable(time_limits, memory_limits)
+
+
 def get_in_tests_re(task_id: str) -> re.Pattern:
     return re.compile(r'^%s(([0-9]+)([a-z]?[a-z0-9]*))\.in$' % re.escape(task_id))
 
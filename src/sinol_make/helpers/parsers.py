@@ -47,5 +47,19 @@ def add_fsanitize_argument(parser: argparse.ArgumentParser):
 
 def add_time_tool_argument(parser: argparse.ArgumentParser):
     default_timetool = 'sio2jail' if sio2jail.sio2jail_supported() else 'time'
-    parser.add_argument('-T', '--time-tool', dest='time_tool', choices=['sio2jail', 'time'],
+    parser.add_argument('-T', '--time-tool', dest='time_tool', choices=['sio2jail', 'time', 'rusage', 'cgroup'],
                         help=f'tool to measure time and memory usage (default: {default_timetool})')
+
+
+def add_short_circuit_argument(parser: argparse.ArgumentParser):
+    parser.add_argument('--short-circuit', dest='short_circuit', action='store_true',
+                        help='skip the remaining tests of a group (or of the whole run, depending on contest type) '
+                             'once the score of a solution for it is decided. Status of a group is then the status '
+                             'of the first failed test instead of the worst one. Groups which weren\'t run '
+                             'at all aren\'t compared with expected scores.')
+
+
+def add_resume_argument(parser: argparse.ArgumentParser):
+    parser.add_argument('--resume', dest='resume', action='store_true',
+                        help='restore results of an interrupted run (for example killed or stopped with Ctrl-C '
+                             'before saving the cache) and run only the remaining executions')
@@ -39,3 +39,12 @@ def get_chkwer_path(*paths):
     Works the same as os.path.join. With no arguments, it returns the path to the chkwer directory.
     """
     return os.path.join(get_cache_path("chkwer"), *paths)
+
+
+def get_user_cache_path(*paths):
+    """
+    Function to get a path in the user-wide cache directory (`$XDG_CACHE_HOME/sinol-make`, by default
+    `~/.cache/sinol-make`), which is shared between packages. Works the same as os.path.join.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME", "") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "sinol-make", *paths)
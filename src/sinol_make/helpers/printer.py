@@ -1,7 +1,16 @@
+import re
 import curses
+import functools
+import threading
+import collections.abc
 
 from datetime import datetime, timedelta
 from curses import wrapper
+from typing import Any, Callable, Hashable, Tuple
+
+
+# Color escape sequences, as in `util.color_red`. The captured group is the code of the sequence.
+_ESCAPE_RE = re.compile(r'\033\[(\d\d)m')
 
 
 def printer(func, *args, **kwargs):
@@ -53,27 +62,39 @@ def _printer(stdscr, run_event, func, *args, **kwargs):
     stdscr.idlok(False)
     stdscr.erase()
     stdscr.refresh()
-    stdscr.nodelay(True)
+    # Wait for a key for at most 10 ms, so that the loop doesn't use a whole cpu.
+    stdscr.timeout(10)
     curses.init_pair(1, curses.COLOR_RED, -1)
     curses.init_pair(2, curses.COLOR_GREEN, -1)
     curses.init_pair(3, curses.COLOR_YELLOW, -1)
+    attributes = {
+        '00': curses.A_NORMAL,
+        '01': curses.A_BOLD,
+        '07': curses.A_REVERSE,
+        '90': curses.A_DIM,
+        '91': curses.color_pair(1),
+        '92': curses.color_pair(2),
+        '93': curses.color_pair(3),
+    }
 
     curr_row = 0
-    last_output = []
-    last_title = None
-    last_footer = None
+    # Segments drawn on each row of the screen, only rows which change are drawn again.
+    drawn_rows = {}
+    last_size = None
     output = ['']
     title = None
     footer = None
-    time = datetime.now()
+    time = None
     try:
         while run_event is None or run_event.is_set():
             inpt = stdscr.getch()
             height, width = stdscr.getmaxyx()
 
-            if datetime.now() - time > timedelta(seconds=0.1):
+            changed = False
+            if time is None or datetime.now() - time > timedelta(seconds=0.1):
                 time = datetime.now()
                 output, title, footer = func(width, height, *args, **kwargs)
+                changed = True
 
             visible_height = height
             if title is not None:
@@ -81,10 +102,9 @@ def _printer(stdscr, run_event, func, *args, **kwargs):
             if footer is not None:
                 visible_height -= 1
 
-            row_change = False
             if len(output) > height:
                 if inpt != curses.ERR:
-                    row_change = True
+                    changed = True
                     if inpt == curses.KEY_DOWN:
                         curr_row = min(curr_row + 1, len(output) - visible_height)
                     elif inpt == curses.KEY_UP:
@@ -98,92 +118,132 @@ def _printer(stdscr, run_event, func, *args, **kwargs):
                     elif inpt == curses.KEY_HOME:
                         curr_row = 0
                     else:
-                        row_change = False
+                        changed = False
 
-            if last_output[curr_row:curr_row + visible_height] != output[curr_row:curr_row + visible_height] \
-                    or row_change or last_title != title or last_footer != footer:
+            if last_size != (height, width):
+                last_size = (height, width)
+                drawn_rows = {}
                 stdscr.erase()
+                changed = True
+            if not changed:
+                continue
 
-                if title is not None:
-                    stdscr.addnstr(0, 0, title.ljust(width), width, curses.A_REVERSE)
-                _print_to_scr(stdscr, '\n'.join(output[curr_row:curr_row + visible_height]), title is not None)
-                if footer is not None:
-                    try:
-                        stdscr.addnstr(height - 1, 0, footer.ljust(width), width, curses.A_REVERSE)
-                    except curses.error:  # Curses raises error when trying to write in the lower right corner, but it can be ignored
-                        pass
-
-                stdscr.refresh()
-            last_output = output
-            last_title = title
-            last_footer = footer
+            rows = {}
+            first_row = 0
+            if title is not None:
+                rows[0] = ((title.ljust(width), '07'),)
+                first_row = 1
+            for i, line in enumerate(output[curr_row:curr_row + visible_height]):
+                rows[first_row + i] = split_styles(line)
+            if footer is not None:
+                rows[height - 1] = ((footer.ljust(width), '07'),)
+
+            for y in range(height):
+                segments = rows.get(y, ())
+                if drawn_rows.get(y, None) != segments:
+                    _draw_row(stdscr, y, width, segments, attributes)
+                    drawn_rows[y] = segments
+            stdscr.refresh()
     except KeyboardInterrupt:
         return
 
 
-def _print_to_scr(scr, output, has_title):
+@functools.lru_cache(maxsize=16384)
+def split_styles(line: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Splits a line with color escape sequences (as in `util.color_red`) into segments of text with the same style.
+    :return: Tuple of pairs (text, code of the escape sequence, for example '91' for red)
     """
-    Prints output to scr. Replaces color escape sequences with curses color escape sequences.
+    segments = []
+    code = '00'
+    parts = _ESCAPE_RE.split(line)
+    # `parts` alternates between text and codes of escape sequences.
+    for i, part in enumerate(parts):
+        if i % 2 == 1:
+            code = part
+        elif part != '':
+            segments.append((part, code))
+    return tuple(segments)
+
+
+def _draw_row(scr, y, width, segments, attributes):
     """
-    # `s` is the string that is currently being built,
-    # `x` and `y` are the coordinates of the next character to be printed,
-    # `new_x` and `new_y` are the coordinates of the next character to be processed,
-    # `color` is the curses color to be used for the current `s` string.
-    # The code iterates over the output string, and when it encounters a color escape sequence,
-    # it prints the current `s` string with the current `color` to the screen on coordinates `x`, `y`,
-    # and then resets `s`, `x`, `y` and `color`.
-
-    s = ""
-    y = 0
-    new_y = 0
-    if has_title:
-        y = 1
-        new_y = 1
+    Draws segments (as returned by `split_styles`) on row `y` of scr, replacing its previous content.
+    """
+    scr.move(y, 0)
+    scr.clrtoeol()
     x = 0
-    new_x = 0
-    color = curses.A_NORMAL
-    i = 0
-    while i < len(output):
-        if output[i] == '\033' and i + 4 < len(output):  # Escape sequence.
-            if output[i + 1:i + 5] == '[00m':  # Escape sequence for color reset.
-                scr.addstr(y, x, s, color)
-                s = ""
-                x = new_x
-                y = new_y
-                color = curses.A_NORMAL
-            else:
-                try:
-                    scr.addstr(y, x, s, color)
-                except curses.error:  # Curses raises error when trying to write in the lower right corner, but it can be ignored
-                    pass
-                s = ""
-                x = new_x
-                y = new_y
-
-                if output[i + 1:i + 5] == '[01m':  # Escape sequence for bold.
-                    color = curses.A_BOLD
-                elif output[i + 1:i + 5] == '[91m':  # Escape sequence for red.
-                    color = curses.color_pair(1)
-                elif output[i + 1:i + 5] == '[92m':  # Escape sequence for green.
-                    color = curses.color_pair(2)
-                elif output[i + 1:i + 5] == '[93m':  # Escape sequence for yellow.
-                    color = curses.color_pair(3)
-                elif output[i + 1:i + 5] == '[90m':  # Escape sequence for gray.
-                    color = curses.A_DIM
-                else:
-                    color = curses.A_NORMAL
-            i += 4  # Skip the escape sequence.
-        else:
-            s += output[i]
-            if output[i] == '\n':  # Go to the next line.
-                new_y += 1
-                new_x = 0
-            else:
-                new_x += 1
-
-        i += 1
+    for text, code in segments:
+        if x >= width:
+            break
+        try:
+            scr.addnstr(y, x, text, width - x, attributes.get(code, curses.A_NORMAL))
+        except curses.error:  # Curses raises error when trying to write in the lower right corner, but it can be ignored
+            pass
+        x += len(text)
 
-    try:
-        scr.addstr(y, x, s, color)
-    except curses.error:  # Curses raises error when trying to write in the lower right corner, but it can be ignored
-        pass
+
+class LazyLines(collections.abc.Sequence):
+    """
+    Lines of output which are rendered only when they are accessed,
+    so that the printer renders only lines visible on the screen.
+    """
+
+    def __init__(self, length: int, get_line: Callable[[int], str]):
+        self._length = length
+        self._get_line = get_line
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get_line(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("line index out of range")
+        return self._get_line(index)
+
+
+class CellCache:
+    """
+    Cache of rendered cells of a table. A cell is rendered again only after it is marked as dirty,
+    for example when results it shows have changed.
+    Cells are marked by the thread running the programs and rendered by the printer thread.
+    """
+
+    def __init__(self, render: Callable[[Hashable], Any]):
+        """
+        :param render: function called with a key of a cell, which returns the rendered cell
+        """
+        self._render = render
+        self._cells = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, key: Hashable):
+        with self._lock:
+            self._dirty.add(key)
+
+    def has_dirty(self) -> bool:
+        with self._lock:
+            return len(self._dirty) > 0
+
+    def clear(self):
+        with self._lock:
+            self._cells = {}
+            self._dirty = set()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            if key in self._dirty:
+                self._dirty.discard(key)
+                self._cells.pop(key, None)
+            elif key in self._cells:
+                return self._cells[key]
+        # The cell is rendered without the lock. If it is marked as dirty in the meantime, it will be rendered again.
+        cell = self._render(key)
+        with self._lock:
+            self._cells[key] = cell
+        return cell
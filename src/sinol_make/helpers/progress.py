@@ -0,0 +1,54 @@
+import time
+from typing import Union
+
+from sinol_make import util
+
+
+class ProgressReporter:
+    """
+    Prints progress of executions as single lines, at most once every `interval` seconds.
+    Used instead of the live table when output isn't a terminal (for example in CI logs),
+    so that long runs don't look stuck. The cost of an update doesn't depend on the size of the package.
+    """
+
+    def __init__(self, name: str, total: int, interval: float = 10.0):
+        """
+        :param name: Name of the executions, for example "tests" or "executions"
+        :param total: Number of executions
+        :param interval: Minimal time between printed lines in seconds
+        """
+        self.name = name
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.start_time = time.monotonic()
+        self.last_print = self.start_time
+
+    def update(self, failed: bool = False, total: Union[int, None] = None):
+        """
+        Records a finished execution and prints progress if enough time has passed since the last print.
+        :param failed: Whether the execution failed
+        :param total: New number of executions, if it has changed
+        """
+        self.done += 1
+        if failed:
+            self.failed += 1
+        if total is not None:
+            self.total = total
+        now = time.monotonic()
+        if now - self.last_print >= self.interval:
+            self.last_print = now
+            print(self.get_line(now), flush=True)
+
+    def get_line(self, now: Union[float, None] = None) -> str:
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - self.start_time
+        rate = self.done / elapsed if elapsed > 0 else 0
+        line = f"Done {self.done}/{self.total} {self.name}, {rate:.1f} {self.name}/s"
+        if rate > 0:
+            line += f", about {int((self.total - self.done) / rate)}s remaining"
+        if self.failed > 0:
+            line += ", " + util.error(f"{self.failed} failed")
+        return line
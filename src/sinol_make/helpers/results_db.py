@@ -0,0 +1,224 @@
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple, Union
+
+from sinol_make.helpers import paths
+
+
+# Version of the database schema. If it doesn't match the version of an existing database, the database is recreated.
+SCHEMA_VERSION = 4
+
+# Open connections of the current thread: {(pid, path to the database): connection}.
+# Connections can't be shared between threads or with forked processes.
+_local = threading.local()
+
+# Maximum number of values passed to a single query. Older SQLite versions allow at most 999 parameters.
+MAX_PARAMETERS = 500
+
+
+def get_db_path() -> str:
+    return paths.get_cache_path("results.db")
+
+
+def _create_schema(connection: sqlite3.Connection):
+    # Statements are executed one by one, as `executescript` would commit the transaction in which they are run.
+    for statement in [
+        "DROP TABLE IF EXISTS results",
+        "DROP TABLE IF EXISTS file_hashes",
+        "DROP TABLE IF EXISTS checker_verdicts",
+        # Results are keyed by the executable (see `CacheFile.results_key`), `solution` is the name
+        # of the solution which saved them last.
+        """CREATE TABLE results (
+            solution TEXT NOT NULL,
+            solution_md5 TEXT NOT NULL,
+            test_md5 TEXT NOT NULL,
+            time_limit INTEGER NOT NULL,
+            memory_limit INTEGER NOT NULL,
+            time_tool TEXT NOT NULL,
+            status TEXT NOT NULL,
+            time INTEGER,
+            memory INTEGER,
+            points INTEGER,
+            result TEXT NOT NULL,
+            PRIMARY KEY (solution_md5, test_md5)
+        )""",
+        "CREATE INDEX results_test ON results (test_md5)",
+        # md5sums of files, used by `hash_cache`.
+        """CREATE TABLE file_hashes (
+            device INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            ctime_ns INTEGER NOT NULL,
+            md5sum TEXT NOT NULL,
+            PRIMARY KEY (device, inode)
+        )""",
+        # Verdicts of checkers, used by `checker_cache`.
+        """CREATE TABLE checker_verdicts (
+            checker_md5 TEXT NOT NULL,
+            input_md5 TEXT NOT NULL,
+            output_md5 TEXT NOT NULL,
+            answer_md5 TEXT NOT NULL,
+            correct INTEGER NOT NULL,
+            points TEXT NOT NULL,
+            comment TEXT NOT NULL,
+            PRIMARY KEY (checker_md5, input_md5, output_md5, answer_md5)
+        )""",
+        f"PRAGMA user_version = {SCHEMA_VERSION}",
+    ]:
+        connection.execute(statement)
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Returns connection to the results database in the cache directory of the current package.
+    The database is created if it doesn't exist.
+    """
+    path = get_db_path()
+    key = (os.getpid(), path)
+    if not hasattr(_local, "connections"):
+        _local.connections = {}
+    connection = _local.connections.get(key, None)
+    if connection is not None and os.path.exists(path):
+        return connection
+    if connection is not None:
+        # The cache directory was removed, so the connection points to a deleted file.
+        connection.close()
+
+    # Many processes may access the database at once (for example pool workers), so wait for locks.
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    # The version is checked in a write transaction, so that only one connection creates the schema.
+    connection.execute("BEGIN IMMEDIATE")
+    with connection:
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            _create_schema(connection)
+    _local.connections[key] = connection
+    return connection
+
+
+def _in_clause(column: str, values: List[str]) -> str:
+    return f"{column} IN ({', '.join('?' * len(values))})"
+
+
+def _chunks(values: Union[Iterable[str], None]) -> List[Union[List[str], None]]:
+    """
+    Splits values into chunks, as SQLite limits the number of parameters in a query.
+    None (no filter) is kept as a single chunk.
+    """
+    if values is None:
+        return [None]
+    values = list(values)
+    return [values[i:i + MAX_PARAMETERS] for i in range(0, len(values), MAX_PARAMETERS)]
+
+
+def _row_to_dict(row) -> Dict:
+    return {
+        "time_limit": row[0],
+        "memory_limit": row[1],
+        "time_tool": row[2],
+        "result": json.loads(row[3]),
+    }
+
+
+def load_results(solution_md5: str, tests: Union[Iterable[str], None] = None) -> Dict[str, Dict]:
+    """
+    Loads cached results of a solution.
+    :param solution_md5: Key of the results of the solution (see `CacheFile.results_key`)
+    :param tests: md5sums of tests for which results are loaded. If None, all results are loaded.
+    :return: Dictionary: {"<md5sum of test>": <result as in `CacheTest.to_dict`>}
+    """
+    if tests is not None:
+        tests = list(tests)
+        if len(tests) == 0:
+            return {}
+    connection = get_connection()
+    query = "SELECT test_md5, time_limit, memory_limit, time_tool, result FROM results WHERE solution_md5 = ?"
+    if tests is None:
+        rows = connection.execute(query, (solution_md5,)).fetchall()
+    else:
+        rows = []
+        for chunk in _chunks(tests):
+            rows.extend(connection.execute(f"{query} AND {_in_clause('test_md5', chunk)}",
+                                           [solution_md5] + chunk).fetchall())
+    return {row[0]: _row_to_dict(row[1:]) for row in rows}
+
+
+def save_results(solution: str, solution_md5: str, results: Dict[str, Dict]):
+    """
+    Saves results of a solution. Existing results for the same tests are replaced, results for other tests are kept.
+    :param solution: Name of the solution
+    :param solution_md5: Key of the results of the solution (see `CacheFile.results_key`)
+    :param results: Dictionary: {"<md5sum of test>": <result as in `CacheTest.to_dict`>}
+    """
+    if len(results) == 0:
+        return
+    connection = get_connection()
+    with connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO results (solution, solution_md5, test_md5, time_limit, memory_limit, time_tool, "
+            "status, time, memory, points, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(solution, solution_md5, test_md5, result["time_limit"], result["memory_limit"], result["time_tool"],
+              result["result"]["Status"], result["result"]["Time"], result["result"]["Memory"],
+              result["result"]["Points"], json.dumps(result["result"]))
+             for test_md5, result in results.items()]
+        )
+
+
+def remove_results(solution_md5s: Union[List[str], None] = None, tests: Union[List[str], None] = None):
+    """
+    Removes cached results. With no arguments, all results are removed.
+    :param solution_md5s: If not None, only results with these keys (see `CacheFile.results_key`) are removed.
+    :param tests: If not None, only results for tests with these md5sums are removed.
+    """
+    if not os.path.exists(get_db_path()):
+        return
+    connection = get_connection()
+    with connection:
+        for solutions_chunk in _chunks(solution_md5s):
+            for tests_chunk in _chunks(tests):
+                conditions = []
+                params = []
+                for column, values in (("solution_md5", solutions_chunk), ("test_md5", tests_chunk)):
+                    if values is not None:
+                        conditions.append(_in_clause(column, values))
+                        params.extend(values)
+                query = "DELETE FROM results"
+                if conditions:
+                    query += " WHERE " + " AND ".join(conditions)
+                connection.execute(query, params)
+
+
+def query_results(solution_md5s: Union[List[str], None] = None, tests: Union[List[str], None] = None,
+                  statuses: Union[List[str], None] = None) -> List[Tuple[str, str, str, Dict]]:
+    """
+    Returns cached results matching the filters, sorted by solution.
+    :param solution_md5s: If not None, only results with these keys (see `CacheFile.results_key`) are returned.
+    :param tests: If not None, only results for tests with these md5sums are returned.
+    :param statuses: If not None, only results with these statuses are returned.
+    :return: List of tuples: (solution which saved the result, key of the result, md5sum of test,
+             result as in `CacheTest.to_dict`)
+    """
+    if not os.path.exists(get_db_path()):
+        return []
+    conditions = []
+    params = []
+    for column, values in (("solution_md5", solution_md5s), ("status", statuses)):
+        if values is not None:
+            values = list(values)
+            if len(values) == 0:
+                return []
+            conditions.append(_in_clause(column, values))
+            params.extend(values)
+    query = "SELECT solution, solution_md5, test_md5, time_limit, memory_limit, time_tool, result FROM results"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY solution, test_md5"
+    # There can be more tests than allowed query parameters, so they are filtered here.
+    tests = set(tests) if tests is not None else None
+    return [(row[0], row[1], row[2], _row_to_dict(row[3:]))
+            for row in get_connection().execute(query, params)
+            if tests is None or row[2] in tests]
@@ -0,0 +1,97 @@
+import os
+import time
+import shutil
+from typing import List, Tuple
+
+from sinol_make.helpers import paths
+
+
+# Directories of the user-wide cache: compiled executables (`object_store`) and inwer verdicts (`inwer_cache`).
+CACHE_DIRS = ["objects", "inwer"]
+
+# Entries not used for this many seconds are removed when the cache is pruned.
+MAX_AGE = 30 * 24 * 60 * 60
+
+# Maximum total size of entries in bytes. Least recently used entries are removed above it.
+MAX_SIZE = 2 * 1024 ** 3
+
+# How often (in seconds) the cache is pruned.
+PRUNE_INTERVAL = 24 * 60 * 60
+
+# File whose modification time is the time of the last pruning.
+PRUNE_STAMP = "last_prune"
+
+
+def touch(path: str):
+    """
+    Marks an entry as used, so that it isn't pruned. Failures are ignored, as the cache is only an optimization.
+    """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _get_entries() -> List[Tuple[float, int, str]]:
+    """
+    Returns a list of tuples (last use time, size, path) of all entries of the cache.
+    """
+    entries = []
+    for directory in CACHE_DIRS:
+        try:
+            with os.scandir(paths.get_user_cache_path(directory)) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return entries
+
+
+def prune(max_age: float = MAX_AGE, max_size: int = MAX_SIZE):
+    """
+    Removes entries not used for `max_age` seconds and then least recently used entries,
+    until their total size is at most `max_size` bytes.
+    """
+    now = time.time()
+    entries = sorted(_get_entries(), reverse=True)
+    total_size = 0
+    for last_use, size, path in entries:
+        if now - last_use > max_age or total_size + size > max_size:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        else:
+            total_size += size
+
+
+def maybe_prune():
+    """
+    Prunes the cache if it wasn't pruned in the last `PRUNE_INTERVAL` seconds.
+    """
+    stamp = paths.get_user_cache_path(PRUNE_STAMP)
+    try:
+        if time.time() - os.path.getmtime(stamp) < PRUNE_INTERVAL:
+            return
+    except OSError:
+        pass
+    try:
+        os.makedirs(paths.get_user_cache_path(), exist_ok=True)
+        with open(stamp, "w"):
+            pass
+    except OSError:
+        return
+    prune()
+
+
+def clean():
+    """
+    Removes all entries of the cache.
+    """
+    for directory in CACHE_DIRS:
+        shutil.rmtree(paths.get_user_cache_path(directory), ignore_errors=True)
@@ -4,7 +4,7 @@ from typing import Dict
 
 import yaml
 
-from sinol_make.helpers import paths
+from sinol_make.helpers import paths, results_db
 
 from sinol_make.structs.status_structs import ExecutionResult
 
@@ -36,6 +36,15 @@ class CacheTest:
             "result": self.result.to_dict()
         }
 
+    @staticmethod
+    def from_dict(dict) -> 'CacheTest':
+        return CacheTest(
+            time_limit=dict["time_limit"],
+            memory_limit=dict["memory_limit"],
+            time_tool=dict["time_tool"],
+            result=ExecutionResult.from_dict(dict["result"])
+        )
+
 
 @dataclass
 class CacheFile:
@@ -49,8 +58,13 @@ class CacheFile:
     sanitizers: bool
     # Test results
     tests: Dict[str, CacheTest]
+    # Key of the executable in the store of compiled executables
+    object_hash: str
+    # md5sum of code and data of the executable (see `elf.get_code_md5`)
+    executable_md5: str
 
-    def __init__(self, md5sum="", executable_path="", compilation_flags="default", sanitizers=False, tests=None):
+    def __init__(self, md5sum="", executable_path="", compilation_flags="default", sanitizers=False, tests=None,
+                 object_hash="", executable_md5=""):
         if tests is None:
             tests = {}
         self.md5sum = md5sum
@@ -58,6 +72,17 @@ class CacheFile:
         self.compilation_flags = compilation_flags
         self.sanitizers = sanitizers
         self.tests = tests
+        self.object_hash = object_hash
+        self.executable_md5 = executable_md5
+
+    @property
+    def results_key(self) -> str:
+        """
+        Key of test results in the results database. Results belong to the executable, so solutions
+        with the same code share them and they are kept when the solution is renamed or compiled again.
+        If the executable isn't known, md5sum of the solution is used.
+        """
+        return self.executable_md5 or self.md5sum
 
     def to_dict(self) -> Dict:
         return {
@@ -65,7 +90,9 @@ class CacheFile:
             "executable_path": self.executable_path,
             "compilation_flags": self.compilation_flags,
             "sanitizers": self.sanitizers,
-            "tests": {k: v.to_dict() for k, v in self.tests.items()}
+            "tests": {k: v.to_dict() for k, v in self.tests.items()},
+            "object_hash": self.object_hash,
+            "executable_md5": self.executable_md5,
         }
 
     @staticmethod
@@ -75,14 +102,20 @@ class CacheFile:
             executable_path=dict.get("executable_path", ""),
             compilation_flags=dict.get("compilation_flags", "default"),
             sanitizers=dict.get("sanitizers", False),
-            tests={k: CacheTest(
-                time_limit=v["time_limit"],
-                memory_limit=v["memory_limit"],
-                time_tool=v["time_tool"],
-                result=ExecutionResult.from_dict(v["result"])
-            ) for k, v in dict.get("tests", {}).items()}
+            tests={k: CacheTest.from_dict(v) for k, v in dict.get("tests", {}).items()},
+            object_hash=dict.get("object_hash", ""),
+            executable_md5=dict.get("executable_md5", ""),
         )
 
     def save(self, solution_path: str):
-        with open(paths.get_cache_path("md5sums", os.path.basename(solution_path)), 'w') as cache_file:
-            yaml.dump(self.to_dict(), cache_file)
+        """
+        Saves compilation info to `.cache/md5sums/<basename of solution_path>` and test results
+        to the results database. Cached results for tests which are not in `self.tests` are kept.
+        """
+        solution = os.path.basename(solution_path)
+        info = self.to_dict()
+        del info["tests"]
+        with open(paths.get_cache_path("md5sums", solution), 'w') as cache_file:
+            yaml.dump(info, cache_file)
+        if self.results_key != "":
+            results_db.save_results(solution, self.results_key, {k: v.to_dict() for k, v in self.tests.items()})
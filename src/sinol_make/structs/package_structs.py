@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PackageTest:
+    """
+    Represents an input test of the package, with its output file (if it exists).
+    """
+    # Filename of the input file, for example `abc1a.in`
+    name: str
+    # Group of the test, 0 for example tests
+    group: int
+    # Path to the input file, relative to the package directory
+    in_path: str
+    # Whether the output file exists
+    has_output: bool
+    # Size of the input file in bytes
+    size: int
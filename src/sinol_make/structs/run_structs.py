@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import List
 
 
 @dataclass
@@ -27,3 +28,14 @@ class PrintData:
     """
 
     i: int
+
+
+@dataclass
+class CpuLayout:
+    """
+    Represents assignment of cpus to pool workers and housekeeping tasks (checkers, compilation, printing).
+    """
+    # Cpu for each pool worker, every one on a different physical core
+    worker_cpus: List[int]
+    # Cpus used for everything else, on physical cores not used by workers
+    housekeeping_cpus: List[int]
@@ -5,6 +5,7 @@ from typing import List
 
 class Status(str, Enum):
     PENDING = "  "
+    SKIPPED = "--"
     CE = "CE"
     TL = "TL"
     ML = "ML"
@@ -34,12 +35,14 @@ class Status(str, Enum):
             return Status.OK
         elif status == "  ":
             return Status.PENDING
+        elif status == "--" or status == "SKIPPED":
+            return Status.SKIPPED
         else:
             raise ValueError(f"Unknown status: '{status}'")
 
     @staticmethod
     def possible_statuses():
-        return [Status.PENDING, Status.CE, Status.TL, Status.ML, Status.RE, Status.WA, Status.OK]
+        return [Status.PENDING, Status.SKIPPED, Status.CE, Status.TL, Status.ML, Status.RE, Status.WA, Status.OK]
 
 
 @dataclass
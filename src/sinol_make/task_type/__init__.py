@@ -1,12 +1,16 @@
 import os
+import json
 import subprocess
 from fractions import Fraction
 from typing import Tuple, List, Type
 
 from sinol_make import util
+from sinol_make.executors.cgroup import CgroupExecutor
+from sinol_make.executors.rusage import RusageExecutor
 from sinol_make.executors.sio2jail import Sio2jailExecutor
 from sinol_make.executors.time import TimeExecutor
-from sinol_make.helpers import package_util, paths, cache, oicompare
+from sinol_make.helpers import package_util, paths, cache, oicompare, affinity, checker_cache, comparators, \
+    batch_checker
 from sinol_make.helpers.classinit import RegisteredSubclassesBase
 from sinol_make.interfaces.Errors import CheckerException
 from sinol_make.structs.status_structs import ExecutionResult
@@ -54,20 +58,50 @@ class BaseTaskType(RegisteredSubclassesBase):
         with open(paths.get_cache_path("task_type"), "w") as f:
             f.write(name)
 
+    def _check_comparator_changed(self):
+        """
+        Checks if configuration of the comparator has changed and if so, deletes cache.
+        """
+        config = package_util.get_config_snapshot().config
+        # Dictionaries of the read-only config are serialized the same as plain ones.
+        comparator_config = json.dumps(config.get("sinol_comparator", None), sort_keys=True, default=dict)
+        if os.path.exists(paths.get_cache_path("comparator")):
+            with open(paths.get_cache_path("comparator"), "r") as f:
+                if f.read() != comparator_config:
+                    cache.remove_results_cache()
+        with open(paths.get_cache_path("comparator"), "w") as f:
+            f.write(comparator_config)
+
     def __init__(self, timetool, sio2jail_path):
         super().__init__()
         self.timetool = timetool
         self.sio2jail_path = sio2jail_path
         self.has_checker = False
         self.checker_path = None
+        # Checking if oicompare is installed starts a process, so it's done once, not for every output.
+        self.has_oicompare = oicompare.check_installed()
+        config = package_util.get_config_snapshot().config
+        # Built-in comparator configured in config.yml, used if there is no checker.
+        self.comparator = comparators.get_comparator(config)
+        # Whether the checker supports the batch protocol (see `batch_checker.BatchChecker`).
+        self.batch_checker = config.get("sinol_batch_checker", False)
+        # Whether outputs should be compared while solutions run (see `uses_online_check`)
+        # and whether they should be saved then.
+        self.online_check = False
+        self.keep_outputs = False
 
         if self.timetool == 'time':
             self.executor = TimeExecutor()
         elif self.timetool == 'sio2jail':
             self.executor = Sio2jailExecutor(sio2jail_path)
+        elif self.timetool == 'rusage':
+            self.executor = RusageExecutor()
+        elif self.timetool == 'cgroup':
+            self.executor = CgroupExecutor()
         else:
             util.exit_with_error(f"Unknown timetool {self.timetool}")
         self._check_task_type_changed()
+        self._check_comparator_changed()
 
     def _check_had_file(self, file, has_file):
         """
@@ -103,10 +137,19 @@ class BaseTaskType(RegisteredSubclassesBase):
             checker = checker[0]
             checker_basename = os.path.basename(checker)
             self.checker_path = paths.get_executables_path(checker_basename + ".e")
+            if self.comparator is not None:
+                print(util.warning(f"Both checker and `sinol_comparator` found, {checker_basename} will be used."))
             ret += [(checker, self.checker_path, "checker", True, True)]
         self._check_had_file("checker", self.has_checker)
         return ret
 
+    def uses_online_check(self) -> bool:
+        """
+        Whether outputs are compared with answers while solutions run, so that solutions are stopped
+        on their first wrong token and outputs aren't saved (unless `keep_outputs` is set).
+        """
+        return False
+
     @staticmethod
     def run_outgen() -> bool:
         """
@@ -146,14 +189,30 @@ class BaseTaskType(RegisteredSubclassesBase):
             return False, Fraction(0, 1), output[1].strip()
 
     def _run_checker(self, input_file_path, output_file_path, answer_file_path) -> Tuple[bool, Fraction, str]:
-        proc = subprocess.Popen([self.checker_path, input_file_path, output_file_path, answer_file_path],
-                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        proc.wait()
-        output, stderr = proc.communicate()
-        if proc.returncode > 2:
-            return False, Fraction(0, 1), (f"Checker returned with code {proc.returncode}, "
-                                           f"stderr: '{stderr.decode('utf-8')}'")
-        return self._parse_checker_output(output.decode('utf-8').split('\n'))
+        # Many solutions give the same outputs, so verdicts are cached.
+        key = checker_cache.get_key(self.checker_path, input_file_path, output_file_path, answer_file_path)
+        verdict = checker_cache.load_verdict(key)
+        if verdict is not None:
+            return verdict
+        output = None
+        if self.batch_checker:
+            output = batch_checker.get_pool(self.checker_path).check(input_file_path, output_file_path,
+                                                                     answer_file_path)
+        if output is None:
+            # The output is checked by a separate checker process also if the batch checker failed.
+            proc = subprocess.Popen([self.checker_path, input_file_path, output_file_path, answer_file_path],
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            affinity.move_to_housekeeping(proc.pid)
+            proc.wait()
+            output, stderr = proc.communicate()
+            if proc.returncode > 2:
+                # Verdicts of crashed checkers aren't cached.
+                return False, Fraction(0, 1), (f"Checker returned with code {proc.returncode}, "
+                                               f"stderr: '{stderr.decode('utf-8')}'")
+            output = output.decode('utf-8').split('\n')
+        verdict = self._parse_checker_output(output)
+        checker_cache.save_verdict(key, verdict)
+        return verdict
 
     def _run_diff(self, output_file_path, answer_file_path) -> Tuple[bool, Fraction, str]:
         same = oicompare.compare(output_file_path, answer_file_path)
@@ -166,6 +225,7 @@ class BaseTaskType(RegisteredSubclassesBase):
         path = oicompare.get_path()
         proc = subprocess.Popen([path, output_file_path, answer_file_path, 'english_abbreviated'],
                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        affinity.move_to_housekeeping(proc.pid)
         proc.wait()
         output, stderr = proc.communicate()
         if proc.returncode == 0:
@@ -181,18 +241,45 @@ class BaseTaskType(RegisteredSubclassesBase):
 
     def check_output(self, input_file_path, output_file_path, answer_file_path) -> Tuple[bool, Fraction, str]:
         """
-        Runs the checker (or runs diff) and returns a tuple of three values:
+        Runs the checker (or the comparator configured in config.yml, or diff) and returns a tuple of three values:
         - bool: whether the solution is correct
         - Fraction: percentage of the score
         - str: optional comment
         """
         if self.has_checker:
             return self._run_checker(input_file_path, output_file_path, answer_file_path)
-        elif oicompare.check_installed():
+        # Outputs of correct solutions are usually identical to the answers, which is checked without
+        # starting any process. oicompare is run only for wrong answers, as its comment describes the difference.
+        if oicompare.files_equal(output_file_path, answer_file_path):
+            return True, Fraction(100, 1), ""
+        if self.comparator is not None:
+            return self.comparator.check(output_file_path, answer_file_path)
+        correct, points, comment = self._run_diff(output_file_path, answer_file_path)
+        if not correct and self.has_oicompare:
             return self._run_oicompare(output_file_path, answer_file_path)
-        else:
-            return self._run_diff(output_file_path, answer_file_path)
+        return correct, points, comment
 
     def run(self, time_limit, hard_time_limit, memory_limit, input_file_path, output_file_path, answer_file_path,
             result_file_path, executable, execution_dir) -> ExecutionResult:
+        """
+        Runs the solution and checks its output.
+        """
+        result = self.execute(time_limit, hard_time_limit, memory_limit, input_file_path, output_file_path,
+                              answer_file_path, result_file_path, executable, execution_dir)
+        return self.check_result(result, input_file_path, output_file_path, answer_file_path)
+
+    def execute(self, time_limit, hard_time_limit, memory_limit, input_file_path, output_file_path, answer_file_path,
+                result_file_path, executable, execution_dir) -> ExecutionResult:
+        """
+        Runs the solution with limits, without checking its output (see `check_result`).
+        """
         raise NotImplementedError
+
+    def check_result(self, result: ExecutionResult, input_file_path, output_file_path,
+                     answer_file_path) -> ExecutionResult:
+        """
+        Checks output of an execution returned by `execute` and updates its result. It is called separately
+        from `execute`, so that checkers don't occupy cpus used for measuring solutions.
+        By default, the result is returned unchanged.
+        """
+        return result
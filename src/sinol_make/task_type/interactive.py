@@ -147,9 +147,9 @@ class InteractiveTaskType(BaseTaskType):
             result.Error = "Unexpected interactor error. Create an issue."
             result.Fail = True
 
-    def run(self, time_limit, hard_time_limit, memory_limit, input_file_path, output_file_path, answer_file_path,
-            result_file_path, executable, execution_dir) -> ExecutionResult:
-        config = package_util.get_config()
+    def execute(self, time_limit, hard_time_limit, memory_limit, input_file_path, output_file_path, answer_file_path,
+                result_file_path, executable, execution_dir) -> ExecutionResult:
+        config = package_util.get_config_snapshot().config
         num_processes = config.get('num_processes', 1)
         proc_pipes = []
 
@@ -176,7 +176,7 @@ class InteractiveTaskType(BaseTaskType):
         with open(input_file_path, "r") as inf, open(output_file_path, "w") as outf:
             interactor = self.ExecutionWrapper(
                 self.interactor_executor,
-                [f'"{self.interactor}"'] + interactor_args,
+                [self.interactor] + interactor_args,
                 time_limit * 2,
                 hard_time_limit * 2,
                 memory_limit,
@@ -193,7 +193,7 @@ class InteractiveTaskType(BaseTaskType):
                 pipes = proc_pipes[i]
                 proc = self.ExecutionWrapper(
                     self.executor,
-                    [f'"{executable}"', str(i)],
+                    [executable, str(i)],
                     time_limit,
                     hard_time_limit,
                     memory_limit,
@@ -1,5 +1,10 @@
+import contextlib
+import os
+from threading import Thread
 from typing import Tuple
 
+from sinol_make.executors import Cancellation
+from sinol_make.helpers import oicompare
 from sinol_make.interfaces.Errors import CheckerException
 from sinol_make.structs.status_structs import ExecutionResult, Status
 from sinol_make.task_type import BaseTaskType
@@ -14,16 +19,101 @@ class NormalTaskType(BaseTaskType):
     def name() -> str:
         return "normal"
 
-    def run(self, time_limit, hard_time_limit, memory_limit, input_file_path, output_file_path, answer_file_path,
-            result_file_path, executable, execution_dir) -> ExecutionResult:
+    class OnlineComparison(Thread):
+        """
+        Thread reading output of the solution from a pipe and comparing it with the answer while the solution runs.
+        On the first difference (or output past the end of the answer) the solution is killed with `cancellation`,
+        so that wrong solutions which keep computing don't run until the time limit.
+        """
+
+        def __init__(self, read_fd, answer_file_path, output_file_path, cancellation: Cancellation):
+            super().__init__()
+            self.read_fd = read_fd
+            self.cancellation = cancellation
+            self.answer_file_path = answer_file_path
+            # Output is saved to this file if it isn't None.
+            self.output_file_path = output_file_path
+            self.correct = False
+            self.comment = ""
+            # Whether a difference was found before the end of output, so the solution was killed.
+            self.mismatch = False
+            self.exception = None
+
+        def run(self):
+            try:
+                with os.fdopen(self.read_fd, "rb", buffering=0) as pipe, \
+                        open(self.answer_file_path, "rb") as answer_file, contextlib.ExitStack() as stack:
+                    output_file = None
+                    if self.output_file_path is not None:
+                        output_file = stack.enter_context(open(self.output_file_path, "wb"))
+                    comparator = oicompare.StreamComparator(oicompare.map_file(answer_file, stack))
+                    try:
+                        while chunk := pipe.read(oicompare.CHUNK_SIZE):
+                            if output_file is not None:
+                                output_file.write(chunk)
+                            if not comparator.feed(chunk):
+                                self.mismatch = True
+                                self.cancellation.cancel()
+                                break
+                        self.correct = comparator.finish()
+                        self.comment = comparator.comment or ""
+                    finally:
+                        comparator.close()
+            except Exception as e:
+                self.exception = e
+
+    def uses_online_check(self) -> bool:
+        # Checkers and comparators need whole outputs.
+        return self.online_check and not self.has_checker and self.comparator is None
+
+    def _execute_online(self, time_limit, hard_time_limit, memory_limit, input_file_path, output_file_path,
+                        answer_file_path, result_file_path, executable, execution_dir) -> ExecutionResult:
+        read_fd, write_fd = os.pipe()
+        cancellation = Cancellation()
+        comparison = self.OnlineComparison(read_fd, answer_file_path,
+                                           output_file_path if self.keep_outputs else None, cancellation)
+        comparison.start()
+        with open(input_file_path, "r") as inf:
+            result = self.executor.execute([executable], time_limit, hard_time_limit, memory_limit,
+                                           result_file_path, executable, execution_dir, stdin=inf, stdout=write_fd,
+                                           fds_to_close=[write_fd], cancellation=cancellation)
+        comparison.join()
+        if comparison.exception is not None:
+            raise comparison.exception
+        if result.Time > time_limit:
+            result.Status = Status.TL
+        elif result.Memory > memory_limit:
+            result.Status = Status.ML
+        elif result.Status == Status.OK or comparison.mismatch:
+            # Solutions killed after their output was found wrong get WA, as they would without the online check.
+            result.Points = 100.0 if comparison.correct else 0.0
+            result.Comment = comparison.comment
+            if not comparison.correct:
+                result.Status = Status.WA
+                result.Error = None
+        return result
+
+    def execute(self, time_limit, hard_time_limit, memory_limit, input_file_path, output_file_path, answer_file_path,
+                result_file_path, executable, execution_dir) -> ExecutionResult:
+        if self.uses_online_check():
+            return self._execute_online(time_limit, hard_time_limit, memory_limit, input_file_path,
+                                        output_file_path, answer_file_path, result_file_path, executable,
+                                        execution_dir)
         with open(input_file_path, "r") as inf, open(output_file_path, "w") as outf:
-            result = self.executor.execute([f'"{executable}"'], time_limit, hard_time_limit, memory_limit,
+            result = self.executor.execute([executable], time_limit, hard_time_limit, memory_limit,
                                            result_file_path, executable, execution_dir, stdin=inf, stdout=outf)
         if result.Time > time_limit:
             result.Status = Status.TL
         elif result.Memory > memory_limit:
             result.Status = Status.ML
-        elif result.Status == Status.OK:
+        return result
+
+    def check_result(self, result: ExecutionResult, input_file_path, output_file_path,
+                     answer_file_path) -> ExecutionResult:
+        if self.uses_online_check():
+            # Outputs were already compared during executions.
+            return result
+        if result.Status == Status.OK:
             try:
                 correct, points, comment = self.check_output(input_file_path, output_file_path, answer_file_path)
                 result.Points = float(points)
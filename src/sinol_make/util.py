@@ -2,14 +2,13 @@ import glob, importlib, os, sys, requests, yaml
 import math
 import platform
 import tarfile
-import hashlib
 import multiprocessing
 import resource
 from typing import Union
 from packaging.version import parse as parse_version
 
 from sinol_make.contest_types import get_contest_type
-from sinol_make.helpers import paths, cache
+from sinol_make.helpers import paths, cache, hash_cache
 from sinol_make.helpers.func_cache import cache_result
 from sinol_make.structs.status_structs import Status
 
@@ -91,6 +90,8 @@ def save_config(config):
         "title_en",
         "sinol_task_id",
         "sinol_contest_type",
+        "sinol_comparator",
+        "sinol_batch_checker",
         "sinol_latex_compiler",
         "sinol_static_tests",
         "sinol_undocumented_time_tool",
@@ -333,8 +334,14 @@ def is_macos_arm():
 
 
 def get_file_md5(path):
-    with open(path, "rb") as f:
-        return hashlib.md5(f.read()).hexdigest()
+    return hash_cache.get_file_md5(path)
+
+
+def get_files_md5(paths):
+    """
+    Returns md5sums of many files at once: {"<path>": "<md5sum>"}. Files which aren't cached are hashed in parallel.
+    """
+    return hash_cache.get_files_md5(paths)
 
 
 def try_fix_config(config):
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from sinol_make import configure_parsers
+from sinol_make.commands.cache import Command
+from sinol_make.commands.run import Command as RunCommand
+from sinol_make.helpers import paths
+from tests.commands.run.util import create_ins_outs
+from tests.fixtures import create_package
+from tests import util
+
+
+@pytest.mark.parametrize("create_package", [util.get_simple_package_path()], indirect=True)
+def test_query(capsys, create_package, time_tool):
+    """
+    Test `cache query` command.
+    """
+    create_ins_outs(create_package)
+    parser = configure_parsers()
+    command = Command()
+
+    args = parser.parse_args(["cache", "query"])
+    command.run(args)
+    assert "No cached results found." in capsys.readouterr().out
+
+    args = parser.parse_args(["run", "--time-tool", time_tool, "-s", "prog/abc.cpp", "prog/abc1.cpp"])
+    RunCommand().run(args)
+    capsys.readouterr()
+
+    args = parser.parse_args(["cache", "query", "-s", "prog/abc.cpp", "-t", "in/abc1a.in"])
+    command.run(args)
+    out = capsys.readouterr().out
+    lines = out.strip().splitlines()
+    assert len(lines) == 2
+    assert "abc.cpp" in lines[1] and "abc1a.in" in lines[1] and time_tool in lines[1]
+
+    args = parser.parse_args(["cache", "query", "--status", "WA"])
+    command.run(args)
+    out = capsys.readouterr().out
+    assert "abc.cpp" not in out
+    assert "abc1.cpp" in out
+
+
+def test_clean(capsys):
+    """
+    Test `cache clean` command.
+    """
+    object_path = paths.get_user_cache_path("objects", "object")
+    os.makedirs(os.path.dirname(object_path))
+    with open(object_path, "w") as f:
+        f.write("executable")
+
+    parser = configure_parsers()
+    Command().run(parser.parse_args(["cache", "clean"]))
+    assert "Removed the cache shared between packages." in capsys.readouterr().out
+    assert not os.path.exists(object_path)
@@ -1,5 +1,7 @@
 from sinol_make import configure_parsers
+from sinol_make import util as sm_util
 from sinol_make.commands.chkwer import Command
+from sinol_make.helpers import package_util
 from tests import util
 from tests.fixtures import *
 
@@ -44,3 +46,16 @@ def test_broken_model_solution(create_package, capsys):
         run()
     out = capsys.readouterr().out
     assert "Model solution didn't score maximum points." in out
+
+
+@pytest.mark.parametrize("create_package", [util.get_simple_package_path()], indirect=True)
+def test_comparator(create_package, capsys):
+    """
+    Test `chkwer` command on a package without a checker, but with a comparator configured in config.yml.
+    """
+    config = package_util.get_config()
+    config["sinol_comparator"] = "token_case_insensitive"
+    sm_util.save_config(config)
+    run()
+    out = capsys.readouterr().out
+    assert "Checker verification successful." in out
@@ -142,3 +142,30 @@ def test_fsanitize(create_package):
             command.run(args)
         assert e.type == SystemExit
         assert e.value.code == 1
+
+
+@pytest.mark.parametrize("create_package", [util.get_inwer_package_path()], indirect=True)
+def test_cached_verdicts(capsys, create_package, monkeypatch, tmp_path):
+    """
+    Test if tests verified by the same inwer aren't verified again.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    package_path = create_package
+    task_id = package_util.get_task_id()
+    util.create_ins(package_path, task_id)
+    parser = configure_parsers()
+    args = parser.parse_args(["inwer", "prog/werinwer2.cpp"])
+    with pytest.raises(SystemExit):
+        Command().run(args)
+    assert "Using cached verdicts" not in capsys.readouterr().out
+
+    def verify_tests(self, executions):
+        assert len(executions) == 0
+        yield from []
+
+    monkeypatch.setattr(Command, "verify_tests", verify_tests)
+    with pytest.raises(SystemExit):
+        Command().run(args)
+    out = capsys.readouterr().out
+    assert "Using cached verdicts" in out
+    assert "Verification failed for tests: wer2a.in" in out
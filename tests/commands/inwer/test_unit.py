@@ -1,5 +1,8 @@
 import argparse
 import re
+import sys
+import time
+import subprocess
 
 from ...fixtures import *
 from ... import util
@@ -111,3 +114,114 @@ def test_verify_tests_order():
     command.tests.remove("abc0a.in")
     with pytest.raises(SystemExit):
         command.verify_tests_order()
+
+
+# Inwer checking that the test has a single positive number. Supports the batch protocol if `batch` is True.
+BATCH_INWER = """#!{python}
+import sys
+import time
+
+def verify(name, test):
+    number = int(test.read())
+    if number == 0:
+        sys.exit(3)
+    return (0, ["OK", name]) if number > 0 else (1, ["ERROR", "negative"])
+
+if sys.argv[1:] == ["--batch"] and {batch}:
+    print("BATCH", flush=True)
+    while True:
+        name = sys.stdin.readline().strip()
+        if not name:
+            break
+        if "hang" in name:
+            time.sleep(60)
+        with open(sys.stdin.readline().strip()) as test:
+            code, lines = verify(name, test)
+        print(code, len(lines))
+        print("\\n".join(lines), flush=True)
+else:
+    code, lines = verify(sys.argv[1], sys.stdin)
+    print("\\n".join(lines))
+    sys.exit(code)
+"""
+
+
+@pytest.mark.parametrize("batch", [True, False])
+def test_batch_inwer(batch):
+    """
+    Test verifying tests with an inwer supporting the batch protocol and fallback to separate processes.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        inwer_path = os.path.join(tmpdir, "inwer")
+        with open(inwer_path, "w") as f:
+            f.write(BATCH_INWER.format(python=sys.executable, batch=batch))
+        os.chmod(inwer_path, 0o755)
+        assert inwer_util.supports_batch(inwer_path) == batch
+
+        executions = []
+        for name, number in [("abc1a.in", 1), ("abc1b.in", -1), ("abc1c.in", 0), ("abc1d.in", 2)]:
+            with open(name, "w") as f:
+                f.write(f"{number}\n")
+            executions.append(InwerExecution(os.path.join(tmpdir, name), name, inwer_path))
+        command = Command()
+        command.cpus = 2
+        command.inwer_executable = inwer_path
+        results = list(command.verify_tests(executions))
+        assert [result.test_path for result in results] == [execution.test_path for execution in executions]
+        assert [result.valid for result in results] == [True, False, False, True]
+        assert results[0].output == "OK\nabc1a.in\n"
+        assert results[1].output == "ERROR\nnegative\n"
+
+
+def _write_batch_inwer(tmpdir, batch=True):
+    inwer_path = os.path.join(tmpdir, "inwer")
+    with open(inwer_path, "w") as f:
+        f.write(BATCH_INWER.format(python=sys.executable, batch=batch))
+    os.chmod(inwer_path, 0o755)
+    return inwer_path
+
+
+def test_batch_inwer_timeout(monkeypatch):
+    """
+    Test if a batch inwer which stops replying is killed and the test is verified by a separate process.
+    """
+    monkeypatch.setattr(inwer_util.BatchInwer, "TIMEOUT", 1)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        inwer_path = _write_batch_inwer(tmpdir)
+        executions = []
+        for name, number in [("abc1a.in", 1), ("abc1hang.in", 2), ("abc1c.in", -1)]:
+            with open(name, "w") as f:
+                f.write(f"{number}\n")
+            executions.append(InwerExecution(os.path.join(tmpdir, name), name, inwer_path))
+        command = Command()
+        command.cpus = 1
+        command.inwer_executable = inwer_path
+        start = time.time()
+        results = list(command.verify_tests(executions))
+        assert time.time() - start < 10
+        assert [result.valid for result in results] == [True, True, False]
+        assert results[1].output == "OK\nabc1hang.in\n"
+
+
+def test_supports_batch_cached(monkeypatch):
+    """
+    Test if the inwer isn't started again to check if it supports the batch protocol.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        inwer_path = _write_batch_inwer(tmpdir)
+        assert inwer_util.supports_batch(inwer_path)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Inwer was started again")
+
+        monkeypatch.setattr(subprocess, "run", fail)
+        assert inwer_util.supports_batch(inwer_path)
+        monkeypatch.undo()
+
+        # Changed inwer is checked again.
+        with open(inwer_path, "w") as f:
+            f.write(BATCH_INWER.format(python=sys.executable, batch=False))
+        assert not inwer_util.supports_batch(inwer_path)
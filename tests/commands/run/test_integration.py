@@ -1,11 +1,15 @@
 import copy
 import sys
 import time
+import signal
 import pytest
 import copy
+from concurrent.futures import ThreadPoolExecutor
 
+from sinol_make.executors.cgroup import CgroupExecutor
 from sinol_make.helpers import cache
 from sinol_make.structs.cache_structs import CacheFile
+from sinol_make.structs.status_structs import Status
 from ...fixtures import *
 from .util import *
 from sinol_make import configure_parsers, util, sio2jail
@@ -680,7 +684,8 @@ def test_results_caching_checker_changed(create_package, time_tool):
         f.write("// Changed checker source code.\n" + checker_source)
 
     # Compile checker check if test results are removed.
-    command.compile_additional_files()
+    with ThreadPoolExecutor(1) as compile_pool:
+        command.wait_for_additional_compilations(command.start_additional_compilations(compile_pool))
     task_id = package_util.get_task_id()
     solutions = package_util.get_solutions(task_id, None)
     for solution in solutions:
@@ -767,6 +772,113 @@ def test_contest_type_change(create_package, time_tool):
         assert cache_file.tests == {}
 
 
+@pytest.mark.parametrize("create_package", [get_simple_package_path()], indirect=True)
+def test_comparator_change(create_package, time_tool):
+    """
+    Test if solutions are checked with the comparator from config.yml and if after changing it,
+    all cached test results are removed.
+    """
+    package_path = create_package
+    create_ins_outs(package_path)
+    config_path = os.path.join(os.getcwd(), "config.yml")
+    with open(config_path, "r") as f:
+        config = yaml.load(f, Loader=yaml.SafeLoader)
+    config["sinol_comparator"] = "token_case_insensitive"
+    with open(config_path, "w") as f:
+        f.write(yaml.dump(config))
+    parser = configure_parsers()
+    args = parser.parse_args(["run", "--time-tool", time_tool])
+    command = Command()
+
+    # First run to cache test results. Expected scores are the same as without the comparator.
+    command.run(args)
+
+    config["sinol_comparator"] = {"type": "float", "abs_eps": 0.5}
+    with open(config_path, "w") as f:
+        f.write(yaml.dump(config))
+    command = Command()
+    # We remove tests, so that `run()` exits before creating new cached test results.
+    for test in glob.glob("in/*.in"):
+        os.unlink(test)
+    with pytest.raises(SystemExit):
+        command.run(args)
+
+    task_id = package_util.get_task_id()
+    solutions = package_util.get_solutions(task_id, None)
+    for solution in solutions:
+        cache_file: CacheFile = cache.get_cache_file(solution)
+        assert cache_file.tests == {}
+
+
+@pytest.mark.parametrize("create_package", [get_simple_package_path(), get_large_output_package_path()],
+                         indirect=True)
+def test_online_check(create_package, time_tool):
+    """
+    Test if with `--online-check` the results are the same and outputs aren't saved, unless `--keep-outputs` is set.
+    """
+    package_path = create_package
+    create_ins_outs(package_path)
+    with open(os.path.join(os.getcwd(), "config.yml"), "r") as config_file:
+        expected_scores = yaml.load(config_file, Loader=yaml.SafeLoader)["sinol_expected_scores"]
+
+    parser = configure_parsers()
+    command = Command()
+    command.run(parser.parse_args(["run", "--time-tool", time_tool, "--online-check"]))
+    with open(os.path.join(os.getcwd(), "config.yml"), "r") as config_file:
+        assert yaml.load(config_file, Loader=yaml.SafeLoader)["sinol_expected_scores"] == expected_scores
+    assert glob.glob(paths.get_executions_path("*", "*.out")) == []
+
+    cache.remove_results_cache()
+    command = Command()
+    command.run(parser.parse_args(["run", "--time-tool", time_tool, "--online-check", "--keep-outputs"]))
+    assert glob.glob(paths.get_executions_path("*", "*.out")) != []
+
+
+@pytest.mark.parametrize("create_package", [get_large_output_package_path()], indirect=True)
+def test_online_check_broken_pipe(create_package, time_tool):
+    """
+    Test if with `--online-check` a Python solution, which exits with an error after its output is found wrong
+    and the pipe is closed, gets WA.
+    """
+    package_path = create_package
+    create_ins_outs(package_path)
+    with open(os.path.join("prog", "lou2.py"), "w") as f:
+        f.write("import sys\nfor _ in range(1 << 12):\n    sys.stdout.write('y\\n' * 256)\n")
+
+    parser = configure_parsers()
+    command = Command()
+    command.run(parser.parse_args(["run", "--time-tool", time_tool, "--online-check", "--solutions", "prog/lou2.py",
+                                         "--apply-suggestions"]))
+    cache_file: CacheFile = cache.get_cache_file("lou2.py")
+    assert [test.result.Status for test in cache_file.tests.values()] == [Status.WA]
+
+
+@pytest.mark.parametrize("create_package", [get_large_output_package_path()], indirect=True)
+def test_online_check_stops_solution(create_package, time_tool):
+    """
+    Test if with `--online-check` solutions which keep running after writing a wrong token (sleeping or computing)
+    are stopped right away, not after the time limit.
+    """
+    package_path = create_package
+    create_ins_outs(package_path)
+    with open(os.path.join("prog", "lou2.py"), "w") as f:
+        f.write("import sys, time\nsys.stdout.write('x\\n')\nsys.stdout.flush()\ntime.sleep(60)\n")
+    with open(os.path.join("prog", "lou3.py"), "w") as f:
+        f.write("import sys\nsys.stdout.write('x\\n')\nsys.stdout.flush()\nwhile True:\n    pass\n")
+
+    parser = configure_parsers()
+    command = Command()
+    start = time.time()
+    command.run(parser.parse_args(["run", "--time-tool", time_tool, "--online-check", "--solutions", "prog/lou2.py",
+                                   "prog/lou3.py", "--apply-suggestions"]))
+    # Time limit of the package is 2 seconds, so solutions running until the hard time limit would take
+    # at least 4 seconds.
+    assert time.time() - start < 4
+    for solution in ["lou2.py", "lou3.py"]:
+        cache_file: CacheFile = cache.get_cache_file(solution)
+        assert [test.result.Status for test in cache_file.tests.values()] == [Status.WA]
+
+
 @pytest.mark.parametrize("create_package", [get_simple_package_path()], indirect=True)
 def test_cwd_in_prog(create_package, time_tool):
     """
@@ -875,3 +987,118 @@ def test_interactive(create_package, time_tool, capsys):
     out = capsys.readouterr().out
     for comment in comments:
         assert comment not in out, f"Comment {comment} found in output."
+
+
+@pytest.mark.parametrize("create_package", [get_simple_package_path()], indirect=True)
+def test_cgroup_time_tool(create_package, capsys):
+    """
+    Test running with `cgroup` time tool. If cgroups are not delegated, `rusage` should be used instead.
+    """
+    if not util.is_linux():
+        pytest.skip("cgroup time tool is supported only on Linux.")
+    package_path = create_package
+    create_ins_outs(package_path)
+    parser = configure_parsers()
+    args = parser.parse_args(["run", "--time-tool", "cgroup"])
+    command = Command()
+    command.run(args)
+
+    out = capsys.readouterr().out
+    if CgroupExecutor.prepare() is None:
+        assert "falling back to `rusage`" in out
+        assert command.timetool_name == "rusage"
+    else:
+        assert command.timetool_name == "cgroup"
+        # Solutions terminated by a signal should get RE with the signal number.
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = CgroupExecutor().execute(["/bin/sh", "-c", "kill -SEGV $$"], 1000, 1, 32 * 2 ** 10,
+                                              os.path.join(tmpdir, "result"), "/bin/sh", tmpdir)
+        assert result.Status == Status.RE
+        assert result.ExitSignal == signal.SIGSEGV
+        assert result.Error == f"Solution was terminated by signal {int(signal.SIGSEGV)}"
+
+
+@pytest.mark.parametrize("create_package", [get_simple_package_path(), get_icpc_package_path()], indirect=True)
+def test_short_circuit(create_package, time_tool, capsys):
+    """
+    Test `--short-circuit` flag. Expected scores should still be correct and skipped results shouldn't be cached.
+    """
+    package_path = create_package
+    create_ins_outs(package_path)
+    parser = configure_parsers()
+    args = parser.parse_args(["run", "--short-circuit", "--time-tool", time_tool])
+    command = Command()
+    command.run(args)
+    out = capsys.readouterr().out
+    assert "Expected scores are correct!" in out
+
+    task_id = package_util.get_task_id()
+    for solution in package_util.get_solutions(task_id):
+        cache_file: CacheFile = cache.get_cache_file(solution)
+        for test in cache_file.tests.values():
+            assert test.result.Status != Status.SKIPPED
+
+
+@pytest.mark.parametrize("create_package", [get_simple_package_path()], indirect=True)
+def test_resume(create_package, time_tool, monkeypatch):
+    """
+    Test `--resume` flag. Results of a run killed before saving cache files should be restored from the journal.
+    """
+    package_path = create_package
+    create_ins_outs(package_path)
+    parser = configure_parsers()
+    args = parser.parse_args(["run", "--time-tool", time_tool])
+
+    # Simulate sinol-make being killed after running all solutions, but before saving cache files.
+    def killed(cache_files):
+        raise KeyboardInterrupt()
+    with monkeypatch.context() as m:
+        m.setattr(cache, "merge_journal", killed)
+        with pytest.raises(KeyboardInterrupt):
+            Command().run(args)
+    assert cache.journal_exists()
+    task_id = package_util.get_task_id()
+    for solution in package_util.get_solutions(task_id):
+        assert cache.get_cache_file(solution).tests == {}
+
+    def execute_solution(self, data_for_execution):
+        raise AssertionError(f"Execution {data_for_execution} should be restored from the journal.")
+    with monkeypatch.context() as m:
+        m.setattr(Command, "execute_solution", execute_solution)
+        args = parser.parse_args(["run", "--resume", "--time-tool", time_tool])
+        Command().run(args)
+    assert not cache.journal_exists()
+    for solution in package_util.get_solutions(task_id):
+        assert cache.get_cache_file(solution).tests != {}
+
+
+@pytest.mark.parametrize("create_package", [get_simple_package_path()], indirect=True)
+def test_duplicate_executables(create_package, time_tool, capsys):
+    """
+    Test if solutions with the same code (copies or sources differing only in comments) are run once
+    and their results are used for all of them.
+    """
+    package_path = create_package
+    create_ins_outs(package_path)
+    with open(os.path.join(package_path, "prog", "abc.cpp"), "r") as f:
+        source = f.read()
+    shutil.copy(os.path.join(package_path, "prog", "abc.cpp"), os.path.join(package_path, "prog", "abcs1.cpp"))
+    with open(os.path.join(package_path, "prog", "abcs2.cpp"), "w") as f:
+        f.write("// Copy of abc.cpp with a comment.\n" + source)
+    parser = configure_parsers()
+    args = parser.parse_args(["run", "--solutions", "prog/abc.cpp", "prog/abcs1.cpp", "prog/abcs2.cpp",
+                              "--apply-suggestions", "--time-tool", time_tool])
+    command = Command()
+    command.run(args)
+    out = capsys.readouterr().out
+    notes = [line for line in out.splitlines() if "has the same code as" in line]
+    assert len(notes) == 2
+    assert all("abc.cpp" in note for note in notes)
+    assert any("abcs1.cpp" in note for note in notes) and any("abcs2.cpp" in note for note in notes)
+
+    cache_file: CacheFile = cache.get_cache_file("abc.cpp")
+    assert len(cache_file.tests) == len(command.tests)
+    for duplicate in ["abcs1.cpp", "abcs2.cpp"]:
+        duplicate_cache_file: CacheFile = cache.get_cache_file(duplicate)
+        assert {md5sum: test.result.Status for md5sum, test in cache_file.tests.items()} == \
+               {md5sum: test.result.Status for md5sum, test in duplicate_cache_file.tests.items()}
@@ -1,8 +1,9 @@
-import argparse, re, yaml
+import argparse, re, threading, yaml
 
 from sinol_make import util, sio2jail
-from sinol_make.structs.status_structs import Status, ResultChange, ValidationResult
-from sinol_make.helpers import package_util
+from sinol_make.structs.status_structs import Status, ResultChange, ValidationResult, ExecutionResult
+from sinol_make.helpers import package_util, affinity
+from sinol_make.structs.run_structs import CpuLayout
 from sinol_make.task_type.normal import NormalTaskType
 
 from .util import *
@@ -15,11 +16,11 @@ def test_get_output_file():
     assert package_util.get_out_from_in("in/abc1a.in") == "out/abc1a.out"
 
 
-def test_compile_solutions(create_package):
+def test_compile(create_package):
     package_path = create_package
     command = get_command(package_path)
     solutions = package_util.get_solutions("abc", None)
-    result = command.compile_solutions(solutions)
+    result = [command.compile(solution, None, True) for solution in solutions]
     assert result == [True for _ in solutions]
 
 
@@ -31,8 +32,7 @@ def test_execution(create_package, time_tool):
     command.task_type = NormalTaskType(timetool=time_tool, sio2jail_path=sio2jail.get_default_sio2jail_path())
     solution = "abc.cpp"
     executable = package_util.get_executable(solution)
-    result = command.compile_solutions([solution])
-    assert result == [True]
+    assert command.compile(solution, None, True)
 
     create_ins_outs(package_path)
     test = package_util.get_tests("abc", None)[0]
@@ -46,6 +46,31 @@ def test_execution(create_package, time_tool):
     assert result.Status == Status.OK
 
 
+def test_execute_and_check_solution(create_package, time_tool):
+    """
+    Test if output of an execution is checked separately from the execution.
+    """
+    package_path = create_package
+    command = get_command(package_path)
+    command.args.time_tool = time_tool
+    command.timetool_name = time_tool
+    command.task_type = NormalTaskType(timetool=time_tool, sio2jail_path=sio2jail.get_default_sio2jail_path())
+    solution = "abc1.cpp"
+    assert command.compile(solution, None, True)
+    create_ins_outs(package_path)
+    # abc1.cpp gives wrong answers on tests from group 4.
+    test = package_util.get_tests("abc", ["in/abc4a.in"])[0]
+
+    os.makedirs(paths.get_executions_path(solution), exist_ok=True)
+    execution = (solution, paths.get_executables_path(package_util.get_executable(solution)), test,
+                 command.config['time_limit'], command.config['memory_limit'],
+                 sio2jail.get_default_sio2jail_path(), paths.get_executions_path())
+    result = command.execute_solution(execution)
+    assert result.Status == Status.OK
+    result = command.check_solution(execution, result)
+    assert result.Status == Status.WA
+
+
 def test_run_solutions(create_package, time_tool):
     package_path = create_package
     command = get_command(package_path)
@@ -54,6 +79,7 @@ def test_run_solutions(create_package, time_tool):
     create_ins_outs(package_path)
     command.tests = package_util.get_tests("abc", None)
     command.test_md5sums = {os.path.basename(test): util.get_file_md5(test) for test in command.tests}
+    command.limits = package_util.get_limit_table(command.tests, ["cpp"], command.config, "abc", command.args)
     command.groups = list(sorted(set([command.get_group(test) for test in command.tests])))
     command.scores = command.config["scores"]
     command.possible_score = command.get_possible_score(command.groups)
@@ -76,6 +102,113 @@ def test_run_solutions(create_package, time_tool):
     }
 
 
+def test_compilation_error_in_pipeline(create_package, time_tool):
+    """
+    Test if solutions which failed to compile are shown as CE, while other solutions are run.
+    """
+    package_path = create_package
+    command = get_command(package_path)
+    command.args = argparse.Namespace(solutions_report=False, time_tool=time_tool, compile_mode='default',
+                                      hide_memory=False)
+    create_ins_outs(package_path)
+    with open(os.path.join(package_path, "prog", "abcb9.cpp"), "w") as f:
+        f.write("int main() { this is not c++ }")
+    command.tests = package_util.get_tests("abc", None)
+    command.test_md5sums = {os.path.basename(test): util.get_file_md5(test) for test in command.tests}
+    command.limits = package_util.get_limit_table(command.tests, ["cpp"], command.config, "abc", command.args)
+    command.groups = list(sorted(set([command.get_group(test) for test in command.tests])))
+    command.scores = command.config["scores"]
+    command.possible_score = command.get_possible_score(command.groups)
+    command.timetool_path = sio2jail.get_default_sio2jail_path()
+    command.timetool_name = time_tool
+    command.task_type = NormalTaskType(timetool=time_tool, sio2jail_path=sio2jail.get_default_sio2jail_path())
+
+    results, all_results = command.compile_and_run(["abcb9.cpp", "abc.cpp"])
+    assert command.failed_compilations == ["abcb9.cpp"]
+    assert all(result["status"] == Status.CE for result in results["abcb9.cpp"].values())
+    assert all(result["status"] == Status.OK for result in results["abc.cpp"].values())
+
+
+def test_compilation_pinned_to_housekeeping_cpus(create_package, time_tool, monkeypatch):
+    """
+    Test if with pinned workers solutions are compiled only by threads pinned to the housekeeping cpus.
+    """
+    package_path = create_package
+    command = get_command(package_path)
+    command.args = argparse.Namespace(solutions_report=False, time_tool=time_tool, compile_mode='default',
+                                      hide_memory=False)
+    create_ins_outs(package_path)
+    command.tests = package_util.get_tests("abc", None)
+    command.test_md5sums = {os.path.basename(test): util.get_file_md5(test) for test in command.tests}
+    command.limits = package_util.get_limit_table(command.tests, ["cpp"], command.config, "abc", command.args)
+    command.groups = list(sorted(set([command.get_group(test) for test in command.tests])))
+    command.scores = command.config["scores"]
+    command.possible_score = command.get_possible_score(command.groups)
+    command.timetool_path = sio2jail.get_default_sio2jail_path()
+    command.timetool_name = time_tool
+    command.task_type = NormalTaskType(timetool=time_tool, sio2jail_path=sio2jail.get_default_sio2jail_path())
+
+    cpu = min(os.sched_getaffinity(0))
+    monkeypatch.setattr(affinity, "get_layout", lambda workers: CpuLayout(worker_cpus=[cpu] * workers,
+                                                                          housekeeping_cpus=[cpu]))
+    pinned_threads = set()
+    compiling_threads = set()
+    pin_current_thread = affinity.pin_current_thread
+    compile = Command.compile
+
+    def pin(cpus):
+        pinned_threads.add(threading.get_ident())
+        pin_current_thread(cpus)
+
+    def compile_and_record(self, *args, **kwargs):
+        compiling_threads.add(threading.get_ident())
+        return compile(self, *args, **kwargs)
+
+    monkeypatch.setattr(affinity, "pin_current_thread", pin)
+    monkeypatch.setattr(Command, "compile", compile_and_record)
+    command.compile_and_run(["abc.cpp", "abc1.cpp"])
+    assert compiling_threads != set()
+    assert compiling_threads <= pinned_threads
+
+
+def test_get_compilation_threads(create_package, monkeypatch):
+    """
+    Test if solutions are compiled only on cpus not used by the workers measuring solutions.
+    """
+    package_path = create_package
+    command = get_command(package_path)
+    command.cpus = 4
+    assert command.get_compilation_threads(CpuLayout(worker_cpus=[0, 2, 4, 6], housekeeping_cpus=[8, 9])) == 2
+    monkeypatch.setattr(os, "cpu_count", lambda: 16)
+    assert command.get_compilation_threads(None) == 12
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    assert command.get_compilation_threads(None) == 1
+
+
+def test_get_cpu_layout(create_package, monkeypatch):
+    """
+    Test if the default number of workers is lowered to the number of physical cores which can be pinned,
+    while a number of workers given with `--cpus` disables pinning.
+    """
+    package_path = create_package
+    command = get_command(package_path)
+    layout = CpuLayout(worker_cpus=[0, 1, 2], housekeeping_cpus=[3, 7])
+    monkeypatch.setattr(affinity, "get_layout", lambda workers: layout)
+
+    command.cpus = 3
+    assert command.get_cpu_layout() == layout
+    assert command.cpus == 3
+
+    command.cpus = 6
+    assert command.get_cpu_layout() == layout
+    assert command.cpus == 3
+
+    command.cpus = 6
+    command.args.cpus = 6
+    assert command.get_cpu_layout() is None
+    assert command.cpus == 6
+
+
 def test_validate_expected_scores_success():
     os.chdir(get_simple_package_path())
     command = get_command()
@@ -146,6 +279,40 @@ def test_validate_expected_scores_success():
     assert results.expected_scores == results.new_expected_scores
 
 
+def test_skipped_groups_not_validated(capsys):
+    """
+    Test if with `--short-circuit` groups with all tests skipped aren't compared with expected scores
+    and don't get the expected result.
+    """
+    os.chdir(get_simple_package_path())
+    command = get_command()
+    command.scores = command.config["scores"]
+    command.tests = ["in/abc1a.in", "in/abc2a.in", "in/abc3a.in", "in/abc4a.in"]
+    command.groups = command.get_groups(command.tests)
+    command.possible_score = command.contest.get_possible_score(command.groups, command.scores)
+    command.args = argparse.Namespace(solutions=["prog/abc2.cpp"], tests=None, print_expected_scores=True)
+
+    # abc2.cpp is expected to get WA on group 2 and TL on group 4. Group 2 was run until the first WA,
+    # groups 3 and 4 weren't run at all.
+    all_results = {"abc2.cpp": {
+        1: {"in/abc1a.in": ExecutionResult(Status.OK, Points=100)},
+        2: {"in/abc2a.in": ExecutionResult(Status.WA, Points=0), "in/abc2b.in": ExecutionResult(Status.SKIPPED)},
+        3: {"in/abc3a.in": ExecutionResult(Status.SKIPPED)},
+        4: {"in/abc4a.in": ExecutionResult(Status.SKIPPED)},
+    }}
+    results = {"abc2.cpp": {1: {"status": Status.OK, "points": 25}, 2: {"status": Status.WA, "points": 0},
+                            3: {"status": Status.SKIPPED, "points": 0}, 4: {"status": Status.SKIPPED, "points": 0}}}
+    command.keep_expected_statuses_of_skipped_groups(results, all_results)
+    assert command.skipped_groups == {"abc2.cpp": {3, 4}}
+    assert list(results["abc2.cpp"].keys()) == [1, 2]
+    assert "Solution abc2.cpp was not run on groups 3, 4" in capsys.readouterr().out
+
+    validation = command.validate_expected_scores(results)
+    assert validation.expected_scores == validation.new_expected_scores
+    assert list(validation.new_expected_scores["abc2.cpp"]["expected"].keys()) == [1, 2]
+    assert validation.removed_groups == set()
+
+
 def test_validate_expected_scores_fail(capsys):
     os.chdir(get_simple_package_path())
     command = get_command()
@@ -473,3 +640,64 @@ def test_update_group_status():
     assert update_group_status(Status.PENDING, Status.WA) == Status.WA
     assert update_group_status(Status.WA, Status.CE) == Status.CE
     assert update_group_status(Status.CE, Status.WA) == Status.CE
+
+
+@pytest.mark.parametrize("create_package", [get_simple_package_path()], indirect=True)
+def test_sort_executions(create_package):
+    """
+    Test sorting executions by expected running time.
+    """
+    from sinol_make.structs.cache_structs import CacheTest, CacheFile
+    from sinol_make.structs.status_structs import ExecutionResult
+    package_path = create_package
+    command = get_command(package_path)
+    create_ins_outs(package_path)
+    command.tests = ["in/abc1a.in", "in/abc2a.in", "in/abc3a.in"]
+    command.test_md5sums = {os.path.basename(test): util.get_file_md5(test) for test in command.tests}
+
+    def cache_test(time, status=Status.OK):
+        return CacheTest(time_limit=1000, memory_limit=1024, time_tool="time",
+                         result=ExecutionResult(status, Time=time))
+
+    md5 = lambda test: command.test_md5sums[os.path.basename(test)]
+    all_cache_files = {
+        "abc.cpp": CacheFile(tests={md5("in/abc1a.in"): cache_test(10), md5("in/abc2a.in"): cache_test(300)}),
+        "abcs1.cpp": CacheFile(tests={md5("in/abc1a.in"): cache_test(1001, Status.TL)}),
+        "abcb1.cpp": CacheFile(),
+    }
+    executions = [(name, name + ".e", test) for name in all_cache_files for test in command.tests]
+    command.sort_executions(executions, all_cache_files)
+    order = [(name, test) for name, _, test in executions]
+
+    # Time limit exceeded runs until the hard time limit.
+    assert order[0] == ("abcs1.cpp", "in/abc1a.in")
+    # Solutions without cached results are estimated from other solutions on the same test.
+    assert order.index(("abcb1.cpp", "in/abc1a.in")) < order.index(("abc.cpp", "in/abc2a.in"))
+    assert order.index(("abc.cpp", "in/abc2a.in")) < order.index(("abc.cpp", "in/abc1a.in"))
+    assert order.index(("abcs1.cpp", "in/abc2a.in")) < order.index(("abc.cpp", "in/abc1a.in"))
+
+
+def test_results_table_scores():
+    """
+    Test if scores of groups are updated with results, even if the table isn't rendered.
+    """
+    import collections
+    from sinol_make.commands.run import ResultsTable
+    from sinol_make.structs.run_structs import PrintData
+    from sinol_make.contest_types.default import DefaultContest
+    tests = ["in/abc1a.in", "in/abc2a.in"]
+    limits = package_util.LimitTable({("abc1a.in", "cpp"): 1000, ("abc2a.in", "cpp"): 1000},
+                                     {("abc1a.in", "cpp"): 1024, ("abc2a.in", "cpp"): 1024})
+    all_results = {"abc.cpp": {1: {tests[0]: ExecutionResult(Status.PENDING)},
+                               2: {tests[1]: ExecutionResult(Status.PENDING)}}}
+    scores = collections.defaultdict(dict)
+    table = ResultsTable("abc", scores, all_results, PrintData(0), ["abc.cpp"], [], [1, 2], {1: 50, 2: 50}, tests,
+                         100, 1, False, limits, DefaultContest())
+    assert scores["abc.cpp"][1]["status"] == Status.PENDING
+
+    all_results["abc.cpp"][1][tests[0]] = ExecutionResult(Status.OK, Time=10, Memory=10, Points=100)
+    table.update("abc.cpp", 1, tests[0])
+    all_results["abc.cpp"][2][tests[1]] = ExecutionResult(Status.WA, Time=10, Memory=10, Points=0)
+    table.update("abc.cpp", 2, tests[1])
+    assert scores["abc.cpp"][1] == {"status": Status.OK, "points": 50}
+    assert scores["abc.cpp"][2] == {"status": Status.WA, "points": 0}
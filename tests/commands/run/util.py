@@ -29,6 +29,7 @@ def get_command(path = None):
         command.config = yaml.load(config_file, Loader=yaml.FullLoader)
     command.checker = None
     command.failed_compilations = []
+    command.skipped_groups = {}
     command.contest = get_contest_type()
     set_default_args(command)
     return command
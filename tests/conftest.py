@@ -5,6 +5,8 @@ import yaml
 import os
 import pytest
 import fnmatch
+import shutil
+import tempfile
 import multiprocessing as mp
 
 from sinol_make import sio2jail, util
@@ -31,10 +33,10 @@ def pytest_addoption(parser):
     parser.addoption("--github-runner", action="store_true", help="if set, will run tests specified for GitHub runner")
     parser.addoption(
         '--time-tool',
-        choices=['sio2jail', 'time'],
+        choices=['sio2jail', 'time', 'rusage', 'cgroup'],
         action='append',
         default=[],
-        help='Time tool to use. Default: if linux - both, otherwise time'
+        help='Time tool to use. Default: if linux - all, otherwise time'
     )
     parser.addoption("--no-precompile", action="store_true", help="if set, will not precompile all solutions")
     parser.addoption("--cpus", type=int, help="number of cpus to use, by default all available",
@@ -42,6 +44,10 @@ def pytest_addoption(parser):
 
 
 def pytest_configure(config):
+    # Compiled executables and inwer verdicts are cached in the user-wide cache directory,
+    # so tests use a temporary one instead of the one of the user.
+    config.user_cache_dir = tempfile.mkdtemp(prefix="sinol-make-cache-")
+    os.environ["XDG_CACHE_HOME"] = config.user_cache_dir
     packages = glob.glob(os.path.join(os.path.dirname(__file__), "packages", "*"))
     if not config.getoption("--no-precompile"):
         print("Collecting solutions...")
@@ -90,17 +96,39 @@ def pytest_configure(config):
                     os.unlink(md5sum_file)
             except FileNotFoundError:
                 pass
+        # Workers of pytest-xdist use the database cleared by the controller, so they don't remove it while
+        # other workers are already running tests.
+        if hasattr(config, "workerinput"):
+            continue
+        for results_db_file in glob.glob(os.path.join(package, ".cache", "results.db*")):
+            try:
+                os.unlink(results_db_file)
+            except FileNotFoundError:
+                pass
 
     oicompare.check_and_download()
 
 
+def pytest_unconfigure(config):
+    if hasattr(config, "user_cache_dir"):
+        shutil.rmtree(config.user_cache_dir, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def user_cache_dir(tmp_path, monkeypatch):
+    """
+    Every test gets its own user-wide cache directory.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "user_cache"))
+
+
 def pytest_generate_tests(metafunc):
     if "time_tool" in metafunc.fixturenames:
         time_tools = []
         if metafunc.config.getoption("time_tool") != []:
             time_tools = metafunc.config.getoption("time_tool")
         elif sio2jail.sio2jail_supported():
-            time_tools = ["sio2jail", "time"]
+            time_tools = ["sio2jail", "time", "rusage"]
         else:
             time_tools = ["time"]
         metafunc.parametrize("time_tool", time_tools)
@@ -35,3 +35,10 @@ def test_get_possible_score():
 def test_get_global_score():
     contest = contest_types.DefaultContest()
     assert contest.get_global_score({1: {"points": 10}, 2: {"points": 20}}, 100) == 30
+
+
+def test_is_decided():
+    contest = contest_types.DefaultContest()
+    assert not contest.is_group_decided([100, 50])
+    assert contest.is_group_decided([100, 0])
+    assert not contest.is_run_decided([100, 0])
@@ -18,3 +18,11 @@ def test_get_global_score():
     contest = contest_types.ICPCContest()
     assert contest.get_global_score({1: {"points": 1}, 2: {"points": 1}}, 1) == 1
     assert contest.get_global_score({1: {"points": 1}, 2: {"points": 0}}, 1) == 0
+
+
+def test_is_decided():
+    contest = contest_types.ICPCContest()
+    assert not contest.is_group_decided([1, 1])
+    assert contest.is_group_decided([1, 0])
+    assert not contest.is_run_decided([1, 1])
+    assert contest.is_run_decided([1, 0])
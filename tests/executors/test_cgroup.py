@@ -0,0 +1,82 @@
+import os
+import signal
+import tempfile
+
+import pytest
+
+from sinol_make.executors.cgroup import CgroupExecutor
+from sinol_make.structs.status_structs import Status
+
+
+def _parse_result(lines, tle=False, mle=False):
+    # Parsing the result file doesn't need a delegated cgroup, so the executor isn't initialized.
+    executor = CgroupExecutor.__new__(CgroupExecutor)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result_file_path = os.path.join(tmpdir, "result")
+        with open(result_file_path, "w") as f:
+            f.write("".join(line + "\n" for line in lines))
+        return executor._parse_result(tle, mle, 0, result_file_path)
+
+
+def test_parse_result():
+    result = _parse_result(["100", "2048", "0"])
+    assert result.Status is None
+    assert (result.Time, result.Memory) == (100, 2048)
+
+    result = _parse_result(["100", "2048", "3"])
+    assert result.Status == Status.RE
+    assert result.Error == "Solution exited with code 3"
+
+    result = _parse_result(["100", "2048", str(-signal.SIGSEGV)])
+    assert result.Status == Status.RE
+    assert result.ExitSignal == signal.SIGSEGV
+    assert result.Error == f"Solution was terminated by signal {int(signal.SIGSEGV)}"
+
+    # Status of solutions exceeding limits is set by `execute`.
+    result = _parse_result(["1100", "2048", str(-signal.SIGKILL)], tle=True)
+    assert result.Status is None
+    assert result.Time == 1100
+
+    result = _parse_result(["100"])
+    assert result.Status == Status.RE
+    assert result.Fail
+
+
+@pytest.fixture
+def supervisor(monkeypatch):
+    """
+    Fake cgroup tree, in which sinol-make was moved to the supervisor cgroup by `prepare`.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        supervisor = os.path.join(root, CgroupExecutor.SUPERVISOR_CGROUP)
+        os.mkdir(supervisor)
+        monkeypatch.setattr(CgroupExecutor, "_supervisor", supervisor)
+        yield root, supervisor
+
+
+def test_restore(supervisor):
+    root, supervisor = supervisor
+    CgroupExecutor.restore()
+    assert CgroupExecutor._supervisor is None
+    assert not os.path.exists(supervisor)
+    with open(os.path.join(root, "cgroup.subtree_control")) as f:
+        assert f.read() == "-memory"
+    with open(os.path.join(root, "cgroup.procs")) as f:
+        assert f.read() == str(os.getpid())
+
+    # Restoring again does nothing.
+    os.remove(os.path.join(root, "cgroup.procs"))
+    CgroupExecutor.restore()
+    assert not os.path.exists(os.path.join(root, "cgroup.procs"))
+
+
+def test_restore_busy_supervisor(supervisor):
+    """
+    Test if restoring doesn't fail when the supervisor cgroup can't be removed.
+    """
+    root, supervisor = supervisor
+    with open(os.path.join(supervisor, "cgroup.procs"), "w") as f:
+        f.write("1\n")
+    CgroupExecutor.restore()
+    assert CgroupExecutor._supervisor is None
+    assert os.path.exists(supervisor)
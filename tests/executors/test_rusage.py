@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import signal
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from sinol_make import util
+from sinol_make.executors.rusage import RusageExecutor
+from sinol_make.structs.status_structs import Status
+
+
+pytestmark = pytest.mark.skipif(not util.is_linux(), reason="rusage time tool is supported only on Linux")
+
+# Time limit in milliseconds, hard time limit in seconds and memory limit in KB, as used by `sinol-make run`.
+TIME_LIMIT = 1000
+HARD_TIME_LIMIT = 1
+MEMORY_LIMIT = 32 * 2 ** 10
+
+
+def _execute(command, memory_limit=MEMORY_LIMIT):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        return RusageExecutor().execute(command, TIME_LIMIT, HARD_TIME_LIMIT, memory_limit,
+                                        os.path.join(tmpdir, "result"), command[0], tmpdir)
+
+
+def test_ok():
+    result = _execute(["/bin/sh", "-c", "exit 0"])
+    assert result.Status == Status.OK
+    assert result.Time < TIME_LIMIT
+    assert 0 < result.Memory < MEMORY_LIMIT
+
+
+def test_reported_time(monkeypatch):
+    """
+    Test if reported time counts both user and system time, the same as the CPU time limit.
+    """
+    wait = RusageExecutor._wait
+
+    def fake_wait(self, pid, pgid, wall_time_limit):
+        killed, status, rusage = wait(self, pid, pgid, wall_time_limit)
+        return killed, status, SimpleNamespace(ru_utime=0.1, ru_stime=0.5, ru_maxrss=rusage.ru_maxrss)
+
+    monkeypatch.setattr(RusageExecutor, "_wait", fake_wait)
+    result = _execute(["/bin/sh", "-c", "exit 0"])
+    assert result.Status == Status.OK
+    assert result.Time == 600
+
+
+def test_cpu_time_limit():
+    """
+    Test if a busy solution is stopped by RLIMIT_CPU (with SIGXCPU) and gets TL.
+    """
+    start = time.time()
+    result = _execute(["/bin/sh", "-c", "while :; do :; done"])
+    assert result.Status == Status.TL
+    assert time.time() - start < 2 * HARD_TIME_LIMIT + 1
+
+
+def test_wall_time_limit():
+    """
+    Test if a sleeping solution, which doesn't use CPU time, is killed after the wall time limit and gets TL.
+    """
+    start = time.time()
+    result = _execute(["/bin/sleep", "60"])
+    assert result.Status == Status.TL
+    assert time.time() - start < 2 * HARD_TIME_LIMIT + 3
+
+
+def test_address_space_limit():
+    """
+    Test if a solution allocating memory without bounds is stopped by RLIMIT_AS and gets ML.
+    """
+    start = time.time()
+    result = _execute([sys.executable, "-c", "chunks = []\nwhile True:\n    chunks.append(b'x' * 2 ** 20)"])
+    assert result.Status == Status.ML
+    assert time.time() - start < 2 * HARD_TIME_LIMIT + 1
+
+
+def test_exit_code():
+    result = _execute(["/bin/sh", "-c", "exit 3"])
+    assert result.Status == Status.RE
+    assert result.Error == "Solution exited with code 3"
+
+
+def test_signal():
+    result = _execute(["/bin/sh", "-c", "kill -SEGV $$"])
+    assert result.Status == Status.RE
+    assert result.ExitSignal == signal.SIGSEGV
+    assert result.Error == f"Solution was terminated by signal {int(signal.SIGSEGV)}"
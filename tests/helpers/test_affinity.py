@@ -0,0 +1,77 @@
+import os
+import subprocess
+import tempfile
+
+import pytest
+
+from sinol_make import util
+from sinol_make.helpers import affinity
+
+
+def create_sysfs(tmpdir, siblings):
+    for cpu, cpu_list in siblings.items():
+        os.makedirs(os.path.join(tmpdir, f"cpu{cpu}", "topology"))
+        with open(os.path.join(tmpdir, f"cpu{cpu}", "topology", "thread_siblings_list"), "w") as f:
+            f.write(cpu_list + "\n")
+
+
+def test_parse_cpu_list():
+    assert affinity.parse_cpu_list("0") == [0]
+    assert affinity.parse_cpu_list("0,4") == [0, 4]
+    assert affinity.parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+
+
+@pytest.mark.skipif(not util.is_linux(), reason="CPU pinning is supported only on Linux")
+def test_get_layout(monkeypatch):
+    # 4 physical cores with 2 SMT siblings each.
+    siblings = {cpu: f"{cpu % 4},{cpu % 4 + 4}" for cpu in range(8)}
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        create_sysfs(tmpdir, siblings)
+        assert affinity.get_physical_cores(tmpdir) == [[0, 4], [1, 5], [2, 6], [3, 7]]
+
+        layout = affinity.get_layout(3, tmpdir)
+        assert layout.worker_cpus == [0, 1, 2]
+        assert layout.housekeeping_cpus == [3, 7]
+
+        layout = affinity.get_layout(2, tmpdir)
+        assert layout.worker_cpus == [0, 1]
+        assert layout.housekeeping_cpus == [2, 6, 3, 7]
+
+        # At least one physical core has to be left for housekeeping, so with more workers than
+        # physical cores (for example one for every logical cpu) only some of them are pinned.
+        for workers in [4, 8]:
+            layout = affinity.get_layout(workers, tmpdir)
+            assert layout.worker_cpus == [0, 1, 2]
+            assert layout.housekeeping_cpus == [3, 7]
+
+    # Only one physical core with 2 SMT siblings.
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        create_sysfs(tmpdir, {0: "0-1", 1: "0-1"})
+        assert affinity.get_physical_cores(tmpdir) == [[0, 1]]
+        assert affinity.get_layout(1, tmpdir) is None
+
+    # Siblings outside of the allowed cpus are not used.
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1, 2})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        create_sysfs(tmpdir, siblings)
+        assert affinity.get_physical_cores(tmpdir) == [[0], [1], [2]]
+
+
+@pytest.mark.skipif(not affinity.affinity_supported(), reason="cpu affinity is not supported")
+def test_move_to_housekeeping():
+    cpus = [min(os.sched_getaffinity(0))]
+    affinity.set_housekeeping_cpus(cpus)
+    try:
+        process = subprocess.Popen(["sleep", "10"])
+        affinity.move_to_housekeeping(process.pid)
+        assert os.sched_getaffinity(process.pid) == set(cpus)
+        assert os.getpriority(os.PRIO_PROCESS, process.pid) == \
+               os.getpriority(os.PRIO_PROCESS, 0) + affinity.HOUSEKEEPING_NICENESS
+        process.kill()
+        process.wait()
+        # Processes which already exited are ignored.
+        affinity.move_to_housekeeping(process.pid)
+    finally:
+        affinity.set_housekeeping_cpus(None)
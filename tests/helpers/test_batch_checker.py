@@ -0,0 +1,82 @@
+import os
+import stat
+import sys
+import tempfile
+import threading
+
+from sinol_make.helpers import batch_checker
+
+
+# Checker comparing first lines of output and answer. The comment is its pid, to check if processes are reused.
+CHECKER = """#!{python}
+import os
+import sys
+import time
+
+assert sys.argv[1:] == ["--batch"]
+while True:
+    paths = [sys.stdin.readline().strip() for _ in range(3)]
+    if not paths[0]:
+        break
+    with open(paths[1]) as output, open(paths[2]) as answer:
+        correct = output.readline() == answer.readline()
+    if "crash" in paths[1]:
+        sys.exit(3)
+    if "hang" in paths[1]:
+        time.sleep(60)
+    if "extra" in paths[1]:
+        print("extra line")
+    print("OK" if correct else "WRONG")
+    print(os.getpid())
+    print("100" if correct else "0", flush=True)
+"""
+
+
+def test_batch_checker(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        checker_path = os.path.join(tmpdir, "checker")
+        with open(checker_path, "w") as f:
+            f.write(CHECKER.format(python=sys.executable))
+        os.chmod(checker_path, os.stat(checker_path).st_mode | stat.S_IEXEC)
+        files = {}
+        for name, contents in [("in", ""), ("out", "1\n"), ("wrong", "2\n"), ("ans", "1\n"), ("crash", "1\n"),
+                               ("hang", "1\n"), ("extra", "1\n")]:
+            files[name] = os.path.join(tmpdir, name)
+            with open(files[name], "w") as f:
+                f.write(contents)
+
+        pool = batch_checker.get_pool(checker_path)
+        assert batch_checker.get_pool(checker_path) is pool
+        lines = pool.check(files["in"], files["out"], files["ans"])
+        assert lines[0] == "OK" and lines[2] == "100"
+        pid = lines[1]
+        lines = pool.check(files["in"], files["wrong"], files["ans"])
+        assert lines == ["WRONG", pid, "0"]
+
+        # Checkers used at the same time are separate processes.
+        results = []
+        barrier = threading.Barrier(4)
+
+        def check():
+            barrier.wait()
+            results.append(pool.check(files["in"], files["out"], files["ans"]))
+
+        threads = [threading.Thread(target=check) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(lines[0] == "OK" for lines in results)
+
+        # Checkers which crashed, hanged or replied with a wrong number of lines are replaced.
+        monkeypatch.setattr(batch_checker.BatchChecker, "TIMEOUT", 1)
+        for name in ["crash", "hang", "extra"]:
+            assert pool.check(files["in"], files[name], files["ans"]) is None
+            lines = pool.check(files["in"], files["out"], files["ans"])
+            assert lines[0] == "OK"
+
+        # A recompiled checker gets new processes.
+        os.utime(checker_path, ns=(0, 0))
+        assert batch_checker.get_pool(checker_path) is not pool
+        batch_checker.close_all()
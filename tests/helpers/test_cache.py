@@ -1,5 +1,6 @@
 import os
 import tempfile
+import yaml
 
 from sinol_make.helpers import compile, paths
 from sinol_make.helpers import cache
@@ -96,24 +97,135 @@ def test_cache():
         assert cache.get_cache_file("/some/very/long/path/abc.cpp") == CacheFile()
         assert cache.get_cache_file("abclib.cpp") != CacheFile()
 
+        py_cache_file = CacheFile(md5sum="py_md5sum", executable_path="abc.py", tests=cache_file.tests)
         cache_file.save("abc.cpp")
-        cache_file.save("abc.py")
+        py_cache_file.save("abc.py")
         with open("prog/abclib.cpp", "w") as f:
             f.write("/* Changed file */ int main() { return 0; }")
         cache.process_extra_compilation_files(["abclib.cpp"], "abc")
         assert not os.path.exists(paths.get_cache_path("md5sums", "abc.cpp"))
         assert os.path.exists(paths.get_cache_path("md5sums", "abc.py"))
-        assert cache.get_cache_file("abc.py") == cache_file
+        assert cache.get_cache_file("abc.py") == py_cache_file
         assert cache.get_cache_file("abc.cpp") == CacheFile()
 
         # Test if after changing contest type all cached test results are removed
         cache_file.save("abc.cpp")
-        cache_file.save("abc.py")
+        py_cache_file.save("abc.py")
 
         cache.remove_results_if_contest_type_changed("default")
-        assert cache.get_cache_file("abc.py") == cache_file
+        assert cache.get_cache_file("abc.py") == py_cache_file
         assert cache.get_cache_file("abc.cpp") == cache_file
 
         cache.remove_results_if_contest_type_changed("oi")
         assert cache.get_cache_file("abc.py").tests == {}
         assert cache.get_cache_file("abc.cpp").tests == {}
+
+
+def test_results_keyed_by_executable():
+    """
+    Test if cached results belong to the executable, so they are shared by solutions with the same code
+    and kept when a solution is compiled again.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        cache.create_cache_dirs()
+        result = CacheTest(time_limit=1000, memory_limit=1024, time_tool="time",
+                           result=ExecutionResult(status=Status.OK, Time=10, Memory=100, Points=100))
+
+        def compile_solution(name, source):
+            program = os.path.join(tmpdir, name + ".cpp")
+            with open(program, "w") as f:
+                f.write(source)
+            assert compile.compile(program, os.path.join(tmpdir, name + ".e"), compile_log=None)
+            return program
+
+        abc = compile_solution("abc", "int main() { return 0; }")
+        abcs1 = compile_solution("abcs1", "// Comment.\nint main() { return 0; }")
+        abcb1 = compile_solution("abcb1", "int main() { return 1; }")
+        cache_file = cache.get_cache_file(abc)
+        assert cache_file.executable_md5 != ""
+        cache_file.tests["test1"] = result
+        cache_file.save(abc)
+        assert cache.get_cache_file(abcs1).tests == {"test1": result}
+        assert cache.get_cache_file(abcb1).tests == {}
+
+        # Changing a comment changes md5sum of the solution, but not of the executable.
+        compile_solution("abc", "/* Changed comment */ int main() { return 0; }")
+        assert cache.get_cache_file(abc).tests == {"test1": result}
+        compile_solution("abc", "int main() { return 2; }")
+        assert cache.get_cache_file(abc).tests == {}
+        assert cache.get_cache_file(abcs1).tests == {"test1": result}
+
+
+def test_run_journal():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        cache.create_cache_dirs()
+        os.mkdir("prog")
+        abc_cache = CacheFile(md5sum="abc_md5", executable_path="abc.e")
+        abc_cache.save("abc.cpp")
+        abc2_cache = CacheFile(md5sum="abc2_md5", executable_path="abc2.e")
+        abc2_cache.save("abc2.cpp")
+        result = CacheTest(time_limit=1000, memory_limit=1024, time_tool="time",
+                           result=ExecutionResult(status=Status.OK, Time=10, Memory=100, Points=100))
+
+        journal = cache.open_journal(resume=False)
+        cache.append_to_journal(journal, "abc.cpp", abc_cache, "test1", result)
+        cache.append_to_journal(journal, "abc2.cpp", abc2_cache, "test1", result)
+        journal.write('{"solution": "abc.cpp", "md5')  # Entry interrupted while writing
+        journal.close()
+        assert cache.journal_exists()
+
+        # Results for changed solutions are not replayed.
+        cache_files = {"abc.cpp": cache.get_cache_file("abc.cpp"), "abc2.cpp": CacheFile(md5sum="changed")}
+        assert cache.replay_journal(cache_files) == 1
+        assert cache_files["abc.cpp"].tests == {"test1": result}
+        assert cache_files["abc2.cpp"].tests == {}
+
+        # Merging saves results also for solutions which are not passed.
+        cache.merge_journal({"abc.cpp": cache.get_cache_file("abc.cpp")})
+        assert not cache.journal_exists()
+        assert cache.get_cache_file("abc.cpp").tests == {"test1": result}
+        assert cache.get_cache_file("abc2.cpp").tests == {"test1": result}
+
+        # Journal of the previous run is removed when not resuming.
+        journal = cache.open_journal(resume=False)
+        cache.append_to_journal(journal, "abc.cpp", abc_cache, "test2", result)
+        journal.close()
+        cache.open_journal(resume=False).close()
+        assert cache.replay_journal({"abc.cpp": cache.get_cache_file("abc.cpp")}) == 0
+
+
+def test_results_database():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        cache.create_cache_dirs()
+        result = CacheTest(time_limit=1000, memory_limit=1024, time_tool="time",
+                           result=ExecutionResult(status=Status.OK, Time=10, Memory=100, Points=100))
+        cache_file = CacheFile(md5sum="abc_md5", executable_path="abc.e",
+                               tests={"test1": result, "test2": result, "test3": result})
+        cache_file.save("abc.cpp")
+
+        # Only results for selected tests are loaded.
+        assert cache.get_cache_file("abc.cpp", tests=["test1", "test3"]).tests == {"test1": result, "test3": result}
+        assert cache.get_cache_file("abc.cpp", tests=[]).tests == {}
+        assert cache.get_cache_file("abc.cpp") == cache_file
+
+        # Saving keeps results for tests which weren't loaded.
+        partial = cache.get_cache_file("abc.cpp", tests=["test1"])
+        wa_result = CacheTest(time_limit=1000, memory_limit=1024, time_tool="time",
+                              result=ExecutionResult(status=Status.WA, Time=10, Memory=100, Points=0))
+        partial.tests["test1"] = wa_result
+        partial.save("abc.cpp")
+        assert cache.get_cache_file("abc.cpp").tests == {"test1": wa_result, "test2": result, "test3": result}
+
+        cache.remove_tests_results(["test2"])
+        assert cache.get_cache_file("abc.cpp").tests == {"test1": wa_result, "test3": result}
+
+        # Results from cache files of older versions are moved to the database.
+        with open(paths.get_cache_path("md5sums", "abc2.cpp"), "w") as f:
+            yaml.dump(CacheFile(md5sum="abc2_md5", tests={"test1": result}).to_dict(), f)
+        assert cache.get_cache_file("abc2.cpp").tests == {"test1": result}
+        with open(paths.get_cache_path("md5sums", "abc2.cpp"), "r") as f:
+            assert "tests" not in yaml.load(f, Loader=yaml.FullLoader)
+        assert cache.get_cache_file("abc2.cpp").tests == {"test1": result}
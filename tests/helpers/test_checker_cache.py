@@ -0,0 +1,35 @@
+import os
+import tempfile
+from fractions import Fraction
+
+from sinol_make.helpers import checker_cache
+
+
+def test_checker_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        files = {}
+        for name in ["checker", "input", "output", "answer", "other_output"]:
+            files[name] = os.path.join(tmpdir, name)
+            with open(files[name], "w") as f:
+                f.write(name)
+
+        # Verdicts aren't cached outside of packages.
+        assert checker_cache.get_key(files["checker"], files["input"], files["output"], files["answer"]) is None
+        checker_cache.save_verdict(None, (True, Fraction(100, 1), ""))
+        assert checker_cache.load_verdict(None) is None
+
+        os.mkdir(".cache")
+        key = checker_cache.get_key(files["checker"], files["input"], files["output"], files["answer"])
+        assert checker_cache.load_verdict(key) is None
+        checker_cache.save_verdict(key, (True, Fraction(1, 3), "comment"))
+        assert checker_cache.load_verdict(key) == (True, Fraction(1, 3), "comment")
+        other_key = checker_cache.get_key(files["checker"], files["input"], files["other_output"], files["answer"])
+        assert checker_cache.load_verdict(other_key) is None
+        assert checker_cache.get_key(files["checker"], files["input"], files["output"], "missing") is None
+
+        # Verdicts of a rebuilt checker aren't used.
+        with open(files["checker"], "w") as f:
+            f.write("rebuilt checker")
+        new_key = checker_cache.get_key(files["checker"], files["input"], files["output"], files["answer"])
+        assert checker_cache.load_verdict(new_key) is None
@@ -0,0 +1,68 @@
+import os
+import tempfile
+
+import pytest
+
+from sinol_make.helpers import comparators
+
+
+def check(comparator, output, answer):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, "out"), "wb") as f:
+            f.write(output)
+        with open(os.path.join(tmpdir, "ans"), "wb") as f:
+            f.write(answer)
+        return comparator.check(os.path.join(tmpdir, "out"), os.path.join(tmpdir, "ans"))
+
+
+def test_float_comparator():
+    comparator = comparators.get_comparator({"sinol_comparator": {"type": "float", "abs_eps": "1e-3",
+                                                                  "rel_eps": 0.01}})
+    tests = [
+        (b"1.0 2.0\n", b"1 2", True),
+        (b"1.0009\n", b"1", True),
+        (b"1000.5\n", b"1000", True),
+        (b"1.01\n", b"1", False),
+        (b"abc 1\n", b"abc\n1.0", True),
+        (b"abd 1\n", b"abc 1", False),
+        (b"1\n", b"1 2", False),
+        (b"1 2\n", b"1", False),
+        (b"nan\n", b"1", False),
+        (b"inf\n", b"inf", True),
+    ]
+    for i, (output, answer, expected) in enumerate(tests):
+        correct, points, comment = check(comparator, output, answer)
+        assert correct == expected, f"Test {i} failed"
+        assert points == (100 if expected else 0)
+        assert (comment == "") == expected
+
+    assert check(comparator, b"1 2.5", b"1 2")[2] == 'Token 2: expected "2", read "2.5"'
+    assert check(comparator, b"1", b"1 2")[2] == 'Token 2: expected "2", read end of file'
+
+
+def test_token_case_insensitive_comparator():
+    comparator = comparators.get_comparator({"sinol_comparator": "token_case_insensitive"})
+    assert check(comparator, b"yes\nNo", b"YES NO\n")[0]
+    assert not check(comparator, b"yes", b"NO\n")[0]
+    assert not check(comparator, b"yes yes", b"YES\n")[0]
+
+
+def test_unordered_lines_comparator():
+    comparator = comparators.get_comparator({"sinol_comparator": {"type": "unordered_lines"}})
+    assert check(comparator, b"1 2\n3  4\n\n", b"3 4\n1\t2")[0]
+    assert check(comparator, b"", b"\n\n")[0]
+    assert check(comparator, b"1\n1\n2", b"1\n2\n3") == (False, 0, 'Missing line "3"')
+    assert check(comparator, b"1\n1\n2", b"1\n2") == (False, 0, 'Unexpected line "1"')
+    assert not check(comparator, b"1 2", b"1\n2")[0]
+
+
+def test_get_comparator():
+    assert comparators.get_comparator({}) is None
+    comparator = comparators.get_comparator({"sinol_comparator": {"type": "float", "abs_eps": 0.5}})
+    assert isinstance(comparator, comparators.FloatComparator)
+    assert comparator.params == {"abs_eps": 0.5, "rel_eps": 1e-6}
+
+    for config in ["unknown", {"abs_eps": 1}, {"type": "float", "eps": 1}, {"type": "float", "abs_eps": -1},
+                   {"type": "float", "abs_eps": "abc"}, {"type": "unordered_lines", "abs_eps": 1}, 5]:
+        with pytest.raises(SystemExit):
+            comparators.get_comparator({"sinol_comparator": config})
@@ -2,6 +2,7 @@ import os
 import pytest
 import tempfile
 
+from sinol_make.helpers import compile, compiler, object_store
 from sinol_make.helpers.cache import save_compiled, check_compiled, create_cache_dirs
 from tests import util
 from tests.fixtures import create_package
@@ -37,3 +38,39 @@ def test_large_failed_output(create_package):
 
     with pytest.raises(SystemExit):
         simple_run(["prog/geningen2.cpp"])
+
+
+def test_object_store(monkeypatch):
+    """
+    Test if compiled executables are shared between packages and keyed by includes and compiler version.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("XDG_CACHE_HOME", os.path.join(tmpdir, "user_cache"))
+
+        def compile_in(package, header="#define RESULT 0\n"):
+            os.makedirs(os.path.join(tmpdir, package), exist_ok=True)
+            os.chdir(os.path.join(tmpdir, package))
+            create_cache_dirs()
+            with open("oi.h", "w") as f:
+                f.write(header)
+            with open("prog.cpp", "w") as f:
+                f.write('#include "oi.h"\nint main() { return RESULT; }\n')
+            with open("compile.log", "w") as compile_log:
+                assert compile.compile(os.path.abspath("prog.cpp"), os.path.abspath("prog.e"), compile_log=compile_log)
+            with open("compile.log", "r") as compile_log:
+                return compile_log.read()
+
+        assert "Using stored executable" not in compile_in("pkg1")
+        assert len(os.listdir(object_store.get_objects_path())) == 1
+        # Identical program in another package is taken from the store.
+        assert "Using stored executable" in compile_in("pkg2")
+        assert check_compiled(os.path.abspath("prog.cpp"), "default", False) is not None
+        # Change in an included file is detected.
+        assert "Using stored executable" not in compile_in("pkg3", "#define RESULT 1\n")
+        assert len(os.listdir(object_store.get_objects_path())) == 2
+
+        # Different compiler version requires recompilation, also in the same package.
+        get_compiler_version = compiler.get_compiler_version
+        monkeypatch.setattr(compiler, "get_compiler_version", lambda path: get_compiler_version(path) + "upgraded")
+        assert "Using" not in compile_in("pkg1")
+        assert len(os.listdir(object_store.get_objects_path())) == 3
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import tempfile
+
+from sinol_make.helpers import elf, hash_cache
+
+
+SOURCE = "#include <cstdio>\nint main() { int a, b; scanf(\"%d %d\", &a, &b); printf(\"%d\\n\", a + b); }\n"
+
+
+def _compile(directory, name, source):
+    with open(os.path.join(directory, name + ".cpp"), "w") as f:
+        f.write(source)
+    subprocess.run(["g++", "-O3", name + ".cpp", "-o", name + ".e"], cwd=directory, check=True)
+    return os.path.join(directory, name + ".e")
+
+
+def test_get_code_md5():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        executable = _compile(tmpdir, "abc", SOURCE)
+        renamed = _compile(tmpdir, "abcs1", SOURCE)
+        commented = _compile(tmpdir, "abcs2", "// Comment.\n" + SOURCE)
+        different = _compile(tmpdir, "abcb1", SOURCE.replace("a + b", "a - b"))
+
+        # Executables contain the name of the source file, so they aren't identical.
+        assert hash_cache.hash_file(executable) != hash_cache.hash_file(renamed)
+        assert elf.get_code_md5(executable) == elf.get_code_md5(renamed)
+        assert elf.get_code_md5(executable) == elf.get_code_md5(commented)
+        assert elf.get_code_md5(executable) != elf.get_code_md5(different)
+
+        # Other files are hashed whole.
+        other = os.path.join(tmpdir, "abc.cpp")
+        assert elf.get_code_md5(other) == hash_cache.hash_file(other)
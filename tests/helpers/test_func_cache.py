@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+from sinol_make.helpers.func_cache import cache_result
+
+
+def test_cache_result():
+    calls = []
+
+    @cache_result()
+    def add(a, b=0):
+        calls.append((a, b))
+        return a + b
+
+    assert add(1) == 1
+    assert add(1) == 1
+    assert add(1, b=2) == 3
+    assert add(2) == 2
+    assert calls == [(1, 0), (1, 2), (2, 0)]
+
+    add.cache_clear()
+    assert add(1) == 1
+    assert calls == [(1, 0), (1, 2), (2, 0), (1, 0)]
+
+    @cache_result(cwd=True)
+    def get_cwd():
+        return os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        assert get_cwd() == os.getcwd()
+        os.makedirs("dir")
+        os.chdir("dir")
+        assert get_cwd() == os.getcwd()
@@ -0,0 +1,51 @@
+import os
+import hashlib
+import tempfile
+
+from sinol_make.helpers import hash_cache, results_db
+
+
+def _md5(content):
+    return hashlib.md5(content).hexdigest()
+
+
+def test_get_files_md5(monkeypatch):
+    monkeypatch.setattr(hash_cache, "RACY_WINDOW_NS", 0)
+    monkeypatch.setattr(hash_cache, "CHUNK_SIZE", 3)
+    monkeypatch.setattr(hash_cache, "_hashes", {})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        os.mkdir(".cache")
+        files = []
+        for i in range(5):
+            files.append(os.path.join(tmpdir, f"file{i}"))
+            with open(files[-1], "wb") as f:
+                f.write(b"content" * i)
+
+        assert hash_cache.get_files_md5(files) == {file: _md5(b"content" * i) for i, file in enumerate(files)}
+        assert results_db.get_connection().execute("SELECT COUNT(*) FROM file_hashes").fetchone()[0] == 5
+
+        # Hashes are loaded from the database and files aren't read again.
+        monkeypatch.setattr(hash_cache, "_hashes", {})
+        monkeypatch.setattr(hash_cache, "hash_file", lambda path: "not cached")
+        assert hash_cache.get_file_md5(files[3]) == _md5(b"content" * 3)
+
+        # Changed files are hashed again, even if their size and modification time are the same.
+        stat = os.stat(files[3])
+        with open(files[3], "wb") as f:
+            f.write(b"CONTENT" * 3)
+        os.utime(files[3], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert hash_cache.get_file_md5(files[3]) == "not cached"
+
+
+def test_racy_files(monkeypatch):
+    monkeypatch.setattr(hash_cache, "_hashes", {})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        file = os.path.join(tmpdir, "file")
+        with open(file, "wb") as f:
+            f.write(b"content")
+        # Files outside of packages and recently modified files aren't cached.
+        assert hash_cache.get_file_md5(file) == _md5(b"content")
+        assert hash_cache._hashes == {}
+        assert not os.path.exists(os.path.join(tmpdir, ".cache"))
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+from sinol_make.helpers import inwer_cache
+
+
+def test_inwer_cache(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        monkeypatch.setenv("XDG_CACHE_HOME", os.path.join(tmpdir, "user_cache"))
+        files = {}
+        for name in ["inwer", "abc1a.in", "abc1b.in"]:
+            files[name] = os.path.join(tmpdir, name)
+            with open(files[name], "w") as f:
+                f.write("1\n" if name.endswith(".in") else name)
+
+        tests = [files["abc1a.in"], files["abc1b.in"]]
+        keys = inwer_cache.get_keys(files["inwer"], "default", True, tests)
+        assert inwer_cache.load_verdict(keys[files["abc1a.in"]]) is None
+        inwer_cache.save_verdict(keys[files["abc1a.in"]], False, "ERROR\n")
+        assert inwer_cache.load_verdict(keys[files["abc1a.in"]]) == (False, "ERROR\n")
+        # Tests with the same content and different names have different keys.
+        assert inwer_cache.load_verdict(keys[files["abc1b.in"]]) is None
+
+        # Verdicts of an inwer compiled differently aren't used.
+        assert inwer_cache.load_verdict(inwer_cache.get_keys(files["inwer"], "oioioi", True, tests)[tests[0]]) is None
+        assert inwer_cache.load_verdict(inwer_cache.get_keys(files["inwer"], "default", False, tests)[tests[0]]) is None
+        with open(files["inwer"], "w") as f:
+            f.write("rebuilt inwer")
+        assert inwer_cache.load_verdict(inwer_cache.get_keys(files["inwer"], "default", True, tests)[tests[0]]) is None
@@ -16,6 +16,8 @@ def test_oicompare():
             ("", "ABC", False),
             ("YES", "NO", False),
             ("A B", "A\nB", False),
+            ("A\n\nB", "A\nB", False),
+            ("A\n", "A\nB", False),
         ]
 
         for i, (file1, file2, expected) in enumerate(tests):
@@ -29,3 +31,66 @@ def test_oicompare():
                 f1.write(file1)
                 f2.write(file2)
             assert oicompare.compare(tmpdir + f"/file1_{i}.txt", tmpdir + f"/file2_{i}.txt") == expected, f"Swapped test {i} failed"
+
+
+def test_oicompare_bytes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tests = [
+            (b"\xff\xfe 1\n", b"\xff\xfe   1", True),
+            (b"\xff\xfe\n", b"\xff\xfd\n", False),
+            (b"1\r\n2\r\n", b"1\n2\n", True),
+        ]
+        for i, (file1, file2, expected) in enumerate(tests):
+            with open(tmpdir + f"/file1_{i}.txt", "wb") as f1, open(tmpdir + f"/file2_{i}.txt", "wb") as f2:
+                f1.write(file1)
+                f2.write(file2)
+            assert oicompare.compare(tmpdir + f"/file1_{i}.txt", tmpdir + f"/file2_{i}.txt") == expected, f"Test {i} failed"
+
+
+def test_files_equal():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tests = [
+            ("", "", True),
+            ("ABC\n", "ABC\n", True),
+            ("ABC\n", "ABD\n", False),
+            ("ABC", "ABC\n", False),
+            ("", "\n", False),
+        ]
+        for i, (file1, file2, expected) in enumerate(tests):
+            with open(tmpdir + f"/file1_{i}.txt", "w") as f1, open(tmpdir + f"/file2_{i}.txt", "w") as f2:
+                f1.write(file1)
+                f2.write(file2)
+            assert oicompare.files_equal(tmpdir + f"/file1_{i}.txt", tmpdir + f"/file2_{i}.txt") == expected, \
+                f"Test {i} failed"
+
+
+def test_stream_comparator():
+    tests = [
+        (b"", b"", True),
+        (b"ABC DEF\n", b"ABC   DEF", True),
+        (b"A\nB\n\n\n", b"A\nB", True),
+        (b"A\nB", b"A\nB\n\n\n", True),
+        (b"A B", b"A\nB", False),
+        (b"A\n\nB", b"A\nB", False),
+        (b"A\nB", b"A\nB C", False),
+        (b"A\nB C", b"A\nB", False),
+        (b"ABCD", b"ABC", False),
+    ]
+    for chunk_size in [1, 2, 100]:
+        for i, (output, answer, expected) in enumerate(tests):
+            comparator = oicompare.StreamComparator(answer)
+            for start in range(0, len(output), chunk_size):
+                comparator.feed(output[start:start + chunk_size])
+            assert comparator.finish() == expected, f"Test {i} failed with chunks of size {chunk_size}"
+            assert (comparator.comment is None) == expected
+
+    comparator = oicompare.StreamComparator(b"1 2\n3 4\n")
+    assert comparator.feed(b"1 2\n3 ")
+    assert not comparator.feed(b"5 6\n")
+    assert comparator.comment == 'Line 2: expected "4", read "5"'
+    assert not comparator.finish()
+
+    comparator = oicompare.StreamComparator(b"1\n")
+    assert comparator.feed(b"1")
+    assert not comparator.feed(b" 2 ")
+    assert comparator.comment == 'Line 1: expected end of line, read "2"'
@@ -0,0 +1,38 @@
+import pytest
+
+from ..fixtures import *
+from tests import util
+from sinol_make.helpers import package_util
+from sinol_make.helpers.package_index import PackageIndex
+
+
+@pytest.mark.parametrize("create_package", [util.get_simple_package_path(), util.get_checker_package_path()],
+                         indirect=True)
+def test_package_index(create_package):
+    package_path = create_package
+    util.create_ins_outs(package_path)
+    task_id = package_util.get_task_id()
+    index = PackageIndex(task_id)
+
+    assert index.get_tests() == package_util.get_tests(task_id)
+    assert index.get_tests([f"{task_id}1*.in"]) == package_util.get_tests(task_id, [f"{task_id}1*.in"])
+    assert sorted(index.get_all_inputs()) == sorted(package_util.get_all_inputs(task_id))
+    assert index.get_groups() == package_util.get_groups(package_util.get_tests(task_id), task_id)
+    for test in index.get_tests():
+        package_test = index.get_test(test)
+        assert package_test.in_path == test
+        assert package_test.group == package_util.get_group(test, task_id)
+        assert package_test.has_output
+        assert package_test.size == os.path.getsize(test)
+    for role in ["ingen", "inwer", "chk", "soc", "lib"]:
+        assert index.get_programs(role) == \
+               sorted(package_util.get_files_matching_pattern(task_id, f"{task_id}{role}.*"))
+    index.validate_test_names()
+
+    os.unlink(os.path.join(package_path, "out", f"{task_id}1a.out"))
+    os.rename(os.path.join(package_path, "in", f"{task_id}2a.in"), os.path.join(package_path, "in", "def2a.in"))
+    index = PackageIndex(task_id)
+    assert not index.get_test(f"in/{task_id}1a.in").has_output
+    assert index.get_test(f"in/{task_id}2a.in") is None
+    with pytest.raises(SystemExit):
+        index.validate_test_names()
@@ -1,3 +1,4 @@
+import argparse
 import pytest
 
 from ..commands.run.util import create_ins
@@ -216,6 +217,78 @@ def test_get_memory_limit():
         assert package_util.get_memory_limit("in/abc2a.in", config, "py", "abc") == 512
 
 
+
+def test_get_config_snapshot():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        with open("config.yml", "w") as f:
+            f.write("title: abc\nmemory_limit: 256\ntime_limits: {1: 1000}\nextra_compilation_files: [oi.h]\n")
+        snapshot = package_util.get_config_snapshot()
+        assert snapshot.config == {"title": "abc", "memory_limit": 256, "time_limits": {1: 1000},
+                                   "extra_compilation_files": ("oi.h",)}
+        assert package_util.get_config_snapshot() is snapshot
+
+        # The snapshot is read-only.
+        with pytest.raises(TypeError):
+            snapshot.config["memory_limit"] = 512
+        with pytest.raises(TypeError):
+            snapshot.config["time_limits"][1] = 2000
+
+        # Copies can be modified without affecting the snapshot.
+        config = package_util.get_config()
+        config["memory_limit"] = 512
+        config["time_limits"][1] = 2000
+        config["extra_compilation_files"].append("oi2.h")
+        assert package_util.get_config_snapshot().config["memory_limit"] == 256
+        assert package_util.get_config_snapshot().config["time_limits"][1] == 1000
+        assert package_util.get_config_snapshot().config["extra_compilation_files"] == ("oi.h",)
+
+        with open("config.yml", "w") as f:
+            f.write("title: abc\nmemory_limit: 1024\n")
+        assert package_util.get_config_snapshot().config["memory_limit"] == 1024
+
+
+def test_get_limit_table():
+    config = {
+        "time_limit": 1000,
+        "time_limits": {
+            2: 2000,
+        },
+        "memory_limit": 256,
+        "override_limits": {
+            "py": {
+                "time_limit": 3000,
+                "memory_limits": {
+                    0: 512,
+                },
+            }
+        }
+    }
+    tests = ["in/abc0a.in", "in/abc1a.in", "in/abc2a.in"]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        with open("config.yml", "w") as f:
+            f.write("")
+        limits = package_util.get_limit_table(tests, ["cpp", "py", "cpp"], config, "abc")
+        for test in tests:
+            for lang in ["cpp", "py"]:
+                assert limits.get_time_limit(test, lang) == package_util.get_time_limit(test, config, lang, "abc")
+                assert limits.get_memory_limit(test, lang) == package_util.get_memory_limit(test, config, lang, "abc")
+        assert limits.get_time_limit("in/abc2a.in", "cpp") == 2000
+        assert limits.get_time_limit("in/abc2a.in", "py") == 3000
+        assert limits.get_memory_limit("in/abc0a.in", "py") == 512
+
+        limits = package_util.get_limit_table(tests, ["cpp"], config, "abc", argparse.Namespace(tl=0.5, ml=64))
+        assert limits.get_time_limit("in/abc2a.in", "cpp") == 500
+        assert limits.get_memory_limit("in/abc2a.in", "cpp") == 64 * 1024
+
+        # Missing limits are reported when the table is created.
+        del config["memory_limit"]
+        with pytest.raises(SystemExit):
+            package_util.get_limit_table(tests, ["cpp"], config, "abc")
+
+
 @pytest.mark.parametrize("create_package", [util.get_simple_package_path()], indirect=True)
 def test_validate_files(create_package, capsys):
     package_path = create_package
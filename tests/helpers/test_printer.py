@@ -0,0 +1,48 @@
+from sinol_make import util
+from sinol_make.helpers import printer
+
+
+def test_split_styles():
+    assert printer.split_styles("") == ()
+    assert printer.split_styles("abc") == (("abc", "00"),)
+    assert printer.split_styles("a " + util.bold(util.color_green("OK")) + " | " + util.color_red("1.00s")) == \
+           (("a ", "00"), ("OK", "92"), (" | ", "00"), ("1.00s", "91"))
+    assert printer.split_styles(util.color_gray("No output")) == (("No output", "90"),)
+
+
+def test_lazy_lines():
+    rendered = []
+
+    def get_line(i):
+        rendered.append(i)
+        return f"line {i}"
+
+    lines = printer.LazyLines(100, get_line)
+    assert len(lines) == 100
+    assert lines[10:13] == ["line 10", "line 11", "line 12"]
+    assert lines[-1] == "line 99"
+    assert rendered == [10, 11, 12, 99]
+    assert lines[98:200] == ["line 98", "line 99"]
+
+
+def test_cell_cache():
+    values = {"a": 1, "b": 2}
+    rendered = []
+
+    def render(key):
+        rendered.append(key)
+        return values[key] * 10
+
+    cells = printer.CellCache(render)
+    assert cells.get("a") == 10
+    assert cells.get("b") == 20
+    assert cells.get("a") == 10
+    assert rendered == ["a", "b"]
+
+    values["a"] = 3
+    cells.mark_dirty("a")
+    assert cells.has_dirty()
+    assert cells.get("a") == 30
+    assert not cells.has_dirty()
+    assert cells.get("b") == 20
+    assert rendered == ["a", "b", "a"]
@@ -0,0 +1,25 @@
+from sinol_make.helpers import progress
+from sinol_make.helpers.progress import ProgressReporter
+
+
+def test_progress_reporter(capsys, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(progress.time, "monotonic", lambda: now[0])
+    reporter = ProgressReporter("tests", 10, interval=5)
+    for i in range(4):
+        now[0] += 1
+        reporter.update(failed=i == 1)
+    # Less than `interval` seconds have passed, so nothing is printed.
+    assert capsys.readouterr().out == ""
+
+    now[0] += 1
+    reporter.update()
+    out = capsys.readouterr().out
+    assert out.count("\n") == 1
+    assert "Done 5/10 tests, 1.0 tests/s, about 5s remaining" in out
+    assert "1 failed" in out
+
+    now[0] += 1
+    reporter.update(total=20)
+    assert capsys.readouterr().out == ""
+    assert reporter.get_line().startswith("Done 6/20 tests")
@@ -0,0 +1,56 @@
+import os
+import time
+
+from sinol_make.helpers import paths, user_cache, object_store, inwer_cache
+
+
+def create_entry(directory, name, size, age):
+    path = paths.get_user_cache_path(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    last_use = time.time() - age
+    os.utime(path, (last_use, last_use))
+    return path
+
+
+def test_prune():
+    old = create_entry("objects", "old", 10, user_cache.MAX_AGE + 60)
+    recent = create_entry("objects", "recent", 10, 60)
+    less_recent = create_entry("inwer", "less_recent", 10, 120)
+    least_recent = create_entry("inwer", "least_recent", 10, 180)
+
+    user_cache.prune(max_size=25)
+    assert not os.path.exists(old)
+    assert os.path.exists(recent)
+    assert os.path.exists(less_recent)
+    # Least recently used entries are removed above the maximum size.
+    assert not os.path.exists(least_recent)
+
+    # Used entries aren't pruned.
+    user_cache.touch(less_recent)
+    user_cache.prune(max_size=10)
+    assert os.path.exists(less_recent)
+    assert not os.path.exists(recent)
+
+
+def test_maybe_prune():
+    old = create_entry("objects", "old", 10, user_cache.MAX_AGE + 60)
+    user_cache.maybe_prune()
+    assert not os.path.exists(old)
+
+    # The cache is pruned at most once in `PRUNE_INTERVAL`.
+    old = create_entry("objects", "old", 10, user_cache.MAX_AGE + 60)
+    user_cache.maybe_prune()
+    assert os.path.exists(old)
+
+
+def test_clean():
+    object_path = create_entry("objects", "object", 10, 0)
+    assert object_store.get_object("object") == object_path
+    inwer_cache.save_verdict("key", True, "OK")
+    assert inwer_cache.load_verdict("key") == (True, "OK")
+
+    user_cache.clean()
+    assert object_store.get_object("object") is None
+    assert inwer_cache.load_verdict("key") is None